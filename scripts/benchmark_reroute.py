@@ -0,0 +1,177 @@
+"""
+Measure the cost of re-routing connections after link failures.
+
+On a random topology, this places connections one by one, takes down
+the links that carry the most of them, and solves the connections
+that were on those links again, as TEManager.reroute_connections()
+does.  It reports the time taken to re-route them all with a TESolver
+per connection, and with one IncrementalTESolver, with and without
+the old paths as hints.
+
+Example:
+
+    python ./scripts/benchmark_reroute.py -n 50 100 -m 100 -f 3
+"""
+
+import argparse
+import copy
+import random
+import time
+
+from sdx_pce.load_balancing.incremental_solver import IncrementalTESolver
+from sdx_pce.load_balancing.te_solver import TESolver
+from sdx_pce.models import ConnectionRequest, TrafficMatrix
+from sdx_pce.utils.random_topology_generator import RandomTopologyGenerator
+
+
+def place_connections(graph, num_connections, latency, rng):
+    """
+    Place random connections on the graph, and return their
+    solutions, by request ID.
+    """
+    nodes = list(graph.nodes)
+    solutions = {}
+    for i in range(num_connections):
+        source, destination = rng.sample(nodes, 2)
+        request = ConnectionRequest(
+            source=source,
+            destination=destination,
+            required_bandwidth=rng.randint(100, 500),
+            required_latency=latency,
+        )
+        tm = TrafficMatrix(connection_requests=[request], request_id=str(i))
+        solution = TESolver(graph, tm).solve()
+        if solution.connection_map is not None:
+            TESolver.update_graph(graph, solution)
+            solutions[tm.request_id] = solution
+    return solutions
+
+
+def fail_links(graph, solutions, num_failures):
+    """
+    Remove the edges that carry the most connections, and give the
+    bandwidth of the connections on them back to the other edges.
+
+    :return: the solutions of the connections to re-route.
+    """
+    load = {}
+    for solution in solutions.values():
+        for path in solution.connection_map.values():
+            for hop in path:
+                edge = frozenset((hop.source, hop.destination))
+                load[edge] = load.get(edge, 0) + 1
+
+    failed = sorted(load, key=load.get, reverse=True)[:num_failures]
+    for edge in failed:
+        graph.remove_edge(*edge)
+
+    affected = {}
+    for request_id, solution in solutions.items():
+        hops = [hop for path in solution.connection_map.values() for hop in path]
+        if not any(frozenset((hop.source, hop.destination)) in failed for hop in hops):
+            continue
+        affected[request_id] = solution
+        for request, path in solution.connection_map.items():
+            for hop in path:
+                if graph.has_edge(hop.source, hop.destination):
+                    edge = graph[hop.source][hop.destination]
+                    edge["bandwidth"] += request.required_bandwidth
+    return affected
+
+
+def reroute_time(graph, affected, method):
+    """
+    Return (time, total cost) of re-routing the affected connections.
+    """
+    graph = copy.deepcopy(graph)
+    start = time.perf_counter()
+    total_cost = 0
+
+    if method == "tesolver":
+        for request_id, solution in affected.items():
+            tm = TrafficMatrix(list(solution.connection_map), request_id)
+            new_solution = TESolver(graph, tm).solve()
+            TESolver.update_graph(graph, new_solution)
+            total_cost += new_solution.cost
+    else:
+        solver = IncrementalTESolver(graph)
+        if method == "hints":
+            for solution in affected.values():
+                solver.hint(solution)
+        for request_id, solution in affected.items():
+            tm = TrafficMatrix(list(solution.connection_map), request_id)
+            new_solution = solver.solve(tm)
+            solver.reserve(new_solution)
+            total_cost += new_solution.cost
+
+    return time.perf_counter() - start, total_cost
+
+
+if __name__ == "__main__":
+    parse = argparse.ArgumentParser()
+    parse.add_argument(
+        "-n",
+        dest="n",
+        nargs="+",
+        default=[50, 100],
+        help="Number of nodes of the random topologies",
+        type=int,
+    )
+    parse.add_argument(
+        "-p",
+        dest="p",
+        default=0.1,
+        help="Probability of links in the random topologies",
+        type=float,
+    )
+    parse.add_argument(
+        "-m",
+        dest="m",
+        default=100,
+        help="Number of connections to place",
+        type=int,
+    )
+    parse.add_argument(
+        "-f",
+        dest="f",
+        default=3,
+        help="Number of links to take down",
+        type=int,
+    )
+    parse.add_argument(
+        "-l",
+        dest="l",
+        default=float("inf"),
+        help="Required latency of the connections",
+        type=float,
+    )
+    parse.add_argument(
+        "--seed",
+        dest="seed",
+        default=2022,
+        help="Random seed",
+        type=int,
+    )
+    args = parse.parse_args()
+
+    methods = ("tesolver", "incremental", "hints")
+    print(f"{'nodes':>6} {'rerouted':>8} " + " ".join(f"{m:>12}" for m in methods))
+    for n in args.n:
+        rng = random.Random(args.seed)
+        graph = RandomTopologyGenerator(
+            n,
+            link_probability=args.p,
+            l_bw=10000,
+            u_bw=50000,
+            l_lat=10,
+            u_lat=20,
+            seed=args.seed,
+        ).generate_graph(plot=False)
+
+        solutions = place_connections(graph, args.m, args.l, rng)
+        affected = fail_links(graph, solutions, args.f)
+
+        times = [reroute_time(graph, affected, method)[0] for method in methods]
+        print(
+            f"{n:>6} {len(affected):>8} " + " ".join(f"{t:>12.3f}" for t in times)
+        )
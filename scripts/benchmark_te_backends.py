@@ -0,0 +1,126 @@
+"""
+Compare TESolver's solver backends.
+
+For random topologies of a few sizes and traffic matrices of a few
+request counts, this solves the same problem with each backend and
+reports the solve time, the cost found, and whether it was proven
+optimal.  GLOP solves the LP relaxation, so its cost is a lower bound.
+
+Example:
+
+    python ./scripts/benchmark_te_backends.py -n 25 50 -m 10 50 -w 8
+"""
+
+import argparse
+import copy
+import time
+
+from sdx_pce.load_balancing.te_solver import TESolver
+from sdx_pce.utils.constants import Constants
+from sdx_pce.utils.random_connection_generator import RandomConnectionGenerator
+from sdx_pce.utils.random_topology_generator import RandomTopologyGenerator
+
+BACKENDS = [
+    Constants.SOLVER_SCIP,
+    Constants.SOLVER_CBC,
+    Constants.SOLVER_CP_SAT,
+    Constants.SOLVER_GLOP,
+]
+
+
+def solve_time(graph, tm, cost_flag, backend, num_workers, time_limit):
+    """
+    Return (cost, optimal, solve time) of one backend.
+    """
+    # TESolver assigns link weights on the graph it is given.
+    solver = TESolver(
+        copy.deepcopy(graph),
+        tm,
+        cost_flag,
+        time_limit=time_limit,
+        backend=backend,
+        num_workers=num_workers,
+    )
+
+    start = time.perf_counter()
+    solution = solver.solve()
+    elapsed = time.perf_counter() - start
+
+    optimal = solution.statistics is not None and solution.statistics.optimal
+    return solution.cost, optimal, elapsed
+
+
+if __name__ == "__main__":
+    parse = argparse.ArgumentParser()
+    parse.add_argument(
+        "-n",
+        dest="n",
+        nargs="+",
+        default=[25, 50, 100],
+        help="Number of nodes of the random topologies",
+        type=int,
+    )
+    parse.add_argument(
+        "-p",
+        dest="p",
+        default=0.2,
+        help="Probability of links in the random topologies",
+        type=float,
+    )
+    parse.add_argument(
+        "-m",
+        dest="m",
+        nargs="+",
+        default=[10, 50],
+        help="Number of connections in the random traffic matrices",
+        type=int,
+    )
+    parse.add_argument(
+        "-c",
+        dest="c",
+        default=Constants.COST_FLAG_BW,
+        help="Link cost definition",
+        type=int,
+    )
+    parse.add_argument(
+        "-b",
+        dest="b",
+        nargs="+",
+        default=BACKENDS,
+        help="Solver backends to compare",
+        type=str,
+    )
+    parse.add_argument(
+        "-w",
+        dest="w",
+        default=None,
+        help="Number of threads for SCIP and CP-SAT",
+        type=int,
+    )
+    parse.add_argument(
+        "-t",
+        dest="t",
+        default=None,
+        help="Time limit per solve, in seconds",
+        type=float,
+    )
+    args = parse.parse_args()
+
+    print(
+        f"{'nodes':>6} {'requests':>8} {'backend':>8} {'cost':>12} "
+        f"{'optimal':>7} {'time (s)':>9}"
+    )
+    for n in args.n:
+        graph = RandomTopologyGenerator(n, link_probability=args.p).generate_graph(
+            plot=False
+        )
+        for m in args.m:
+            tm = RandomConnectionGenerator(n).generate(m, 500, 2000, 80, 100)
+            for backend in args.b:
+                cost, optimal, elapsed = solve_time(
+                    graph, tm, args.c, backend, args.w, args.t
+                )
+                print(
+                    f"{n:>6} {m:>8} {backend:>8} {cost:>12.3f} "
+                    f"{str(optimal):>7} {elapsed:>9.3f}"
+                )
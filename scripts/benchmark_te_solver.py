@@ -0,0 +1,99 @@
+"""
+Measure how long TESolver takes to build its model.
+
+For random topologies of a few sizes and traffic matrices of a few
+request counts, this reports the time taken to create the data model
+(TESolver._create_data_model) and to assemble the OR-Tools model from
+it (TESolver._build_model), without solving it.
+
+Example:
+
+    python ./scripts/benchmark_te_solver.py -n 25 50 100 -m 10 50 200
+"""
+
+import argparse
+import time
+
+from ortools.linear_solver import pywraplp
+
+from sdx_pce.load_balancing.te_solver import TESolver
+from sdx_pce.utils.constants import Constants
+from sdx_pce.utils.random_connection_generator import RandomConnectionGenerator
+from sdx_pce.utils.random_topology_generator import RandomTopologyGenerator
+
+
+def model_build_time(num_nodes, link_probability, num_requests, cost_flag):
+    """
+    Return (#vars, #constraints, nnz, data model time, model time).
+    """
+    graph = RandomTopologyGenerator(
+        num_nodes, link_probability=link_probability
+    ).generate_graph(plot=False)
+    tm = RandomConnectionGenerator(num_nodes).generate(num_requests, 500, 2000, 80, 100)
+
+    solver = TESolver(graph, tm, cost_flag)
+
+    start = time.perf_counter()
+    data = solver._create_data_model()
+    data_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    solver._build_model(pywraplp.Solver.CreateSolver("SCIP"), data)
+    model_time = time.perf_counter() - start
+
+    return (
+        data.num_vars,
+        data.num_constraints,
+        len(data.constraint_coeffs),
+        data_time,
+        model_time,
+    )
+
+
+if __name__ == "__main__":
+    parse = argparse.ArgumentParser()
+    parse.add_argument(
+        "-n",
+        dest="n",
+        nargs="+",
+        default=[25, 50, 100],
+        help="Number of nodes of the random topologies",
+        type=int,
+    )
+    parse.add_argument(
+        "-p",
+        dest="p",
+        default=0.2,
+        help="Probability of links in the random topologies",
+        type=float,
+    )
+    parse.add_argument(
+        "-m",
+        dest="m",
+        nargs="+",
+        default=[10, 50, 100, 200],
+        help="Number of connections in the random traffic matrices",
+        type=int,
+    )
+    parse.add_argument(
+        "-c",
+        dest="c",
+        default=Constants.COST_FLAG_BW,
+        help="Link cost definition",
+        type=int,
+    )
+    args = parse.parse_args()
+
+    print(
+        f"{'nodes':>6} {'requests':>8} {'vars':>8} {'rows':>8} {'nnz':>9} "
+        f"{'data (s)':>9} {'model (s)':>9}"
+    )
+    for n in args.n:
+        for m in args.m:
+            num_vars, num_rows, nnz, data_time, model_time = model_build_time(
+                n, args.p, m, args.c
+            )
+            print(
+                f"{n:>6} {m:>8} {num_vars:>8} {num_rows:>8} {nnz:>9} "
+                f"{data_time:>9.3f} {model_time:>9.3f}"
+            )
@@ -0,0 +1,70 @@
+"""
+Measure the cost of adding domains to a TopologyManager.
+
+This adds synthetic OXP topologies, chained by inter-domain links, to
+a TopologyManager one after the other, and reports how long adding
+each batch of domains took.  The time per domain should stay flat as
+the number of domains already in the merged topology grows.
+
+Example:
+
+    python ./scripts/benchmark_topology_add.py -d 100 -n 20 -l 40
+"""
+
+import argparse
+import time
+
+from sdx_pce.topology.manager import TopologyManager
+from sdx_pce.utils.domain_topology_generator import DomainTopologyGenerator
+
+if __name__ == "__main__":
+    parse = argparse.ArgumentParser()
+    parse.add_argument(
+        "-d",
+        dest="d",
+        default=100,
+        help="Number of domains to add",
+        type=int,
+    )
+    parse.add_argument(
+        "-n",
+        dest="n",
+        default=20,
+        help="Number of nodes per domain",
+        type=int,
+    )
+    parse.add_argument(
+        "-l",
+        dest="l",
+        default=40,
+        help="Number of intra-domain links per domain",
+        type=int,
+    )
+    parse.add_argument(
+        "-s",
+        dest="s",
+        default=10,
+        help="Number of domains per reported batch",
+        type=int,
+    )
+    args = parse.parse_args()
+
+    generator = DomainTopologyGenerator(num_nodes=args.n, num_links=args.l)
+    topologies = [generator.generate(index) for index in range(args.d)]
+
+    manager = TopologyManager()
+
+    print(f"{'domains':>8} {'links':>8} {'ms/domain':>10}")
+    for start in range(0, args.d, args.s):
+        batch = topologies[start : start + args.s]
+
+        begin = time.perf_counter()
+        for topology in batch:
+            manager.add_topology(topology)
+        elapsed = time.perf_counter() - begin
+
+        num_links = len(manager.get_topology().links)
+        print(
+            f"{start + len(batch):>8} {num_links:>8} "
+            f"{elapsed * 1000 / len(batch):>10.3f}"
+        )
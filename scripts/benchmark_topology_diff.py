@@ -0,0 +1,64 @@
+"""
+Measure how the cost of a topology update scales with domain size.
+
+For each domain size, this adds a synthetic OXP topology and its
+neighbour to a TopologyManager, and then times an update of it in
+which a few links go down, which goes through topology_diff and link
+up/down detection.  The time per link should stay flat as the domain
+grows.
+
+Example:
+
+    python ./scripts/benchmark_topology_diff.py -l 1000 2000 5000 10000
+"""
+
+import argparse
+import copy
+import time
+
+from sdx_pce.topology.manager import TopologyManager
+from sdx_pce.utils.domain_topology_generator import DomainTopologyGenerator
+
+if __name__ == "__main__":
+    parse = argparse.ArgumentParser()
+    parse.add_argument(
+        "-l",
+        dest="l",
+        default=[1000, 2000, 5000, 10000],
+        help="Numbers of intra-domain links of the domain",
+        nargs="+",
+        type=int,
+    )
+    parse.add_argument(
+        "-k",
+        dest="k",
+        default=10,
+        help="Number of links that go down in the update",
+        type=int,
+    )
+    args = parse.parse_args()
+
+    print(f"{'links':>8} {'nodes':>8} {'ms/update':>10} {'us/link':>8}")
+    for num_links in args.l:
+        # Ten links per node on average.
+        num_nodes = max(num_links // 10, 2)
+        generator = DomainTopologyGenerator(num_nodes=num_nodes, num_links=num_links)
+        topology = generator.generate(0)
+
+        manager = TopologyManager()
+        manager.add_topology(topology)
+        manager.add_topology(generator.generate(1))
+
+        update = copy.deepcopy(topology)
+        update["version"] += 1
+        for link in range(0, num_links, max(num_links // args.k, 1)):
+            update["links"][link]["status"] = "down"
+
+        begin = time.perf_counter()
+        manager.update_topology(update)
+        elapsed = time.perf_counter() - begin
+
+        print(
+            f"{num_links:>8} {num_nodes:>8} {elapsed * 1000:>10.3f} "
+            f"{elapsed * 1e6 / num_links:>8.3f}"
+        )
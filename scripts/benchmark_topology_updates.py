@@ -0,0 +1,94 @@
+"""
+Measure the cost of replaying OXP topology pushes to a TEManager.
+
+This adds synthetic OXP topologies to a TEManager, and then replays a
+stream of pushes of them, as OXPs would send every polling interval:
+most pushes repeat the previous topology data, and some change the
+status of a link.  It reports the time per push of each kind.
+
+Example:
+
+    python ./scripts/benchmark_topology_updates.py -d 20 -r 50 -p 0.1
+"""
+
+import argparse
+import random
+import time
+from collections import defaultdict
+
+from sdx_pce.topology.temanager import TEManager
+from sdx_pce.utils.domain_topology_generator import DomainTopologyGenerator
+
+if __name__ == "__main__":
+    parse = argparse.ArgumentParser()
+    parse.add_argument(
+        "-d",
+        dest="d",
+        default=20,
+        help="Number of domains",
+        type=int,
+    )
+    parse.add_argument(
+        "-n",
+        dest="n",
+        default=20,
+        help="Number of nodes per domain",
+        type=int,
+    )
+    parse.add_argument(
+        "-l",
+        dest="l",
+        default=40,
+        help="Number of intra-domain links per domain",
+        type=int,
+    )
+    parse.add_argument(
+        "-r",
+        dest="r",
+        default=50,
+        help="Number of rounds of pushes from every domain",
+        type=int,
+    )
+    parse.add_argument(
+        "-p",
+        dest="p",
+        default=0.1,
+        help="Fraction of pushes that change the status of a link",
+        type=float,
+    )
+    parse.add_argument(
+        "--seed",
+        dest="seed",
+        default=0,
+        help="Random seed",
+        type=int,
+    )
+    args = parse.parse_args()
+
+    rng = random.Random(args.seed)
+    generator = DomainTopologyGenerator(num_nodes=args.n, num_links=args.l)
+    topologies = [generator.generate(index) for index in range(args.d)]
+
+    temanager = TEManager(topology_data=None)
+    for topology in topologies:
+        temanager.add_topology(topology)
+
+    timings = defaultdict(list)
+    for _ in range(args.r):
+        for index, topology in enumerate(topologies):
+            if rng.random() < args.p:
+                link = rng.randrange(args.l)
+                status = "down" if topology["links"][link]["status"] == "up" else "up"
+                topology = generator.set_link_status(topology, link, status)
+                topologies[index] = topology
+                kind = "status change"
+            else:
+                kind = "unchanged"
+
+            begin = time.perf_counter()
+            temanager.update_topology(topology)
+            timings[kind].append(time.perf_counter() - begin)
+
+    print(f"{'push':>14} {'count':>8} {'ms/push':>10}")
+    for kind, times in timings.items():
+        print(f"{kind:>14} {len(times):>8} {sum(times) * 1000 / len(times):>10.3f}")
@@ -0,0 +1,80 @@
+"""
+Compare the memory used by VLAN tags tables.
+
+TEManager keeps a VLAN allocation table per port.  This builds the
+tables of a synthetic topology with many ports, each with the whole
+1-4094 VLAN range, both as plain {vlan: request_id} dicts and as
+VlanTable objects, and reports the memory each takes.
+
+Example:
+
+    python ./scripts/benchmark_vlan_tables.py -p 100 1000 5000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from sdx_pce.topology.vlan_table import UNUSED_VLAN, VlanTable
+
+
+def dict_tables(num_ports, num_used):
+    tables = {}
+    for port in range(num_ports):
+        table = {vlan: UNUSED_VLAN for vlan in range(1, 4095)}
+        for vlan in range(1, num_used + 1):
+            table[vlan] = f"request-{port}-{vlan}"
+        tables[f"port-{port}"] = table
+    return tables
+
+
+def vlan_tables(num_ports, num_used):
+    tables = {}
+    for port in range(num_ports):
+        table = VlanTable()
+        table.add_range(1, 4095)
+        for vlan in range(1, num_used + 1):
+            table[vlan] = f"request-{port}-{vlan}"
+        tables[f"port-{port}"] = table
+    return tables
+
+
+def measure(build, num_ports, num_used):
+    """
+    Return (memory in MB, build time in seconds).
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    tables = build(num_ports, num_used)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del tables
+    return size / 2**20, elapsed
+
+
+if __name__ == "__main__":
+    parse = argparse.ArgumentParser()
+    parse.add_argument(
+        "-p",
+        dest="p",
+        nargs="+",
+        default=[100, 1000],
+        help="Number of ports",
+        type=int,
+    )
+    parse.add_argument(
+        "-u",
+        dest="u",
+        default=10,
+        help="Number of VLANs in use per port",
+        type=int,
+    )
+    args = parse.parse_args()
+
+    print(f"{'ports':>6} {'table':>9} {'MB':>9} {'time (s)':>9}")
+    for p in args.p:
+        for name, build in (("dict", dict_tables), ("VlanTable", vlan_tables)):
+            size, elapsed = measure(build, p, args.u)
+            print(f"{p:>6} {name:>9} {size:>9.2f} {elapsed:>9.3f}")
@@ -110,6 +110,13 @@ if __name__ == "__main__":
         help="Flag for different grouping heuristic algorithms, default is the linear partition",
         type=int,
     )
+    parse.add_argument(
+        "-j",
+        dest="j",
+        default=0,
+        help="Group Heuristic -- Solve the groups in parallel with this many processes",
+        type=int,
+    )
     parse.add_argument(
         "-o",
         dest="result",
@@ -155,6 +162,9 @@ if __name__ == "__main__":
         print("Heuristic solver")
         solver = TEGroupSolver(graph, tm, args.c, args.b)
         partition_tm = solver.connection_split(args.alg, args.k)
-        solver.solve(partition_tm)
+        if args.j > 0:
+            solver.solve_parallel(partition_tm, args.j)
+        else:
+            solver.solve(partition_tm)
 
     bw_stat(graph)
@@ -1,4 +1,6 @@
 import argparse
+import copy
+from concurrent.futures import ProcessPoolExecutor
 
 # importing the module
 from datetime import datetime
@@ -7,7 +9,8 @@ import numpy as np
 import prtpy
 
 from sdx_pce.load_balancing.te_solver import TESolver
-from sdx_pce.models import ConnectionRequest, TrafficMatrix
+from sdx_pce.models import ConnectionRequest, ConnectionSolution, TrafficMatrix
+from sdx_pce.utils.constants import Constants
 from sdx_pce.utils.random_connection_generator import RandomConnectionGenerator
 from sdx_pce.utils.random_topology_generator import RandomTopologyGenerator
 
@@ -39,13 +42,13 @@ def matrix_to_connection(matrix):
     """
     Convert the plain traffic matrix to TrafficMatrix model used by TESolver as input
     """
-    traffic_matrix = TrafficMatrix(connection_requests=[])
+    traffic_matrix = TrafficMatrix(connection_requests=[], request_id="")
     for rq in matrix:
         request = ConnectionRequest(
-            source=rq[0],
-            destination=rq[1],
-            required_bandwidth=rq[2],
-            required_latency=rq[3],
+            source=int(rq[0]),
+            destination=int(rq[1]),
+            required_bandwidth=float(rq[2]),
+            required_latency=float(rq[3]),
         )
         traffic_matrix.connection_requests.append(request)
     return traffic_matrix
@@ -179,6 +182,10 @@ class TEGroupSolver:
         return partition_tm
 
     def solve(self, partition_tm):
+        """
+        Solve the partitions one after the other, largest bandwidth
+        first, each on what the previous ones left of the topology.
+        """
         partition_shape = len(partition_tm)
         graph = self.topology
         # print("Partition_shape="+str(partition_shape))
@@ -198,6 +205,70 @@ class TEGroupSolver:
             final_ordered_paths.append(ordered_paths.connection_map)
         return final_ordered_paths, final_result
 
+    def solve_parallel(self, partition_tm, max_workers=None):
+        """
+        Solve the partitions concurrently in a process pool.
+
+        Each partition is solved on a copy of the topology that has
+        a share of every link's bandwidth, in proportion to the total
+        bandwidth the partition asks for, so that the paths of all
+        partitions fit together.  The requests that do not fit in the
+        share of their partition are then re-solved one by one on what
+        is left of the topology.
+
+        :param partition_tm: partitions from connection_split().
+        :param max_workers: size of the process pool; the number of
+            processors when None.
+        """
+        partitions = [partition for partition in partition_tm if len(partition) != 0]
+        demands = [sum(connection[2] for connection in p) for p in partitions]
+        total_demand = sum(demands)
+
+        snapshots = []
+        for demand in demands:
+            share = demand / total_demand if total_demand else 1 / len(partitions)
+            snapshot = copy.deepcopy(self.topology)
+            for u, v, w in snapshot.edges(data=True):
+                w[Constants.BANDWIDTH] *= share
+            snapshots.append(snapshot)
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(
+                executor.map(
+                    _solve_partition,
+                    snapshots,
+                    partitions,
+                    [self.cost] * len(partitions),
+                    [self.objective] * len(partitions),
+                )
+            )
+
+        # Reserve the paths that were found on the whole topology.
+        graph = self.topology
+        final_result = 0
+        final_ordered_paths = []
+        conflicts = []
+        for solution, unplaced in results:
+            conflicts.extend(unplaced)
+            if not solution.connection_map:
+                continue
+            graph = TESolver.update_graph(graph, solution)
+            final_result = final_result + solution.cost
+            final_ordered_paths.append(solution.connection_map)
+
+        print(f"Reconciling {len(conflicts)} connections")
+
+        # Largest first, like solve().
+        for connection in sorted(conflicts, key=lambda c: c[2], reverse=True):
+            tm = matrix_to_connection([connection])
+            solver = TESolver(graph, tm, self.cost, self.objective)
+            ordered_paths = solver.solve()
+            graph = solver.update_graph(graph, ordered_paths)
+            final_result = final_result + ordered_paths.cost
+            final_ordered_paths.append(ordered_paths.connection_map)
+
+        return final_ordered_paths, final_result
+
     def disjoint_path(self, connection):
         # Prime path:solver
         # prune the graph
@@ -206,6 +277,41 @@ class TEGroupSolver:
         pass
 
 
+def _solve_partition(graph, partition, cost, objective):
+    """
+    Solve one partition; run in the worker processes of
+    TEGroupSolver.solve_parallel().
+
+    When the partition does not fit in its share of the topology as a
+    whole, its requests are placed one by one, largest first, and the
+    ones that do not fit are left for the reconciliation pass.
+
+    :return: the solution, and the connections it has no path for.
+    """
+    tm = matrix_to_connection(partition)
+    solution = TESolver(graph, tm, cost, objective).solve()
+    if solution.connection_map is not None:
+        return solution, []
+
+    connection_map = {}
+    total_cost = 0
+    unplaced = []
+    for connection in sorted(partition, key=lambda c: c[2], reverse=True):
+        solver = TESolver(graph, matrix_to_connection([connection]), cost, objective)
+        placed = solver.solve()
+        if placed.connection_map is None:
+            unplaced.append(connection)
+            continue
+        graph = solver.update_graph(graph, placed)
+        connection_map.update(placed.connection_map)
+        total_cost = total_cost + placed.cost
+
+    solution = ConnectionSolution(
+        connection_map=connection_map, cost=total_cost, request_id=tm.request_id
+    )
+    return solution, unplaced
+
+
 if __name__ == "__main__":
     parse = argparse.ArgumentParser()
     parse.add_argument(
@@ -0,0 +1,137 @@
+"""
+Directed link (arc) index of a topology graph, shared by TE solvers.
+
+TESolver works on directed links: every undirected edge of the graph
+is two arcs.  Listing the arcs, and looking up their bandwidth,
+latency and weight in the NetworkX graph link by link, used to be done
+again by every solve and by every part of the model.
+
+An ArcIndex lists the arcs once per graph, as NumPy arrays of tail and
+head nodes, and keeps NumPy columns of the link attributes.  The arc
+list only depends on the structure of the graph, so it is cached per
+graph object, and reused until invalidate() is called for the graph;
+the attribute columns change as bandwidth is reserved, and each column
+is read again only after mark_stale() is called for its attribute.
+
+Telling the index about changes, rather than having it compare the
+graph with what it was built from, keeps the lookup of an unchanged
+index O(1).  As a safeguard, an index is also built again when the
+number of nodes of its graph has changed.
+"""
+
+import weakref
+from typing import List, Set, Tuple
+
+import networkx as nx
+import numpy as np
+
+from sdx_pce.utils.constants import Constants
+
+
+class ArcIndex:
+    """
+    Arcs of a graph, with their bandwidth, latency and weight.
+    """
+
+    # Indexes of the graphs seen so far.  Graphs are weakly
+    # referenced, so an index goes away with its graph.
+    _cache = weakref.WeakKeyDictionary()
+
+    # The link attributes that are kept in columns.
+    COLUMNS = (Constants.BANDWIDTH, Constants.LATENCY, Constants.WEIGHT)
+
+    def __init__(self, graph: nx.Graph):
+        """
+        :param graph: A NetworkX graph that represents a network
+            topology.
+        """
+        # Adjcent matrix, key:node; value:list of neighboring nodes
+        adj = nx.to_dict_of_lists(graph)
+
+        # list of links directional: tuple (src,nei), len =2*#edges
+        self.links: List[Tuple[int, int]] = [
+            (k, nei) for k, neighbors in adj.items() for nei in neighbors
+        ]
+
+        arcs = np.array(self.links, dtype=int).reshape(-1, 2)
+        self.tails = arcs[:, 0]
+        self.heads = arcs[:, 1]
+
+        # Both arcs of an undirected edge share the edge's attributes.
+        edge_ids = {}
+        for i, (u, v) in enumerate(graph.edges()):
+            edge_ids[(u, v)] = i
+            if not graph.is_directed():
+                edge_ids[(v, u)] = i
+        self.arc_edges = np.array([edge_ids[link] for link in self.links], dtype=int)
+
+        self.num_nodes = graph.number_of_nodes()
+
+        self.bandwidth = np.zeros(len(self.links))
+        self.latency = np.zeros(len(self.links))
+        self.weight = np.zeros(len(self.links))
+
+        # The attributes whose columns need to be read again.
+        self._stale: Set[str] = set(self.COLUMNS)
+
+    @classmethod
+    def for_graph(cls, graph: nx.Graph) -> "ArcIndex":
+        """
+        Return the index of a graph, with current attribute columns.
+
+        The index is built the first time a graph is seen, and again
+        after invalidate(), or when the graph has gained or lost
+        nodes.
+        """
+        index = cls._cache.get(graph)
+        if index is None or index.num_nodes != graph.number_of_nodes():
+            index = cls(graph)
+            cls._cache[graph] = index
+
+        index.refresh(graph)
+        return index
+
+    @classmethod
+    def invalidate(cls, graph: nx.Graph):
+        """
+        Forget the index of a graph, to have it built again.  Call it
+        after adding or removing edges of a graph.
+        """
+        cls._cache.pop(graph, None)
+
+    @classmethod
+    def mark_stale(cls, graph: nx.Graph, *keys: str):
+        """
+        Have the columns of some link attributes of a graph, all of
+        them when none is given, read again.  Call it after changing
+        link attributes of a graph.
+        """
+        index = cls._cache.get(graph)
+        if index is not None:
+            index._stale.update(keys or cls.COLUMNS)
+
+    def refresh(self, graph: nx.Graph):
+        """
+        Read the stale link attributes of the graph into the columns.
+        """
+        if not self._stale:
+            return
+
+        edges = [data for _, _, data in graph.edges(data=True)]
+        if Constants.BANDWIDTH in self._stale:
+            self.bandwidth = self._column(graph, edges, Constants.BANDWIDTH)
+        if Constants.LATENCY in self._stale:
+            self.latency = self._column(graph, edges, Constants.LATENCY)
+        if Constants.WEIGHT in self._stale:
+            self.weight = self._column(graph, edges, Constants.WEIGHT)
+        self._stale.clear()
+
+    def _column(self, graph: nx.Graph, edges: list, key: str) -> np.ndarray:
+        try:
+            values = np.array([data[key] for data in edges], dtype=float)
+        except KeyError:
+            missing = [
+                (u, v) for u, v, data in graph.edges(data=True) if key not in data
+            ]
+            raise ValueError(f"Links {missing} of the graph have no {key}") from None
+        return values[self.arc_edges]
@@ -0,0 +1,221 @@
+"""
+Constrained shortest path solver for a single connection request.
+
+When a traffic matrix has only one connection request, the TE problem
+that TESolver hands to the MIP solver reduces to finding a minimum
+cost path that only uses links with enough bandwidth for the request,
+and whose total latency is within the required latency.  This module
+solves that problem directly, using the LARAC (Lagrangian Relaxation
+Based Aggregated Cost) algorithm on top of Dijkstra's shortest paths.
+
+LARAC also computes a lower bound on the cost of the optimal path.
+When the path it found is not proven optimal by that bound, the gap
+is closed by walking through the simple paths in order of increasing
+cost, up to a limit.  If the result still can not be proven optimal,
+the caller is expected to fall back to the MIP solver.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import networkx as nx
+
+from sdx_pce.models import ConnectionRequest
+from sdx_pce.utils.constants import Constants
+
+# Tolerance used when comparing path costs.
+EPSILON = 1e-9
+
+# How many paths to look at when closing the LARAC optimality gap.
+MAX_GAP_PATHS = 64
+
+
+@dataclass
+class CSPResult:
+    """
+    Result of a constrained shortest path computation.
+
+    ``path`` is the list of (source, destination) links on the path,
+    or None when there is no feasible path.  ``optimal`` tells whether
+    the result is proven: a path that is proven to be of minimum cost,
+    or a proof that there is no feasible path.
+    """
+
+    path: Optional[List[Tuple[int, int]]]
+    cost: float
+    optimal: bool
+
+
+class CSPSolver:
+    """
+    Constrained shortest path solver.
+    """
+
+    def __init__(self, graph: nx.Graph, objective=Constants.OBJECTIVE_COST):
+        """
+        :param graph: A NetworkX graph that represents a network
+            topology, with weights already assigned to the links.
+        :param objective: What to solve for: cost or load balancing.
+        """
+        self.graph = graph
+        self.objective = objective
+
+        self._logger = logging.getLogger(__name__)
+
+    def solve(self, request: ConnectionRequest) -> CSPResult:
+        """
+        Find a minimum cost path for the given request.
+        """
+        source = request.source
+        destination = request.destination
+        max_latency = request.required_latency
+
+        cost = self._cost_function(request)
+        latency = self._latency_function(request)
+
+        # Least cost path.  If it meets the latency bound, we are done.
+        path_c = self._shortest_path(source, destination, cost)
+        if path_c is None:
+            self._logger.info(f"No path with enough bandwidth for {request}")
+            return CSPResult(path=None, cost=0, optimal=True)
+
+        cost_c, latency_c = self._path_cost(path_c, cost, latency)
+        if latency_c <= max_latency:
+            return CSPResult(path=path_c, cost=cost_c, optimal=True)
+
+        # Least latency path.  If it does not meet the latency bound,
+        # no path will.
+        path_d = self._shortest_path(source, destination, latency)
+        cost_d, latency_d = self._path_cost(path_d, cost, latency)
+        if latency_d > max_latency:
+            self._logger.info(f"No path within latency bound for {request}")
+            return CSPResult(path=None, cost=0, optimal=True)
+
+        # Now path_c is too slow, and path_d meets the bound; search
+        # for the Lagrange multiplier that gives the best aggregated
+        # cost, cost + multiplier * latency.
+        lower_bound = 0
+        while True:
+            multiplier = (cost_c - cost_d) / (latency_d - latency_c)
+
+            def aggregated(u, v, data, multiplier=multiplier):
+                c = cost(u, v, data)
+                return None if c is None else c + multiplier * latency(u, v, data)
+
+            path_r = self._shortest_path(source, destination, aggregated)
+            cost_r, latency_r = self._path_cost(path_r, cost, latency)
+
+            aggregated_r = cost_r + multiplier * latency_r
+            lower_bound = aggregated_r - multiplier * max_latency
+
+            if aggregated_r >= cost_c + multiplier * latency_c - EPSILON:
+                break
+
+            if latency_r <= max_latency:
+                path_d, cost_d, latency_d = path_r, cost_r, latency_r
+            else:
+                path_c, cost_c, latency_c = path_r, cost_r, latency_r
+
+        self._logger.info(
+            f"LARAC result for {request}: cost: {cost_d}, "
+            f"lower bound: {lower_bound}"
+        )
+
+        if cost_d - lower_bound <= EPSILON * max(1.0, abs(cost_d)):
+            return CSPResult(path=path_d, cost=cost_d, optimal=True)
+
+        return self._close_gap(request, cost, latency, path_d, cost_d)
+
+    def _close_gap(self, request, cost, latency, best_path, best_cost) -> CSPResult:
+        """
+        Look for a path cheaper than best_path that meets the latency
+        bound, going through paths in order of increasing cost.  The
+        first one that meets the bound is optimal.
+        """
+        bandwidth = request.required_bandwidth
+        view = nx.subgraph_view(
+            self.graph,
+            filter_edge=lambda u, v: self.graph[u][v][Constants.BANDWIDTH] >= bandwidth,
+        )
+
+        paths = nx.shortest_simple_paths(
+            view, request.source, request.destination, weight=cost
+        )
+
+        for count, nodes in enumerate(paths):
+            if count >= MAX_GAP_PATHS:
+                self._logger.info(f"Could not close the gap for {request}")
+                return CSPResult(path=best_path, cost=best_cost, optimal=False)
+
+            path = list(zip(nodes[:-1], nodes[1:]))
+            path_cost, path_latency = self._path_cost(path, cost, latency)
+
+            if path_cost >= best_cost - EPSILON:
+                break
+
+            if path_latency <= request.required_latency:
+                return CSPResult(path=path, cost=path_cost, optimal=True)
+
+        return CSPResult(path=best_path, cost=best_cost, optimal=True)
+
+    def _cost_function(self, request: ConnectionRequest):
+        """
+        Return a link cost function for Dijkstra.  Links without
+        enough bandwidth for the request are hidden by returning None.
+        """
+        bandwidth = request.required_bandwidth
+
+        if self.objective == Constants.OBJECTIVE_LOAD_BALANCING:
+
+            def cost(u, v, data):
+                if data[Constants.BANDWIDTH] < bandwidth:
+                    return None
+                return bandwidth / data[Constants.BANDWIDTH]
+
+        else:
+
+            def cost(u, v, data):
+                if data[Constants.BANDWIDTH] < bandwidth:
+                    return None
+                return data[Constants.WEIGHT]
+
+        return cost
+
+    def _latency_function(self, request: ConnectionRequest):
+        """
+        Return a link latency function for Dijkstra, hiding links
+        without enough bandwidth for the request.
+        """
+        bandwidth = request.required_bandwidth
+
+        def latency(u, v, data):
+            if data[Constants.BANDWIDTH] < bandwidth:
+                return None
+            return data[Constants.LATENCY]
+
+        return latency
+
+    def _shortest_path(self, source, destination, weight):
+        """
+        Return the shortest path as a list of links, or None.
+        """
+        try:
+            nodes = nx.dijkstra_path(self.graph, source, destination, weight=weight)
+        except nx.NetworkXNoPath:
+            return None
+
+        return list(zip(nodes[:-1], nodes[1:]))
+
+    def _path_cost(self, path, cost, latency):
+        """
+        Return (cost, latency) of a path.
+        """
+        total_cost = 0
+        total_latency = 0
+        for u, v in path:
+            data = self.graph[u][v]
+            total_cost += cost(u, v, data)
+            total_latency += latency(u, v, data)
+
+        return total_cost, total_latency
@@ -0,0 +1,389 @@
+"""
+Incremental TE solver for a sequence of placements on one topology.
+
+TESolver builds its model from scratch for every traffic matrix.  When
+requests are placed one after the other on the same topology, the
+models of consecutive placements only differ by a commodity (the
+variables, flow rows and latency row of one connection request) and by
+the residual bandwidth of the links that the previous placement used.
+
+IncrementalTESolver keeps one OR-Tools model alive instead.  Requests
+are added and removed as commodity blocks; the blocks of removed
+requests are disabled and reused for later requests, so the model does
+not grow with the number of placements.  Link bandwidths are updated in
+place, and the paths of the requests that were solved or placed before
+are passed to the solver as a hint when they are solved again.
+
+Like TESolver, single requests are solved with a constrained shortest
+path search first, and the model is only used when that fails.  Before
+the model is solved, the arcs that no request can use are pruned with
+the same bounds as TESolver.
+
+TEManager.reroute_connections() re-routes connections with it.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import networkx as nx
+import numpy as np
+from ortools.linear_solver import pywraplp
+
+from sdx_pce.load_balancing.arc_index import ArcIndex
+from sdx_pce.load_balancing.te_solver import TESolver
+from sdx_pce.models import ConnectionRequest, ConnectionSolution, TrafficMatrix
+from sdx_pce.utils.constants import Constants
+
+
+@dataclass
+class Commodity:
+    """
+    The part of the model that belongs to one connection request.
+
+    ``variables`` has one variable per directed link, ``flow`` one
+    constraint per node, and ``latency`` bounds the path latency.
+    """
+
+    request: Optional[ConnectionRequest]
+    variables: list
+    flow: list
+    latency: pywraplp.Constraint
+
+
+class IncrementalTESolver(TESolver):
+    """
+    Traffic Engineering Solver that keeps its model across solves.
+
+    A typical placement loop looks like this:
+
+        solver = IncrementalTESolver(graph)
+        for tm in traffic_matrices:
+            solution = solver.solve(tm)
+            solver.reserve(solution)
+    """
+
+    def __init__(
+        self,
+        graph: nx.Graph,
+        cost_flag=Constants.COST_FLAG_HOP,
+        objective=Constants.OBJECTIVE_COST,
+        time_limit: Optional[float] = None,
+        mip_gap: Optional[float] = None,
+        backend: str = Constants.SOLVER_SCIP,
+        num_workers: Optional[int] = None,
+    ):
+        """
+        :param graph: A NetworkX graph that represents a network
+            topology.  Its link bandwidths are updated by reserve().
+        :param cost_flag: Cost (weight) to assign per link.
+        :param objective: What to solve for: cost or load balancing.
+
+        See TESolver for the other parameters.
+        """
+        super().__init__(
+            graph,
+            TrafficMatrix(connection_requests=[], request_id=""),
+            cost_flag,
+            objective,
+            time_limit=time_limit,
+            mip_gap=mip_gap,
+            backend=backend,
+            num_workers=num_workers,
+        )
+        self.cost_flag = cost_flag
+
+        arcs = ArcIndex.for_graph(self.graph)
+        self.links = arcs.links
+        self._latency = arcs.latency.tolist()
+        self._link_index = {link: i for i, link in enumerate(self.links)}
+        self._node_index = {node: i for i, node in enumerate(self.graph.nodes)}
+        self._tails = [self._node_index[node] for node in arcs.tails.tolist()]
+        self._heads = [self._node_index[node] for node in arcs.heads.tolist()]
+
+        self._solver = self._create_solver()
+        assert self._solver is not None
+
+        infinity = self._solver.infinity()
+        self._bandwidth = [
+            self._solver.Constraint(-infinity, bandwidth)
+            for bandwidth in arcs.bandwidth.tolist()
+        ]
+        self._solver.Objective().SetMinimization()
+
+        self._commodities: Dict[ConnectionRequest, Commodity] = {}
+        self._free: List[Commodity] = []
+
+        # Indexes of the links on the latest path of each request, to
+        # start the solver from when the request is solved again.
+        self._hint: Dict[ConnectionRequest, List[int]] = {}
+
+    def add_request(self, request: ConnectionRequest):
+        """
+        Add a connection request to the model.
+        """
+        if request in self._commodities:
+            return
+
+        if self._free:
+            commodity = self._free.pop()
+        else:
+            commodity = self._new_commodity()
+
+        commodity.request = request
+        self._commodities[request] = commodity
+
+        # The flow rows of a request from a node to itself stay at 0,
+        # which gives it an empty path.
+        if request.source != request.destination:
+            commodity.flow[self._node_index[request.source]].SetBounds(-1, -1)
+            commodity.flow[self._node_index[request.destination]].SetBounds(1, 1)
+
+        if request.required_latency != float("inf"):
+            commodity.latency.SetUb(float(request.required_latency))
+
+        for i, x in enumerate(commodity.variables):
+            x.SetBounds(0, 1)
+            self._bandwidth[i].SetCoefficient(x, float(request.required_bandwidth))
+
+        self._set_costs(commodity, range(len(self.links)))
+
+    def remove_request(self, request: ConnectionRequest):
+        """
+        Remove a connection request from the model, and forget its
+        path.  Its part of the model is disabled, and kept for reuse by
+        a later request.
+        """
+        self._hint.pop(request, None)
+        self._disable(request)
+
+    def _disable(self, request: ConnectionRequest):
+        """
+        Take a connection request out of the model, and keep its part
+        of the model for reuse.
+        """
+        commodity = self._commodities.pop(request, None)
+        if commodity is None:
+            return
+
+        commodity.flow[self._node_index[request.source]].SetBounds(0, 0)
+        commodity.flow[self._node_index[request.destination]].SetBounds(0, 0)
+        commodity.latency.SetUb(self._solver.infinity())
+
+        objective = self._solver.Objective()
+        for i, x in enumerate(commodity.variables):
+            x.SetBounds(0, 0)
+            self._bandwidth[i].SetCoefficient(x, 0)
+            objective.SetCoefficient(x, 0)
+
+        commodity.request = None
+        self._free.append(commodity)
+
+    def set_bandwidth(self, u, v, bandwidth: float):
+        """
+        Set the available bandwidth of link (u, v), in the graph and
+        in the model.
+        """
+        self.graph[u][v][Constants.BANDWIDTH] = bandwidth
+        if self.cost_flag == Constants.COST_FLAG_BW:
+            self.graph[u][v][Constants.WEIGHT] = Constants.ALPHA * (1.0 / bandwidth)
+        ArcIndex.mark_stale(self.graph, Constants.BANDWIDTH, Constants.WEIGHT)
+
+        changed = [self._link_index[(u, v)]]
+        if not self.graph.is_directed():
+            changed.append(self._link_index[(v, u)])
+
+        for i in changed:
+            self._bandwidth[i].SetUb(float(bandwidth))
+
+        for commodity in self._commodities.values():
+            self._set_costs(commodity, changed)
+
+    def reserve(self, solution: ConnectionSolution):
+        """
+        Subtract the bandwidth used by a solution from the links, and
+        take its requests out of the model.  Their paths are kept as
+        the hint for when they are solved again.
+        """
+        if solution.connection_map is None:
+            return
+
+        before = {}
+        for path in solution.connection_map.values():
+            for edge in path:
+                u, v = edge.source, edge.destination
+                before[(u, v)] = self.graph[u][v][Constants.BANDWIDTH]
+
+        self.update_graph(self.graph, solution)
+
+        for (u, v), bandwidth in before.items():
+            if self.graph[u][v][Constants.BANDWIDTH] != bandwidth:
+                self.set_bandwidth(u, v, self.graph[u][v][Constants.BANDWIDTH])
+
+        self.hint(solution)
+        for request in solution.connection_map:
+            self._disable(request)
+
+    def hint(self, solution: ConnectionSolution):
+        """
+        Start the requests of a solution from their paths in it, when
+        they are solved next.  The links of the paths that are not in
+        the graph are left out.
+        """
+        if solution.connection_map is None:
+            return
+
+        for request, path in solution.connection_map.items():
+            links = ((edge.source, edge.destination) for edge in path)
+            self._hint[request] = [
+                self._link_index[link] for link in links if link in self._link_index
+            ]
+
+    def solve(self, tm: Optional[TrafficMatrix] = None) -> ConnectionSolution:
+        """
+        Solve for the requests in the model.
+
+        When a traffic matrix is given, requests that are not in it
+        are removed from the model and the missing ones are added
+        first, so that the model solves exactly that traffic matrix.
+        A single request is solved without the model when a
+        constrained shortest path search finds its path.
+        """
+        if tm is not None:
+            requests = list(tm.connection_requests)
+            request_id = tm.request_id
+        else:
+            requests = list(self._commodities)
+            request_id = self.tm.request_id
+
+        if not requests:
+            return ConnectionSolution(connection_map={}, cost=0, request_id=request_id)
+
+        # Like TESolver, solve single requests with a constrained
+        # shortest path search when it can, without the model.
+        if len(requests) == 1:
+            self.tm = TrafficMatrix(connection_requests=requests, request_id=request_id)
+            solution = self._solve_single_request()
+            if solution is not None:
+                self.hint(solution)
+                return solution
+
+        if tm is not None:
+            for request in list(self._commodities):
+                if request not in tm.connection_requests:
+                    self.remove_request(request)
+            for request in tm.connection_requests:
+                self.add_request(request)
+
+        requests = list(self._commodities)
+        self.tm = TrafficMatrix(connection_requests=requests, request_id=request_id)
+
+        self._prune()
+        self._set_hint()
+
+        params = pywraplp.MPSolverParameters()
+        if self.time_limit is not None:
+            self._solver.SetTimeLimit(int(self.time_limit * 1000))
+        if self.mip_gap is not None:
+            params.SetDoubleParam(params.RELATIVE_MIP_GAP, self.mip_gap)
+
+        status = self._solver.Solve(params)
+
+        paths = None
+        if status in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+            paths = np.array(
+                [
+                    [x.solution_value() for x in self._commodities[r].variables]
+                    for r in requests
+                ]
+            )
+            for k, request in enumerate(requests):
+                self._hint[request] = np.flatnonzero(paths[k] > 0.5).tolist()
+        else:
+            self._logger.warning("The problem does not have an optimal solution.")
+
+        statistics = self._mip_statistics(self._solver, status)
+        self._logger.info(f"MIP solver statistics: {statistics}")
+
+        return self._solution_translator(
+            paths, self._solver.Objective().Value(), statistics
+        )
+
+    def _new_commodity(self) -> Commodity:
+        """
+        Add a disabled commodity block to the model.
+        """
+        solver = self._solver
+        index = len(self._commodities) + len(self._free)
+
+        if solver.IsMip():
+            variables = [
+                solver.IntVar(0, 0, f"x[{index},{i}]") for i in range(len(self.links))
+            ]
+        else:
+            variables = [
+                solver.NumVar(0, 0, f"x[{index},{i}]") for i in range(len(self.links))
+            ]
+
+        flow = [solver.Constraint(0, 0) for _ in range(len(self._node_index))]
+        latency = solver.Constraint(-solver.infinity(), solver.infinity())
+
+        for i, x in enumerate(variables):
+            flow[self._tails[i]].SetCoefficient(x, -1)
+            flow[self._heads[i]].SetCoefficient(x, 1)
+            latency.SetCoefficient(x, self._latency[i])
+
+        return Commodity(request=None, variables=variables, flow=flow, latency=latency)
+
+    def _prune(self):
+        """
+        Fix the variables of the links that can not be on a feasible
+        path of their request to 0, as TESolver leaves them out of its
+        model.  This is done again for every solve, as the bandwidth
+        of the links changes.
+        """
+        arcs = ArcIndex.for_graph(self.graph)
+        keep = self._prune_arcs(arcs, self.graph.number_of_nodes())
+        keep = keep.reshape(len(self.tm.connection_requests), len(self.links))
+
+        for request, mask in zip(self.tm.connection_requests, keep.tolist()):
+            for x, kept in zip(self._commodities[request].variables, mask):
+                x.SetUb(1 if kept else 0)
+
+    def _set_costs(self, commodity: Commodity, links):
+        """
+        Set the objective coefficients of a commodity on the given
+        links.
+        """
+        objective = self._solver.Objective()
+        bandwidth = commodity.request.required_bandwidth
+
+        for i in links:
+            data = self._link_data(i)
+            if self.objective == Constants.OBJECTIVE_LOAD_BALANCING:
+                cost = bandwidth / data[Constants.BANDWIDTH]
+            else:
+                cost = data[Constants.WEIGHT]
+            objective.SetCoefficient(commodity.variables[i], float(cost))
+
+    def _set_hint(self):
+        """
+        Hint the solver with the latest paths of the requests.
+        Requests that have not been solved before start from zero.
+        """
+        variables = []
+        values = []
+        for request, commodity in self._commodities.items():
+            hint = [0.0] * len(self.links)
+            for i in self._hint.get(request, []):
+                hint[i] = 1.0
+            variables += commodity.variables
+            values += hint
+
+        self._solver.SetHint(variables, values)
+
+    def _link_data(self, i) -> dict:
+        """
+        Return the attributes of the i-th directed link.
+        """
+        u, v = self.links[i]
+        return self.graph[u][v]
@@ -6,29 +6,53 @@ Created on Mon Sep  7 13:42:31 2022
 @author: Yufeng Xin (RENCI)
 """
 
-import copy
 import logging
-from dataclasses import dataclass
-from itertools import chain, cycle
-from typing import List, Tuple, Union
+import time
+from dataclasses import dataclass, replace
+from typing import List, Optional, Tuple, Union
 
 import networkx as nx
 import numpy as np
 from ortools.linear_solver import pywraplp
 
-from sdx_pce.models import ConnectionPath, ConnectionSolution, TrafficMatrix
+from sdx_pce.load_balancing.arc_index import ArcIndex
+from sdx_pce.load_balancing.csp_solver import CSPSolver
+from sdx_pce.models import (
+    ConnectionPath,
+    ConnectionSolution,
+    SolverStatistics,
+    TrafficMatrix,
+)
 from sdx_pce.utils.constants import Constants
 from sdx_pce.utils.functions import GraphFunction
 
 
 @dataclass
 class DataModel:
-    constraint_coeffs: List[List]
+    """
+    The TE model in array form.
+
+    The constraint matrix is sparse and is kept in CSR form: the
+    non-zero coefficients of row ``i`` are
+    ``constraint_coeffs[constraint_indptr[i]:constraint_indptr[i + 1]]``,
+    and ``constraint_indices`` has the matching variable indices.
+
+    Variables are only created for the (request, directed link) pairs
+    that survive pruning: variable ``j`` stands for request
+    ``var_requests[j]`` using link ``var_links[j]``.  Equality (flow)
+    rows come first, followed by ``num_inequality`` inequality rows.
+    """
+
+    constraint_indptr: np.ndarray
+    constraint_indices: np.ndarray
+    constraint_coeffs: np.ndarray
     bounds: List
     num_constraints: int
     obj_coeffs: List
     num_vars: int
     num_inequality: int
+    var_requests: np.ndarray
+    var_links: np.ndarray
 
 
 class TESolver:
@@ -42,6 +66,10 @@ class TESolver:
         tm: TrafficMatrix,
         cost_flag=Constants.COST_FLAG_HOP,
         objective=Constants.OBJECTIVE_COST,
+        time_limit: Optional[float] = None,
+        mip_gap: Optional[float] = None,
+        backend: str = Constants.SOLVER_SCIP,
+        num_workers: Optional[int] = None,
     ):
         """
         :param graph: A NetworkX graph that represents a network
@@ -50,6 +78,15 @@ class TESolver:
             requests.
         :param cost_flag: Cost (weight) to assign per link.
         :param objective: What to solve for: cost or load balancing.
+        :param time_limit: Wall clock budget for the MIP solver, in
+            seconds.  When it runs out, the best solution found so far
+            is returned.  No limit when None.
+        :param mip_gap: Relative MIP gap at which the MIP solver can
+            stop.  The solver's default when None.
+        :param backend: OR-Tools solver to use for the model: SCIP,
+            CBC, CP-SAT, or GLOP for the LP relaxation.
+        :param num_workers: Number of threads for the SCIP and CP-SAT
+            backends.  The solver's default when None.
         """
         assert isinstance(graph, nx.Graph)
         assert isinstance(tm, TrafficMatrix)
@@ -60,8 +97,13 @@ class TESolver:
         self.graphFunction = GraphFunction()
         self.graphFunction.set_graph(self.graph)
         self.graphFunction.weight_assign(cost_flag)
+        ArcIndex.mark_stale(self.graph, Constants.WEIGHT)
 
         self.objective = objective
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+        self.backend = backend
+        self.num_workers = num_workers
 
         self.links = []  # list of links[src][dest], 2*numEdges
 
@@ -70,7 +112,22 @@ class TESolver:
     def solve(self) -> Tuple[Union[ConnectionSolution, None], float]:
         """
         Return the computed path and associated cost.
+
+        Traffic matrices with a single connection request are solved
+        with a constrained shortest path search, which is much faster
+        than the MIP solver.  The MIP solver is used for everything
+        else, and whenever the path search can not prove that the path
+        it found is optimal.
+
+        When the MIP solver stops at the time limit or the MIP gap,
+        the best solution it found is returned, and its statistics
+        tell that it is not proven optimal.
         """
+        if len(self.tm.connection_requests) == 1:
+            solution = self._solve_single_request()
+            if solution is not None:
+                return solution
+
         data = self._create_data_model()
         if data is None:
             self._logger.warning("Could not create a data model")
@@ -78,133 +135,280 @@ class TESolver:
                 connection_map=None, cost=0, request_id=self.tm.request_id
             )
 
-        # Create the mip solver with the SCIP backend.
-        solver = pywraplp.Solver.CreateSolver("SCIP")
-
-        x = {}
-        for j in range(data.num_vars):
-            x[j] = solver.IntVar(0, 1, "x[%i]" % j)
-
-        self._logger.info(
-            f"Number of variables = {solver.NumVariables()}, "
-            f"num_constraints: {data.num_constraints}, "
-            f"num_inequality: {data.num_inequality}"
-        )
-
-        for i in range(data.num_constraints - data.num_inequality):
-            constraint_expr = [
-                data.constraint_coeffs[i][j] * x[j] for j in range(data.num_vars)
-            ]
-            solver.Add(sum(constraint_expr) == data.bounds[i])
-
-        self._logger.info(
-            f"len(data.bounds): {len(data.bounds)}, "
-            f"len(data.constraint_coeffs)): {len(data.constraint_coeffs)}, "
-            f"data.num_inequality: {data.num_inequality}"
-        )
-
-        for i in range(
-            data.num_constraints - data.num_inequality, data.num_constraints
-        ):
-            constraint_expr = [
-                data.constraint_coeffs[i][j] * x[j] for j in range(data.num_vars)
-            ]
-            solver.Add(sum(constraint_expr) <= data.bounds[i])
+        solver = self._create_solver()
+        if solver is None:
+            return ConnectionSolution(
+                connection_map=None, cost=0, request_id=self.tm.request_id
+            )
 
-        self._logger.info(f"Number of constraints = {solver.NumConstraints()}")
+        x = self._build_model(solver, data)
 
-        objective = solver.Objective()
-        for j in range(data.num_vars):
-            objective.SetCoefficient(x[j], data.obj_coeffs[j])
-        objective.SetMinimization()
+        params = pywraplp.MPSolverParameters()
+        if self.time_limit is not None:
+            solver.SetTimeLimit(int(self.time_limit * 1000))
+        if self.mip_gap is not None:
+            params.SetDoubleParam(params.RELATIVE_MIP_GAP, self.mip_gap)
 
-        status = solver.Solve()
+        status = solver.Solve(params)
         solution = []
         paths = None
-        if status == pywraplp.Solver.OPTIMAL:
+        if status in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
             self._logger.info(f"Objective value = {solver.Objective().Value()}")
             for j in range(data.num_vars):
                 # print(x[j].name(), ' = ', x[j].solution_value())
                 solution.append(x[j].solution_value())
 
-            paths = np.array(solution).reshape(len(self.tm.connection_requests), -1)
+            # Scatter the pruned variables back to one row of links
+            # per request.
+            paths = np.zeros((len(self.tm.connection_requests), len(self.links)))
+            paths[data.var_requests, data.var_links] = solution
             self._logger.info(f"paths.shape={paths.shape}")
             # print(path)
 
-            # print('Problem solved in %f milliseconds' % solver.wall_time())
-            # print('Problem solved in %d iterations' % solver.iterations())
-            # print('Problem solved in %d branch-and-bound nodes' % solver.nodes())
         else:
             self._logger.warning("The problem does not have an optimal solution.")
 
+        statistics = self._mip_statistics(solver, status)
+        self._logger.info(f"MIP solver statistics: {statistics}")
+
         # returns: dict(conn request, [path]), cost
-        return self._solution_translator(paths, solver.Objective().Value())
+        return self._solution_translator(
+            paths, solver.Objective().Value(), statistics
+        )
+
+    def _create_solver(self) -> Optional[pywraplp.Solver]:
+        """
+        Create the OR-Tools solver for the selected backend.
+        """
+        solver = pywraplp.Solver.CreateSolver(self.backend)
+        if solver is None:
+            self._logger.error(f"Solver backend {self.backend} is not available")
+            return None
+
+        # CBC does not take a thread count through this interface.
+        if self.num_workers is not None and self.backend in (
+            Constants.SOLVER_SCIP,
+            Constants.SOLVER_CP_SAT,
+        ):
+            solver.SetNumThreads(self.num_workers)
+
+        self._logger.info(f"Solver backend: {solver.SolverVersion()}")
+        return solver
+
+    def _mip_statistics(self, solver: pywraplp.Solver, status) -> SolverStatistics:
+        """
+        Collect the statistics of a MIP solver run.
+
+        For the LP relaxation, there is no gap or branch-and-bound
+        nodes to report, and the solution is only optimal if it is
+        integral, which _solution_translator() checks.
+        """
+        if not solver.IsMip():
+            return SolverStatistics(
+                optimal=status == pywraplp.Solver.OPTIMAL,
+                gap=0.0,
+                wall_time=solver.wall_time(),
+                nodes=0,
+                iterations=solver.iterations(),
+            )
+
+        gap = 0.0
+        if status in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+            value = solver.Objective().Value()
+            bound = solver.Objective().BestBound()
+            gap = abs(value - bound) / max(abs(value), 1e-9)
+
+        # With a MIP gap, SCIP reports OPTIMAL when it stops within
+        # the gap, so look at the gap it actually reached.
+        optimal = status == pywraplp.Solver.OPTIMAL and (
+            self.mip_gap is None
+            or gap <= pywraplp.MPSolverParameters.kDefaultRelativeMipGap
+        )
+
+        return SolverStatistics(
+            optimal=optimal,
+            gap=gap,
+            wall_time=solver.wall_time(),
+            nodes=solver.nodes(),
+            iterations=solver.iterations(),
+        )
+
+    def _solve_single_request(self) -> Optional[ConnectionSolution]:
+        """
+        Solve a single request traffic matrix without the MIP solver.
+
+        Returns None when the MIP solver should be used instead.
+        """
+        request = self.tm.connection_requests[0]
+        start = time.perf_counter()
+
+        if (
+            request.source == request.destination
+            or request.source not in self.graph
+            or request.destination not in self.graph
+        ):
+            return None
+
+        result = CSPSolver(self.graph, self.objective).solve(request)
+        if not result.optimal:
+            return None
+
+        statistics = SolverStatistics(
+            optimal=True,
+            gap=0.0,
+            wall_time=(time.perf_counter() - start) * 1000,
+            nodes=0,
+            iterations=0,
+        )
+
+        if result.path is None:
+            self._logger.warning(f"No feasible path for request {request}")
+            return ConnectionSolution(
+                connection_map=None,
+                cost=0,
+                request_id=self.tm.request_id,
+                statistics=statistics,
+            )
+
+        cpaths = [ConnectionPath(source=u, destination=v) for u, v in result.path]
+        self._logger.info(f"Path {cpaths} for request {request}")
+
+        return ConnectionSolution(
+            connection_map={request: cpaths},
+            cost=float(result.cost),
+            request_id=self.tm.request_id,
+            statistics=statistics,
+        )
+
+    def _build_model(self, solver: pywraplp.Solver, data: DataModel) -> list:
+        """
+        Add variables, constraints and objective from the data model
+        to an OR-Tools solver.
+
+        Only the non-zero coefficients of the data model are set on
+        the constraints, so the work done here is proportional to the
+        size of the sparse constraint matrix.
+
+        Variables are continuous when the solver is an LP solver.
+
+        :return: the list of model variables.
+        """
+        if solver.IsMip():
+            x = [solver.IntVar(0, 1, "x[%i]" % j) for j in range(data.num_vars)]
+        else:
+            x = [solver.NumVar(0, 1, "x[%i]" % j) for j in range(data.num_vars)]
+
+        self._logger.info(
+            f"Number of variables = {solver.NumVariables()}, "
+            f"num_constraints: {data.num_constraints}, "
+            f"num_inequality: {data.num_inequality}"
+        )
+
+        infinity = solver.infinity()
+        num_equality = data.num_constraints - data.num_inequality
+        indptr = data.constraint_indptr.tolist()
+        indices = data.constraint_indices.tolist()
+        coeffs = data.constraint_coeffs.tolist()
+
+        for i in range(data.num_constraints):
+            bound = float(data.bounds[i])
+            if i < num_equality:
+                constraint = solver.Constraint(bound, bound)
+            else:
+                constraint = solver.Constraint(-infinity, bound)
+
+            for k in range(indptr[i], indptr[i + 1]):
+                constraint.SetCoefficient(x[indices[k]], coeffs[k])
+
+        self._logger.info(
+            f"Number of constraints = {solver.NumConstraints()}, "
+            f"nnz(data.constraint_coeffs): {len(coeffs)}"
+        )
+
+        objective = solver.Objective()
+        for j in range(data.num_vars):
+            objective.SetCoefficient(x[j], float(data.obj_coeffs[j]))
+        objective.SetMinimization()
+
+        return x
 
     def _solution_translator(
-        self, paths: list, cost: float
+        self, paths: list, cost: float, statistics: Optional[SolverStatistics] = None
     ) -> Union[ConnectionSolution, None]:
-        # extract the edge/path
-        real_paths = []
+        """
+        Turn the solution array, with one row of link variables per
+        request, into an ordered path per request.
+        """
         if paths is None:
             self._logger.warning("No solution: empty input")
             return ConnectionSolution(
-                connection_map=None, cost=cost, request_id=self.tm.request_id
+                connection_map=None,
+                cost=cost,
+                request_id=self.tm.request_id,
+                statistics=statistics,
+            )
+
+        paths = np.asarray(paths, dtype=float)
+
+        # The LP relaxation can split requests across paths.  Its cost
+        # is a lower bound, but it has no paths to give.
+        if np.any(np.abs(paths - np.round(paths)) > 0.001):
+            self._logger.warning("No solution: the solution is fractional")
+            if statistics is not None:
+                statistics = replace(statistics, optimal=False)
+            return ConnectionSolution(
+                connection_map=None,
+                cost=cost,
+                request_id=self.tm.request_id,
+                statistics=statistics,
             )
-        for path in paths:
-            real_path = []
-            i = 0
-            for edge in path:
-                if abs(edge - 1) < 0.001:  # =1: edge on the path
-                    real_path.append(self.links[i])
-                i = i + 1
-            real_paths.append(real_path)
 
-        # associate with the TM requests
-        id_connection = 0
+        # =1: link on the path
+        selected = np.abs(paths - 1) < 0.001
+        request_ids, link_ids = np.nonzero(selected)
+
+        # Successor of each node on the path of each request.
+        successors = [{} for _ in self.tm.connection_requests]
+        for request_id, link_id in zip(request_ids.tolist(), link_ids.tolist()):
+            u, v = self.links[link_id]
+            successors[request_id][u] = v
 
         result = ConnectionSolution(
-            connection_map={}, cost=cost, request_id=self.tm.request_id
+            connection_map={},
+            cost=cost,
+            request_id=self.tm.request_id,
+            statistics=statistics,
         )
 
-        for request in self.tm.connection_requests:
-            src = request.source
-            dest = request.destination
-            # latency = connection[3]  # latency is unused
-
-            # Add request as the key to solution map
-            result.connection_map[request] = []
-
-            # ordered_path: List[Path] = []
-            # ordered_paths: List[(src, dest, bw)] = [] # ordered_path
-            # ordered_paths: List = []
-            # print("src:"+str(src)+"-dest:"+str(dest))
-            path = real_paths[id_connection]
-            i = 0
-            while src != dest and i < 10:
-                for edge in path:
-                    # print("edge:"+str(edge))
-                    if edge[0] == src:
-                        self._logger.info(f"Adding edge {edge} for request {request}")
-                        # ordered_paths.append(edge)
-
-                        # Make a path and add it to the solution map
-                        cpath = ConnectionPath(source=edge[0], destination=edge[1])
-                        result.connection_map[request].append(cpath)
-
-                        src = edge[1]
-                        break
-                    # if src==dest:
-                    #    print("ordered the path:"+str(src) +":"+str(dest)+":"+str(i)+";"+str(ordered_path))
-                    #    break
-                i = i + 1
-            id_connection = id_connection + 1
-        # print("ordered paths:"+str(ordered_paths))
-        # return ordered_paths
+        for request, successor in zip(self.tm.connection_requests, successors):
+            result.connection_map[request] = self._follow_path(request, successor)
 
         self._logger.info(f"solution_translator result: {result}")
         return result
 
-    def update_graph(self, graph, pathsconnection):
+    def _follow_path(self, request, successor: dict) -> List[ConnectionPath]:
+        """
+        Walk the successor map from the source of the request to its
+        destination.
+        """
+        path = []
+        node = request.source
+
+        # Each link is used at most once, which also stops the walk
+        # on a (malformed) solution with a cycle.
+        while node != request.destination and node in successor:
+            next_node = successor.pop(node)
+            path.append(ConnectionPath(source=node, destination=next_node))
+            node = next_node
+
+        if node != request.destination:
+            self._logger.warning(f"Path for request {request} ends at {node}")
+
+        self._logger.info(f"Path {path} for request {request}")
+        return path
+
+    @staticmethod
+    def update_graph(graph, pathsconnection):
         """
         After a path is provisioned, it needs to update the topology by subtracting the used bandwidth
         """
@@ -224,39 +428,27 @@ class TESolver:
                     graph[u][v][Constants.BANDWIDTH] = max(
                         bandwidth, 0.01
                     )  # Avoid being divided by 0.
+        ArcIndex.mark_stale(graph, Constants.BANDWIDTH)
         return graph
 
     def set_obj(self, obj):
         self.objective = obj
 
-    def _mc_cost(self, links):
+    def _mc_cost(self, arcs: ArcIndex) -> np.ndarray:
         """
         Defining the link cost function to be a constant weight
         """
-        cost_list = []
-        for link in links:
-            cost_list.append(self.graph[link[0]][link[1]][Constants.WEIGHT])
-
-        cost = []
-        for i in range(len(self.tm.connection_requests)):
-            cost += cost_list
-
-        return cost
+        return np.tile(arcs.weight, len(self.tm.connection_requests))
 
-    def _lb_cost(self, links):
+    def _lb_cost(self, arcs: ArcIndex) -> np.ndarray:
         """
         Defining the link cost function to be the bw utilization
         """
-        cost_list = []
-        for link in links:
-            cost_list.append(self.graph[link[0]][link[1]][Constants.BANDWIDTH])
-        cost = []
-        for connection in self.tm.connection_requests:
-            bw = connection.required_bandwidth
-            # cost += cost_list
-            cost += [bw / link for link in cost_list]
-
-        return cost
+        bandwidths = np.array(
+            [request.required_bandwidth for request in self.tm.connection_requests],
+            dtype=float,
+        )
+        return (bandwidths[:, None] / arcs.bandwidth[None, :]).ravel()
 
     def _create_data_model(self) -> DataModel:
         """
@@ -270,17 +462,13 @@ class TESolver:
 
         self._logger.info(f"Creating data model: #nodes: {nodenum}, #links: {linknum}")
 
-        # graph flow matrix
-        inputmatrix, links = self._flow_matrix(self.graph)
+        # graph flow matrix, and the link attributes shared by the
+        # constraint and cost builders below.
+        arcs = ArcIndex.for_graph(self.graph)
+        tails, heads, links = arcs.tails, arcs.heads, arcs.links
         self.links = links
-        # inputdistancelist:link weight
-        # distance_list=self.graph_generator.get_distance_list()
-        # latency_list=self.graph_generator.get_latency_list()
 
-        # print("distance_list:"+str(np.shape(distance_list)))
-        # print("latency_list:"+str(np.shape(latency_list)))
-
-        latconstraint = self._make_latency_constaints(links)
+        latconstraint = self._make_latency_constaints(arcs)
 
         # form the bound: rhs
         # flows: numnode*len(request)
@@ -300,202 +488,286 @@ class TESolver:
 
             rhs[request.source] = -1
             rhs[request.destination] = 1
-            bounds += list(rhs)
+            bounds += rhs.tolist()
 
         self._logger.info(f"bound 1: {len(bounds)}")
 
-        # rhsbw -TODO *2 edges
-        bwlinklist = []
-        for link in links:
-            u = link[0]
-            v = link[1]
-            if self.graph.has_edge(u, v):
-                bw = self.graph[u][v][Constants.BANDWIDTH]
-            elif self.graph.has_edge(v, u):
-                bw = self.graph[v][u][Constants.BANDWIDTH]
-
-            bwlinklist.append(bw)
-
         # add the bwconstraint rhs
-        bounds += bwlinklist
+        bounds += arcs.bandwidth.tolist()
         self._logger.info(f"bound 2: {len(bounds)}")
 
         # add the latconstraint rhs
         if latency:
             bounds += latconstraint["rhs"]
             self._logger.info(f"bound 3: {len(bounds)}")
-            # print(bounds)
-
-        # form the constraints: lhs
-        flowconstraints = self._lhsflow(self.tm.connection_requests, inputmatrix)
-        bwconstraints = self._lhsbw(self.tm.connection_requests, inputmatrix)
 
-        self._logger.info(
-            f"Constraints Shape:{len(flowconstraints)}:{len(bwconstraints)}"
+        # form the constraints: lhs, as (row, column, value) triplets
+        # of the non-zero coefficients.
+        flow_rows, flow_cols, flow_vals = self._lhsflow(
+            self.tm.connection_requests, tails, heads, nodenum
         )
-        # print("\n flow"+str(flowconstraints))
-        # print("\n bw:"+str(type(bwconstraints)))
+        bw_rows, bw_cols, bw_vals = self._lhsbw(self.tm.connection_requests, links)
 
-        bw_np = np.array(bwconstraints)
-        self._logger.info(f"np:{flowconstraints.shape} : {bw_np.shape}")
-        flow_lhs = np.concatenate((flowconstraints, bw_np))
-        self._logger.info(f"flow_lhs: {np.shape(flow_lhs)}")
+        # The bandwidth rows come after the flow rows, and the latency
+        # rows come after the bandwidth rows.
+        num_flow_rows = nodenum * len(self.tm.connection_requests)
+        rows = [flow_rows, bw_rows + num_flow_rows]
+        cols = [flow_cols, bw_cols]
+        vals = [flow_vals, bw_vals]
 
         if latency:
-            self._logger.info(f"latcons: {np.shape(latconstraint['lhs'])}")
-            lhs = np.concatenate((flow_lhs, latconstraint["lhs"]))
-        else:
-            lhs = flow_lhs
+            lat_rows, lat_cols, lat_vals = latconstraint["lhs"]
+            rows.append(lat_rows + num_flow_rows + len(links))
+            cols.append(lat_cols)
+            vals.append(lat_vals)
 
         # objective function
         if self.objective == Constants.OBJECTIVE_COST:
             self._logger.info("Objecive: Cost")
-            cost = self._mc_cost(links)
+            cost = self._mc_cost(arcs)
         if self.objective == Constants.OBJECTIVE_LOAD_BALANCING:
             self._logger.info("Objecive: Load Balance")
-            cost = self._lb_cost(links)
+            cost = self._lb_cost(arcs)
 
-        self._logger.info(
-            f"cost len: {len(cost)}, "
-            f"lhs shape: {lhs.shape}, "
-            f"rhs shape: {len(bounds)}"
-        )
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        vals = np.concatenate(vals)
+
+        # Drop the variables of links that can not be on the path of
+        # their request, and renumber the remaining ones.
+        keep = self._prune_arcs(arcs, nodenum)
+        var_map = np.full(len(keep), -1)
+        var_map[keep] = np.arange(np.count_nonzero(keep))
+
+        kept = keep[cols]
+        rows = rows[kept]
+        cols = var_map[cols[kept]]
+        vals = vals[kept]
+
+        cost = np.asarray(cost, dtype=float)[keep]
+        var_requests, var_links = np.divmod(np.flatnonzero(keep), len(links))
+
+        # Drop the constraints that can not be violated, and renumber
+        # the remaining ones.
+        bounds = np.asarray(bounds, dtype=float)
+        row_keep = self._constraint_rows_to_keep(rows, vals, bounds, num_flow_rows)
+        row_map = np.full(len(bounds), -1)
+        row_map[row_keep] = np.arange(np.count_nonzero(row_keep))
 
-        # print(cost)
+        kept = row_keep[rows]
+        rows = row_map[rows[kept]]
+        cols = cols[kept]
+        vals = vals[kept]
+        bounds = bounds[row_keep]
 
-        coeffs = []
-        for i in range(lhs.shape[0]):
-            row = list(lhs[i])
-            coeffs.append(row)
+        num_inequality = int(np.count_nonzero(row_keep[num_flow_rows:]))
+
+        indptr, indices, coeffs = self._coo_to_csr(rows, cols, vals, len(bounds))
+
+        self._logger.info(
+            f"cost len: {len(cost)} of {len(keep)}, "
+            f"lhs nnz: {len(coeffs)}, "
+            f"rhs shape: {len(bounds)} of {len(row_keep)}"
+        )
 
         # Form the OR datamodel
         return DataModel(
+            constraint_indptr=indptr,
+            constraint_indices=indices,
             constraint_coeffs=coeffs,
-            bounds=list(bounds),
+            bounds=bounds.tolist(),
             num_constraints=len(bounds),
-            obj_coeffs=list(cost),
+            obj_coeffs=cost.tolist(),
             num_vars=len(cost),
-            num_inequality=2 * linknum + int(len(self.tm.connection_requests)),
+            num_inequality=num_inequality,
+            var_requests=var_requests,
+            var_links=var_links,
         )
 
-    def _flow_matrix(self, g):
-        """generating the network flow matrix
-        # also set self.links: 2*links
+    def _prune_arcs(self, arcs: ArcIndex, nodenum):
+        """
+        Return a boolean mask over the (request, directed link)
+        variables, False for those that can not be on a feasible path.
+
+        For each request, a link is pruned when its bandwidth is less
+        than the required bandwidth, or when the least latency path
+        from the source through the link to the destination, using
+        only links with enough bandwidth, is longer than the required
+        latency.  Links that are unreachable from the source or that
+        can not reach the destination are pruned too.
+        """
+        if self.graph.is_directed():
+            reverse = self.graph.reverse(copy=False)
+        else:
+            reverse = self.graph
+
+        masks = []
+        for request in self.tm.connection_requests:
+            required = request.required_bandwidth
+
+            def weight(u, v, data, required=required):
+                if data[Constants.BANDWIDTH] < required:
+                    return None
+                return data[Constants.LATENCY]
+
+            from_source = self._latency_distances(
+                self.graph, request.source, weight, nodenum
+            )
+            to_destination = self._latency_distances(
+                reverse, request.destination, weight, nodenum
+            )
+
+            # inf + latency stays inf, which is <= an inf latency
+            # bound; so check reachability separately.  The tolerance
+            # keeps rounding in the distances from pruning links that
+            # are exactly on the bound.
+            through = (
+                from_source[arcs.tails] + arcs.latency + to_destination[arcs.heads]
+            )
+            mask = (
+                (arcs.bandwidth >= required)
+                & np.isfinite(through)
+                & (through <= request.required_latency + 1e-9)
+            )
+            masks.append(mask)
+
+        keep = np.concatenate(masks)
+        self._logger.info(
+            f"Pruned {len(keep) - np.count_nonzero(keep)} of {len(keep)} variables"
+        )
+        return keep
+
+    def _latency_distances(self, graph, source, weight, nodenum):
         """
-        nodenum = len(g.nodes)
-        linknum = 2 * len(g.edges)
+        Return an array of least latency distances from source to
+        every node, inf for unreachable nodes.
+        """
+        distances = np.full(nodenum, np.inf)
+        if source not in graph:
+            return distances
+
+        lengths = nx.single_source_dijkstra_path_length(graph, source, weight=weight)
+        for node, length in lengths.items():
+            distances[node] = length
+
+        return distances
 
-        # Adjcent matrix, key:node; value:list of neighboring nodes
-        adj = nx.to_dict_of_lists(g)
+    def _constraint_rows_to_keep(self, rows, vals, bounds, num_equality):
+        """
+        Return a boolean mask over the constraint rows, False for rows
+        that hold for any assignment of the binary variables: empty
+        equality rows with a zero bound, and inequality rows whose
+        coefficients add up to no more than their bound.
+        """
+        num_rows = len(bounds)
+        nnz = np.bincount(rows, minlength=num_rows)
+        max_lhs = np.bincount(rows, weights=np.maximum(vals, 0), minlength=num_rows)
 
-        keys = adj.keys()
-        links = []
-        # list of all links
+        keep = max_lhs > bounds
+        keep[:num_equality] = (nnz[:num_equality] > 0) | (bounds[:num_equality] != 0)
 
-        for k in keys:
-            links = chain(links, zip(cycle([k]), adj[k]))
+        return keep
 
-        # list of links directional: tuple (src,nei), len =2*#edges
-        link_list = list(links)
-        # print(link_list)
+    def _coo_to_csr(self, rows, cols, vals, num_rows):
+        """
+        Convert (row, column, value) triplets to CSR arrays, dropping
+        zero coefficients.
+        """
+        nonzero = vals != 0
+        rows = rows[nonzero]
+        cols = cols[nonzero]
+        vals = vals[nonzero]
 
-        # flow matrix: 1 means flow into the nodes, -1 meanse flow out of the node
-        inputmatrix = np.zeros((nodenum, linknum), dtype=int)
-        n = 0
-        for link in link_list:
-            src = link[0]
-            dest = link[1]
-            # print(str(src)+":"+str(dest)+"\n")
-            inputmatrix[src][n] = -1
-            inputmatrix[dest][n] = 1
-            n += 1
+        order = np.lexsort((cols, rows))
+        indptr = np.zeros(num_rows + 1, dtype=int)
+        np.cumsum(np.bincount(rows, minlength=num_rows), out=indptr[1:])
 
-        return inputmatrix, link_list
+        return indptr, cols[order], vals[order]
 
-    def _lhsflow(self, request_list, inputmatrix):
+    def _flow_matrix(self, g):
         """
-        lefthand matrix of the network flow equation. shape: (len(tm)*numnode, len(num)*2*numedge)
+        Generate the network flow matrix, in sparse form.
+
+        Returns a (tails, heads, links) tuple, where links is the list
+        of directional links (2*#edges), and tails and heads are
+        arrays of their endpoints.  In the flow matrix, column n has
+        -1 (flow out of the node) at row tails[n] and 1 (flow into the
+        node) at row heads[n].
+        """
+        arcs = ArcIndex.for_graph(g)
+        return arcs.tails, arcs.heads, arcs.links
+
+    def _lhsflow(self, request_list, tails, heads, nodenum):
+        """
+        Lefthand matrix of the network flow equation, as (rows,
+        columns, values) arrays.  shape: (len(tm)*numnode,
+        len(tm)*2*numedge)
+
+        The flow matrix is repeated along the diagonal, once per
+        request.
         """
         r = len(request_list)
-        m, n = inputmatrix.shape
-        self._logger.info(f"_lhsflow: r={r}:m={m}:n={n}")
-        # out = np.zeros((r,m,r,n), dtype=inputmatrix.dtype)
-        # diag = np.einsum('ijik->ijk',out)
-        # diag[:] = inputmatrix
-        # print("diag:" + str(diag.shape))
-        # return diag.reshape(m*r,n*r)
-        # print(inputmatrix)
-        out = np.zeros((r * m, r * n), dtype=inputmatrix.dtype)
-        for i in range(r):
-            out[i * m : (i + 1) * m, i * n : (i + 1) * n] = inputmatrix
-        self._logger.info(f"lhsflow: out: {out.shape}")
-        return out
-
-    def _lhsbw(self, request_list, inputmatrix):
-        """
-        Form bandwidth constraints.
+        n = len(tails)
+        self._logger.info(f"_lhsflow: r={r}:m={nodenum}:n={n}")
+
+        offsets = np.arange(r)[:, None]
+        cols = (np.arange(n)[None, :] + offsets * n).ravel()
+
+        rows = np.concatenate(
+            (
+                (tails[None, :] + offsets * nodenum).ravel(),
+                (heads[None, :] + offsets * nodenum).ravel(),
+            )
+        )
+        cols = np.concatenate((cols, cols))
+        vals = np.concatenate((np.full(r * n, -1.0), np.full(r * n, 1.0)))
+
+        self._logger.info(f"lhsflow: nnz: {len(vals)}")
+        return rows, cols, vals
+
+    def _lhsbw(self, request_list, links):
+        """
+        Form bandwidth constraints, as (rows, columns, values) arrays.
 
         To learn what this means, see the formulation diagram at
         https://github.com/atlanticwave-sdx/pce/tree/main/Documentation.
 
-        The yellow portion of the diagram is the "inputmatrix" input
-        to this function.  The return value should represent the green
-        portion, which is the bandwidth constraints computed here.
-        """
-        bwconstraints = []
-        # zeros = self.zerolistmaker(len(inputmatrix[0])*len(request_list))
-        zeros = np.zeros(len(inputmatrix[0]) * len(request_list), dtype=int)
-        for i in range(len(inputmatrix[0])):
-            addzeros = copy.deepcopy(zeros)
-            bwconstraints.append(addzeros)
-            count = 0
-
-            for request in request_list:
-                # print(
-                #     f"bwconstraints: {bwconstraints}, request: {request}, request_list: {request_list}"
-                # )
-                # print(
-                #     f"i: {i}, count: {count} len(inputmatrix[0]): {len(inputmatrix[0])}, inputmatrix: {inputmatrix}"
-                # )
-                # print(
-                #     f"i + count * len(inputmatrix[0]: {i + count * len(inputmatrix[0])}"
-                # )
-
-                k = i + count * len(inputmatrix[0])
-                bwconstraints[i][k] = request.required_bandwidth
-                count += 1
-
-        return bwconstraints
-
-    def _make_latency_constaints(self, links):
-        lhs = []
-        rhs = []
+        The yellow portion of the diagram is the flow matrix.  The
+        return value should represent the green portion, which is the
+        bandwidth constraints computed here: row i has the bandwidth
+        of every request at the columns of link i.
+        """
+        r = len(request_list)
+        n = len(links)
 
-        request_list = self.tm.connection_requests
+        bandwidths = np.array(
+            [request.required_bandwidth for request in request_list], dtype=float
+        )
 
-        self._logger.info(f"request: {len(request_list)}, links: {len(links)}")
+        rows = np.tile(np.arange(n), r)
+        cols = np.arange(r * n)
+        vals = np.repeat(bandwidths, n)
 
-        zerolist = np.zeros(len(links), dtype=int)
-        latency_list = []
-        for link in links:
-            latency_list.append(self.graph[link[0]][link[1]][Constants.LATENCY])
+        return rows, cols, vals
 
+    def _make_latency_constaints(self, arcs: ArcIndex):
+        request_list = self.tm.connection_requests
+        num_links = len(arcs.links)
+
+        self._logger.info(f"request: {len(request_list)}, links: {num_links}")
+
+        # Row i has the link latencies at the columns of request i.
         requestnum = len(request_list)
-        for i in range(requestnum):
-            constraint = []
-            constraint = (
-                i * zerolist.tolist()
-                + latency_list
-                + (requestnum - 1 - i) * zerolist.tolist()
-            )
-            # print("constraint:"+str(len(constraint)))
-            lhs.append(constraint)
+        rows = np.repeat(np.arange(requestnum), num_links)
+        cols = np.arange(requestnum * num_links)
+        vals = np.tile(arcs.latency, requestnum)
 
+        rhs = []
         for request in request_list:
             rhs.append(request.required_latency)
 
         latdata = {}
-        latdata["lhs"] = lhs
+        latdata["lhs"] = (rows, cols, vals)
         latdata["rhs"] = rhs
 
         return latdata
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List, Mapping
+from typing import List, Mapping, Optional
 
 from dataclasses_json import dataclass_json
 
@@ -49,6 +49,27 @@ class ConnectionPath:
     destination: int
 
 
+@dataclass_json
+@dataclass(frozen=True)
+class SolverStatistics:
+    """
+    How a TE Solver result was found.
+
+    ``optimal`` is False when the solver stopped at its time limit or
+    MIP gap with a feasible, but not proven optimal, solution; ``gap``
+    is then the relative gap between the solution and the best bound.
+    It is also False when the LP relaxation has a fractional solution,
+    which has no paths.
+    ``wall_time`` is in milliseconds.
+    """
+
+    optimal: bool
+    gap: float
+    wall_time: float
+    nodes: int
+    iterations: int
+
+
 @dataclass_json
 @dataclass(frozen=True)
 class ConnectionSolution:
@@ -61,6 +82,7 @@ class ConnectionSolution:
     connection_map: Mapping[ConnectionRequest, List[ConnectionPath]]
     cost: float
     request_id: str
+    statistics: Optional[SolverStatistics] = None
 
 
 # The classess below should help us construct a breakdown of the below
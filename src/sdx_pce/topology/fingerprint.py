@@ -0,0 +1,82 @@
+"""
+Fingerprints of OXP topology data.
+
+OXPs push their topology every polling interval, and most pushes are
+either the same as the previous one, or change only the status or
+state of a few links and ports.  Comparing the fingerprints of two
+pushes of a topology tells these cases apart from pushes that change
+the topology itself, without importing either of them.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+# Fields of links and ports that OXPs change as the network changes,
+# without changing the topology.
+STATE_FIELDS = ("status", "state")
+
+
+@dataclass(frozen=True)
+class TopologyFingerprint:
+    """
+    Fingerprint of the data of a topology.
+    """
+
+    # Version of the topology.
+    version: Any
+
+    # Hash of the whole topology data.
+    digest: str
+
+    # Hash of the topology data without its version, its timestamp,
+    # and the status and state of its links and ports.
+    structure: str
+
+    def same_structure(self, other: "TopologyFingerprint") -> bool:
+        """
+        Return True when other differs from this fingerprint in at
+        most the version, the timestamp, and link and port status and
+        state.
+        """
+        return self.structure == other.structure
+
+
+def topology_fingerprint(topology_data: dict) -> TopologyFingerprint:
+    """
+    Return the fingerprint of the data of a topology.
+    """
+
+    def without_state(element: dict) -> dict:
+        return {k: v for k, v in element.items() if k not in STATE_FIELDS}
+
+    structure = {
+        k: v for k, v in topology_data.items() if k not in ("version", "timestamp")
+    }
+    structure["nodes"] = [
+        {**node, "ports": [without_state(port) for port in node.get("ports", [])]}
+        for node in topology_data.get("nodes", [])
+    ]
+    structure["links"] = [
+        without_state(link) for link in topology_data.get("links", [])
+    ]
+
+    return TopologyFingerprint(
+        version=topology_data.get("version"),
+        digest=_digest(topology_data),
+        structure=_digest(structure),
+    )
+
+
+def element_digests(elements: List[dict]) -> Dict[str, str]:
+    """
+    Return the digests of the data of some nodes or links of a
+    topology, by ID.
+    """
+    return {element.get("id"): _digest(element) for element in elements}
+
+
+def _digest(data: dict) -> str:
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
@@ -1,7 +1,7 @@
 import copy
 import datetime
 import logging
-from typing import Mapping
+from typing import List, Mapping, Optional, Tuple
 
 import networkx as nx
 from sdx_datamodel.models.link import Link
@@ -14,9 +14,156 @@ from sdx_datamodel.parsing.topologyhandler import TopologyHandler
 
 from sdx_pce.utils.constants import Constants
 
+from .fingerprint import STATE_FIELDS, element_digests
 from .grenmlconverter import GrenmlConverter
 
 
+def _port_id(port) -> str:
+    """
+    Return the ID of a link's port, which may be an ID or a dict.
+    """
+    return port if isinstance(port, str) else port["id"]
+
+
+def _changed_elements(old_elements, new_elements, old_digests, new_digests):
+    """
+    Compare the nodes or the links of two versions of a topology, by
+    the digests of the data they were imported from, and by their
+    status and state, which links take from their ports here.
+
+    Return the IDs of the old elements that are gone or have changed,
+    the new elements that are new or have changed, and the elements of
+    the new version, with the old ones in place of those that have not
+    changed.
+    """
+    old_elements = {element.id: element for element in old_elements}
+    stale_ids = []
+    fresh = []
+    elements = []
+
+    for element in new_elements:
+        old_element = old_elements.pop(element.id, None)
+        digest = new_digests.get(element.id)
+        if old_element is None:
+            fresh.append(element)
+        elif (
+            digest is None
+            or old_digests.get(element.id) != digest
+            or _state(old_element) != _state(element)
+        ):
+            stale_ids.append(element.id)
+            fresh.append(element)
+        else:
+            element = old_element
+        elements.append(element)
+
+    stale_ids.extend(old_elements)
+    return stale_ids, fresh, elements
+
+
+def _state(element) -> tuple:
+    """
+    Return the status and state of a node or a link.
+    """
+    return tuple(getattr(element, field, None) for field in STATE_FIELDS)
+
+
+def _topology_digests(data):
+    """
+    Return the digests of the nodes and of the links of the data of a
+    topology, by ID.
+    """
+    return element_digests(data.get("nodes", [])), element_digests(
+        data.get("links", [])
+    )
+
+
+class _TopologyElements:
+    """
+    The nodes, links and ports of a topology, by ID.
+    """
+
+    def __init__(self, topology):
+        self.nodes = {node.id: node for node in topology.nodes}
+        self.links = {link.id: link for link in topology.links}
+        self.ports = {port.id: port for node in topology.nodes for port in node.ports}
+
+
+class _TopologyIndex:
+    """
+    Lookup tables of a topology's ports and links, kept up to date as
+    nodes and links are added and removed.
+    """
+
+    def __init__(self, topology):
+        # Port ID to port, port ID to the ID of its node, and node ID
+        # to the IDs of its ports.
+        self.ports = {}
+        self.port_nodes = {}
+        self.node_ports = {}
+
+        # Link ID to link, and port ID to the {link ID: link} of the
+        # links attached to the port.
+        self.links = {}
+        self.port_links = {}
+
+        self.add_nodes(topology.nodes)
+        self.add_links(topology.links)
+
+    def add_nodes(self, nodes):
+        for node in nodes:
+            self.node_ports[node.id] = [port.id for port in node.ports]
+            for port in node.ports:
+                self.ports[port.id] = port
+                self.port_nodes[port.id] = node.id
+
+    def remove_node(self, node_id):
+        for port_id in self.node_ports.pop(node_id, []):
+            if self.port_nodes.get(port_id) == node_id:
+                del self.ports[port_id]
+                del self.port_nodes[port_id]
+
+    def add_links(self, links):
+        for link in links:
+            self.links[link.id] = link
+            for port in link.ports:
+                self.port_links.setdefault(_port_id(port), {})[link.id] = link
+
+    def remove_link(self, link_id):
+        link = self.links.pop(link_id, None)
+        if link is None:
+            return
+
+        for port in link.ports:
+            port_id = _port_id(port)
+            links = self.port_links.get(port_id, {})
+            links.pop(link_id, None)
+            if not links:
+                self.port_links.pop(port_id, None)
+
+    def link_between_ports(self, port_id_0, port_id_1):
+        """
+        Return the first link attached to both ports, or None.
+        """
+        for link in self.port_links.get(port_id_0, {}).values():
+            if any(_port_id(port) == port_id_1 for port in link.ports):
+                return link
+        return None
+
+    def ports_between_nodes(self, node_id_0, node_id_1):
+        """
+        Return the IDs of the ports at either end of the first link
+        between two nodes, or None.
+        """
+        for port_id in self.node_ports.get(node_id_0, []):
+            for link in self.port_links.get(port_id, {}).values():
+                for port in link.ports:
+                    other = _port_id(port)
+                    if other != port_id and self.port_nodes.get(other) == node_id_1:
+                        return port_id, other
+        return None
+
+
 class TopologyManager:
     """
     Manager for topology operations.
@@ -42,6 +189,31 @@ class TopologyManager:
         # Mapping from port ID to link.
         self._port_link_map = {}
 
+        # Index of the merged topology, built when needed.  Nodes and
+        # links of the merged topology are added and removed with
+        # _add_nodes(), _remove_node(), _add_links() and _remove_link(),
+        # which keep it up to date.
+        self._index = None
+
+        # IDs of the links and nodes of the merged topology that were
+        # added, removed or changed since pop_link_changes() and
+        # pop_node_changes() were last called, or None when all of
+        # them may have.
+        self._link_changes = None
+        self._node_changes = None
+
+        # Mapping from topology ID to the ports of that topology.
+        self._domain_port_maps = {}
+
+        # Mapping from topology ID to the digests of the data of its
+        # nodes and of its links, by ID, as last added or updated.
+        self._domain_digests = {}
+
+        # Mappings from node ID and port ID to the ID of the topology
+        # (domain) that they belong to.
+        self._node_domain_map = {}
+        self._port_domain_map = {}
+
         # Number of interdomain links we computed.
         self._num_interdomain_link = 0
 
@@ -88,6 +260,7 @@ class TopologyManager:
 
     def set_topology(self, topology):
         self._topology = topology
+        self._invalidate_index()
 
     def get_topology(self):
         return self._topology
@@ -114,13 +287,21 @@ class TopologyManager:
         self._topology = None
         self._topology_map = {}
         self._port_link_map = {}
+        self._domain_port_maps = {}
+        self._domain_digests = {}
+        self._invalidate_index()
+        self._node_domain_map = {}
+        self._port_domain_map = {}
 
     def add_topology(self, data):
         topology = TopologyHandler().import_topology_data(data)
         self._topology_map[topology.id] = topology
+        self._domain_digests[topology.id] = _topology_digests(data)
+        self._add_domain_entries(topology)
 
         if self._topology is None:
             self._topology = copy.deepcopy(topology)
+            self._invalidate_index()
             interdomain_ports = []
 
             # Generate a new topology id
@@ -142,11 +323,11 @@ class TopologyManager:
 
             # Nodes
             nodes = topology.nodes
-            self._topology.add_nodes(nodes)
+            self._add_nodes(nodes)
 
             # links
             links = topology.links
-            self._topology.add_links(links)
+            self._add_links(links)
 
             # version
             self.update_version(True)
@@ -163,6 +344,7 @@ class TopologyManager:
         for node in nodes:
             for port in node.ports:
                 self._port_map[port.id] = port
+        self._add_domain_ports(topology)
 
         # inter-domain links
         self.add_inter_domain_links(topology, interdomain_ports)
@@ -179,14 +361,33 @@ class TopologyManager:
 
         TODO: This function name may be a misnomer?
         """
-        domain_id = None
-        # print(f"len of topology_list: {len(self._topology_map)}")
-        for topology_id, topology in self._topology_map.items():
-            if topology.has_node_by_id(node_id):
-                domain_id = topology_id
-                break
+        return self._node_domain_map.get(node_id)
 
-        return domain_id
+    def get_domain_name_by_port(self, port_id):
+        """
+        Find the topology ID associated with the given port ID.
+        """
+        return self._port_domain_map.get(port_id)
+
+    def _add_domain_entries(self, topology):
+        """
+        Map the nodes and ports of a topology to its ID.
+        """
+        for node in topology.nodes:
+            self._node_domain_map[node.id] = topology.id
+            for port in node.ports:
+                self._port_domain_map[port.id] = topology.id
+
+    def _remove_domain_entries(self, topology):
+        """
+        Forget the nodes and ports of a topology that map to its ID.
+        """
+        for node in topology.nodes:
+            if self._node_domain_map.get(node.id) == topology.id:
+                del self._node_domain_map[node.id]
+            for port in node.ports:
+                if self._port_domain_map.get(port.id) == topology.id:
+                    del self._port_domain_map[port.id]
 
     def generate_id(self):
         self._topology.id = SDX_TOPOLOGY_ID_prefix
@@ -194,10 +395,42 @@ class TopologyManager:
         return id
 
     def remove_topology(self, topology_id):
-        self._topology_map.pop(topology_id, None)
+        """
+        Remove a domain topology, and its nodes and links, including
+        its inter-domain links, from the merged topology.
+        """
+        topology = self._topology_map.pop(topology_id, None)
+        self._domain_digests.pop(topology_id, None)
+        if topology is not None:
+            self._remove_domain_elements(topology)
+            self._remove_domain_entries(topology)
+            self._remove_domain_ports(topology)
         self.update_version(False)
         self.update_timestamp()
 
+    def _remove_domain_elements(self, topology):
+        """
+        Remove the nodes of a domain topology from the merged topology,
+        with the links attached to their ports.
+        """
+        index = self._get_index()
+        node_ids = [node.id for node in topology.nodes if node.id in index.node_ports]
+
+        link_ids = {}
+        for node_id in node_ids:
+            for port_id in index.node_ports[node_id]:
+                link_ids.update(dict.fromkeys(index.port_links.get(port_id, {})))
+
+        for link_id in link_ids:
+            link = index.links[link_id]
+            self._remove_link(link_id)
+            for port in link.ports:
+                if self._port_link_map.get(_port_id(port)) is link:
+                    del self._port_link_map[_port_id(port)]
+
+        for node_id in node_ids:
+            self._remove_node(node_id)
+
     def is_link_interdomain(self, link, topology):
         """
         Check if a link is an interdomain link.
@@ -223,63 +456,69 @@ class TopologyManager:
         return port_id.split(":")[3] != topology_id.split(":")[3]
 
     def get_down_nni_links(self, topology):
-        down_nni_links = []
-        for node in topology.nodes:
-            for port in node.ports:
-                if port.nni and port.status == "down":
-                    old_port = self.get_port_obj_by_id(self._topology, port.id)
-                    if old_port and old_port.status == "up":
-                        link = self._port_link_map.get(port.id)
-                        if link and link not in down_nni_links:
-                            down_nni_links.append(link)
-        return down_nni_links
+        return self._get_nni_links(topology, "down", "up")
 
     def get_up_nni_links(self, topology):
-        up_nni_links = []
+        return self._get_nni_links(topology, "up", "down")
+
+    def _get_nni_links(self, topology, status, old_status):
+        """
+        Get the links of the NNI ports of a topology that have the
+        given status, and had old_status in the merged topology.
+        """
+        nni_links = {}
         for node in topology.nodes:
             for port in node.ports:
-                if port.nni and port.status == "up":
+                if port.nni and port.status == status:
                     old_port = self.get_port_obj_by_id(self._topology, port.id)
-                    if old_port and old_port.status == "down":
+                    if old_port and old_port.status == old_status:
                         link = self._port_link_map.get(port.id)
-                        if link and link not in up_nni_links:
-                            up_nni_links.append(link)
-        return up_nni_links
+                        if link:
+                            nni_links.setdefault(link.id, link)
+        return list(nni_links.values())
 
     def get_down_links(self, old_topology, topology):
         """
         Get the links that are down in the new topology.
         """
+        return self._get_down_links(
+            _TopologyElements(old_topology), _TopologyElements(topology)
+        )
+
+    def _get_down_links(self, old_elements, elements):
         down_links = []
-        for link in old_topology.links:
-            if link.status in ("up", None):
-                new_link = topology.get_link_by_id(link.id)
-                if new_link and (
-                    new_link.status == "down" or new_link.state in ("disabled", None)
+        for link in old_elements.links.values():
+            if link.status not in ("up", None):
+                continue
+
+            new_link = elements.links.get(link.id)
+            if new_link and (
+                new_link.status == "down" or new_link.state in ("disabled", None)
+            ):
+                down_links.append(link)
+                continue
+
+            # further check its ports
+            new_port_ids = (
+                {_port_id(port) for port in new_link.ports} if new_link else set()
+            )
+            for port_id in map(_port_id, link.ports):
+                port = old_elements.ports.get(port_id)
+                new_port = (
+                    elements.ports.get(port_id) if port_id in new_port_ids else None
+                )
+                if not new_port or (
+                    port is not None
+                    and (
+                        (port.status == "up" and new_port.status == "down")
+                        or (port.state == "enabled" and new_port.state == "disabled")
+                    )
                 ):
+                    if new_link:
+                        self.update_link_property(new_link.id, "status", "down")
                     down_links.append(link)
-                else:  # further check its ports
-                    for port_id in link.ports:
-                        port = self.get_port_obj_by_id(old_topology, port_id)
-                        new_port_id = (
-                            next((p for p in new_link.ports if p == port_id), None)
-                            if new_link
-                            else None
-                        )
-                        new_port = self.get_port_obj_by_id(topology, new_port_id)
-                        if not new_port or (
-                            (port.status == "up" and new_port.status == "down")
-                            or (
-                                port.state == "enabled" and new_port.state == "disabled"
-                            )
-                        ):
-                            new_link = topology.get_link_by_id(link.id)
-                            if new_link:
-                                new_link = self.update_link_property(
-                                    new_link.id, "status", "down"
-                                )
-                            down_links.append(link)
-                            break
+                    break
+
         if down_links:
             self._logger.info(
                 f"Down links detected: {[link.id for link in down_links]}"
@@ -296,20 +535,24 @@ class TopologyManager:
         - ports_up_to_down: Ports whose status changed from up to down.
         - ports_down_to_up: Ports whose status changed from down to up.
         """
+        return self._get_uni_ports_status_changed(
+            _TopologyElements(old_topology), _TopologyElements(topology)
+        )
+
+    def _get_uni_ports_status_changed(self, old_elements, elements):
         ports_up_to_down = []
         ports_down_to_up = []
 
         port_link_map = self.get_port_link_map()
 
-        for node in old_topology.nodes:
-            for port in node.ports:
-                if port.id not in port_link_map:  # only count for uni ports
-                    new_port = self.get_port_obj_by_id(topology, port.id)
-                    if new_port:
-                        if port.status == "up" and new_port.status == "down":
-                            ports_up_to_down.append(new_port)
-                        elif port.status == "down" and new_port.status == "up":
-                            ports_down_to_up.append(new_port)
+        for port in old_elements.ports.values():
+            if port.id not in port_link_map:  # only count for uni ports
+                new_port = elements.ports.get(port.id)
+                if new_port:
+                    if port.status == "up" and new_port.status == "down":
+                        ports_up_to_down.append(new_port)
+                    elif port.status == "down" and new_port.status == "up":
+                        ports_down_to_up.append(new_port)
 
         return ports_up_to_down, ports_down_to_up
 
@@ -317,10 +560,15 @@ class TopologyManager:
         """
         Get the links that are down in the new topology.
         """
+        return self._get_up_links(
+            _TopologyElements(old_topology), _TopologyElements(topology)
+        )
+
+    def _get_up_links(self, old_elements, elements):
         up_links = []
-        for link in old_topology.links:
+        for link in old_elements.links.values():
             if link.status in ("down", None) or link.state in ("disabled", None):
-                new_link = topology.get_link_by_id(link.id)
+                new_link = elements.links.get(link.id)
                 if new_link is not None and (
                     new_link.status == "up" and new_link.state in ("enabled", None)
                 ):
@@ -328,76 +576,52 @@ class TopologyManager:
         return up_links
 
     def topology_diff(self, old_topology, topology):
-
-        added_nodes = set()
-        added_links = set()
-        removed_nodes = set()
-        removed_links = set()
-
-        # obtain the objects
-        removed_links_list = []
-        added_links_list = []
-        removed_nodes_list = []
-        added_nodes_list = []
-
-        if old_topology is not None:
-            removed_nodes = set(old_topology.nodes_id()).difference(
-                set(topology.nodes_id())
-            )
-            added_nodes = set(topology.nodes_id()).difference(
-                set(old_topology.nodes_id())
-            )
-            removed_links = set(old_topology.links_id()).difference(
-                set(topology.links_id())
-            )
-            added_links = set(topology.links_id()).difference(
-                set(old_topology.links_id())
-            )
-        else:
+        if old_topology is None:
             self._logger.warning(
                 f"No existing topology found for update: {topology.id}"
             )
             self._logger.info(f"Topology map keys: {list(self._topology_map.keys())}")
-            return (
-                removed_nodes_list,
-                added_nodes_list,
-                removed_links_list,
-                added_links_list,
-            )
-
-        for link_id in removed_links:
-            link_obj = old_topology.get_link_by_id(link_id)
-            if link_obj is not None:
-                removed_links_list.append(link_obj)
-        for link_id in added_links:
-            link_obj = topology.get_link_by_id(link_id)
-            if link_obj is not None:
-                added_links_list.append(link_obj)
-        for node_id in removed_nodes:
-            node_obj = old_topology.get_node_by_id(node_id)
-            if node_obj is not None:
-                removed_nodes_list.append(node_obj)
-        for node_id in added_nodes:
-            node_obj = topology.get_node_by_id(node_id)
-            if node_obj is not None:
-                added_nodes_list.append(node_obj)
+            return [], [], [], [], [], []
+
+        # The nodes, links and ports of both topologies, by ID, for
+        # all of the comparisons below.
+        old_elements = _TopologyElements(old_topology)
+        elements = _TopologyElements(topology)
+
+        removed_nodes_list = [
+            node
+            for node_id, node in old_elements.nodes.items()
+            if node_id not in elements.nodes
+        ]
+        added_nodes_list = [
+            node
+            for node_id, node in elements.nodes.items()
+            if node_id not in old_elements.nodes
+        ]
+        removed_links_list = [
+            link
+            for link_id, link in old_elements.links.items()
+            if link_id not in elements.links
+        ]
+        added_links_list = [
+            link
+            for link_id, link in elements.links.items()
+            if link_id not in old_elements.links
+        ]
 
         # adding the down links to the removed links list
-        down_links = self.get_down_links(old_topology, topology)
-
-        for link in down_links:
-            if link not in removed_links_list:
+        removed_link_ids = {link.id for link in removed_links_list}
+        for link in self._get_down_links(old_elements, elements):
+            if link.id not in removed_link_ids:
+                removed_link_ids.add(link.id)
                 removed_links_list.append(link)
 
         # adding the up links to the added links list
-        up_links = self.get_up_links(old_topology, topology)
-
-        for link in up_links:
-            added_links_list.append(link)
+        added_links_list.extend(self._get_up_links(old_elements, elements))
 
         # getting the uni port list with statuse changed
-        uni_ports_up_to_down, uni_ports_down_to_up = self.get_uni_ports_status_changed(
-            old_topology, topology
+        uni_ports_up_to_down, uni_ports_down_to_up = (
+            self._get_uni_ports_status_changed(old_elements, elements)
         )
 
         return (
@@ -415,49 +639,68 @@ class TopologyManager:
         topology = update_handler.import_topology_data(data)
         old_topology = self._topology_map.get(topology.id)
         self._topology_map[topology.id] = topology
+        self._remove_domain_entries(old_topology)
+        self._add_domain_entries(topology)
+
+        # Find the nodes and links that are gone or have changed
+        # first, so that only those are replaced in the merged
+        # topology, and the rest of it is left alone.  They are told
+        # apart by the data the domain sent, since the old nodes and
+        # links also hold the VLANs and bandwidth left, as published
+        # by TEManager.  The nodes and links that have not changed are
+        # kept in the new topology too, as they are in the merged
+        # topology and the port maps.
+        old_node_digests, old_link_digests = self._domain_digests.get(
+            topology.id, ({}, {})
+        )
+        node_digests, link_digests = _topology_digests(data)
+        self._domain_digests[topology.id] = (node_digests, link_digests)
+
+        stale_node_ids, fresh_nodes, topology.nodes = _changed_elements(
+            old_topology.nodes, topology.nodes, old_node_digests, node_digests
+        )
+        stale_link_ids, fresh_links, topology.links = _changed_elements(
+            old_topology.links, topology.links, old_link_digests, link_digests
+        )
 
         # Nodes.
-        nodes = old_topology.nodes
-        for node in nodes:
-            self._topology.remove_node(node.id)
+        for node_id in stale_node_ids:
+            self._remove_node(node_id)
+        self._remove_domain_ports(old_topology)
 
         # Links.
-        links = old_topology.links
-        for link in links:
+        old_links = {link.id: link for link in old_topology.links}
+        for link_id in stale_link_ids:
+            link = old_links[link_id]
             if not self.is_link_interdomain(link, topology):
-                # print(link.id+";......."+str(link.nni))
-                self._topology.remove_link(link.id)
+                self._remove_link(link.id)
                 for port in link.ports:
-                    port_id = port if isinstance(port, str) else port["id"]
-                    self._port_link_map.pop(port_id)
+                    self._port_link_map.pop(_port_id(port))
 
         # Check the inter-domain links first.
-        interdomain_ports = self.inter_domain_check(topology)
-        if len(interdomain_ports) == 0:
-            self._logger.warning("Warning: no interdomain links detected!")
+        interdomain_ports = self.inter_domain_check(
+            topology, links=fresh_links, nodes=fresh_nodes
+        )
 
         # Nodes.
-        nodes = topology.nodes
-        self._topology.add_nodes(nodes)
+        self._add_nodes(fresh_nodes)
 
         # Links.
-        links = topology.links
-        self._topology.add_links(links)
-
-        # inter-domain links
-        self.add_inter_domain_links(topology, interdomain_ports)
+        self._add_links(fresh_links)
 
         # Update the port node map
         for node in topology.nodes:
             for port in node.ports:
                 self._port_map[port.id] = port
+        self._add_domain_ports(topology)
+
+        # inter-domain links
+        self.add_inter_domain_links(topology, interdomain_ports)
 
         # Addding to the port list
-        links = topology.links
-        for link in links:
+        for link in fresh_links:
             for port in link.ports:
-                port_id = port if isinstance(port, str) else port["id"]
-                self._port_link_map[port_id] = link
+                self._port_link_map[_port_id(port)] = link
 
         # extract the changes for controller rerouting actions: link removal and link down
         (
@@ -477,14 +720,16 @@ class TopologyManager:
         # extra link status changes: up <-> down that is associated with nni port status changes: up <-> down
         # comparing with the global topology to catch nni links
 
-        get_down_nni_links = self.get_down_nni_links(topology)
-        for link in get_down_nni_links:
-            if link not in removed_links_list:
+        removed_link_ids = {link.id for link in removed_links_list}
+        for link in self.get_down_nni_links(topology):
+            if link.id not in removed_link_ids:
+                removed_link_ids.add(link.id)
                 removed_links_list.append(link)
 
-        get_up_nni_links = self.get_up_nni_links(topology)
-        for link in get_up_nni_links:
-            if link not in added_links_list:
+        added_link_ids = {link.id for link in added_links_list}
+        for link in self.get_up_nni_links(topology):
+            if link.id not in added_link_ids:
+                added_link_ids.add(link.id)
                 added_links_list.append(link)
 
         return (
@@ -523,33 +768,41 @@ class TopologyManager:
 
         return ct
 
-    def inter_domain_check(self, topology):
+    def inter_domain_check(self, topology, links=None, nodes=None):
+        """
+        Find the inter-domain ports of a topology, and replace the
+        links of the merged topology that its links supersede.
+
+        :param links: the links of the topology to check, all of them
+            by default.
+        :param nodes: the nodes of the topology whose NNI ports to
+            check, all of them by default.
+        """
         interdomain_port_dict = {}
         interdomain_ports = []
-        interdomain_port_ids = []
-        links = topology.links
-        link_dict = {}
+        interdomain_port_ids = set()
+        if links is None:
+            links = topology.links
         for link in links:
-            link_dict[link.id] = link
             for port in link.ports:
                 port_id = port if isinstance(port, str) else port["id"]
                 interdomain_port_dict[port_id] = link
 
         # match any ports in the existing topology
-        for port_id in interdomain_port_dict:
-            # print("interdomain_port:")
-            # print(port_id)
-            for existing_port, existing_link in self._port_link_map.items():
-                # print(existing_port)
-                if port_id == existing_port:
-                    # print("Interdomain port:" + port_id)
-                    # remove redundant link between two domains
-                    self._topology.remove_link(existing_link.id)
-                    interdomain_port_ids.append(port_id)
-            self._port_link_map[port_id] = interdomain_port_dict[port_id]
+        for port_id, link in interdomain_port_dict.items():
+            existing_link = self._port_link_map.get(port_id)
+            if existing_link is not None:
+                # remove redundant link between two domains
+                self._remove_link(existing_link.id)
+                interdomain_port_ids.add(port_id)
+            self._port_link_map[port_id] = link
+
+        # Ports that matched the existing topology can be on any node.
+        if nodes is None or interdomain_port_ids:
+            nodes = topology.nodes
 
         # count for inter-domain links according to topo spec 2.0.x
-        for node in topology.nodes:
+        for node in nodes:
             for port in node.ports:
                 # interdomain ports based on previous methodology
                 if port.id in interdomain_port_ids:
@@ -569,10 +822,8 @@ class TopologyManager:
         port2_id = port2.id.replace("urn:sdx:port:", "", 1)
         link_id = f"urn:sdx:link:interdomain:{port1_id}:{port2_id}"
 
-        for link in self._topology.links:
-            if link_id == link.id:
-                break
-        else:
+        link = self.get_link_by_id(link_id)
+        if link is None:
             link = Link(
                 id=link_id,
                 name=f"{port1.name}--{port2.name}",
@@ -586,10 +837,11 @@ class TopologyManager:
                 packet_loss=0,
                 availability=100,
             )
-            self._topology.add_links([link])
+            self._add_links([link])
 
         link.status = self.status_map.get((port1.status, port2.status), "down")
         link.state = self.state_map.get((port1.state, port2.state), "disabled")
+        self._link_changed(link.id)
 
     def add_inter_domain_links(self, topology, interdomain_ports):
         """Add inter-domain links (whenever possible)."""
@@ -620,43 +872,49 @@ class TopologyManager:
             self._logger.warning("We do not have a topology yet")
             return None
 
-        links = self._topology.links
-        for link in links:
-            inter_domain_link = False
-            if link.status not in ("up", None) or link.state not in ("enabled", None):
-                continue
-            ports = link.ports
-            end_nodes = []
-            for port in ports:
-                port_id = port if isinstance(port, str) else port["id"]
-                node = self._topology.get_node_by_port(port_id)
-                if node is None:
-                    self._logger.warning(
-                        f"This port (id: {port_id}) does not belong to "
-                        f"any node in the topology, likely a Non-SDX port!"
-                    )
-                    inter_domain_link = True
-                    break
-                else:
-                    end_nodes.append(node)
-                    # print("graph node:"+node.id)
-            if not inter_domain_link:
-                graph.add_edge(end_nodes[0].id, end_nodes[1].id)
-                edge = graph.edges[end_nodes[0].id, end_nodes[1].id]
-                edge["id"] = link.id
-                edge[Constants.LATENCY] = link.latency
-                edge[Constants.BANDWIDTH] = (
-                    link.bandwidth * link.residual_bandwidth * 0.01
-                )
-                edge[Constants.RESIDUAL_BANDWIDTH] = (
-                    link.residual_bandwidth
-                )  # this is a percentage
-                edge["weight"] = 1000.0 * (1.0 / link.residual_bandwidth)
-                edge[Constants.PACKET_LOSS] = link.packet_loss
-                edge[Constants.AVAILABILITY] = link.availability
+        for link in self._topology.links:
+            edge = self.get_graph_edge(link)
+            if edge is not None:
+                node_id_0, node_id_1, attributes = edge
+                graph.add_edge(node_id_0, node_id_1)
+                graph.edges[node_id_0, node_id_1].update(attributes)
 
         return graph
 
+    def get_graph_edge(self, link) -> Optional[Tuple[str, str, dict]]:
+        """
+        Return the (node ID, node ID, attributes) of the graph edge of
+        a link of the merged topology, or None when the link is not up
+        and enabled, or is not between two nodes of the topology.
+        """
+        if link.status not in ("up", None) or link.state not in ("enabled", None):
+            return None
+
+        end_nodes = []
+        for port in link.ports:
+            port_id = port if isinstance(port, str) else port["id"]
+            node = self.get_node_id_by_port(port_id)
+            if node is None:
+                self._logger.warning(
+                    f"This port (id: {port_id}) does not belong to "
+                    f"any node in the topology, likely a Non-SDX port!"
+                )
+                return None
+            end_nodes.append(node)
+            # print("graph node:"+node)
+
+        attributes = {
+            "id": link.id,
+            Constants.LATENCY: link.latency,
+            Constants.BANDWIDTH: link.bandwidth * link.residual_bandwidth * 0.01,
+            # this is a percentage
+            Constants.RESIDUAL_BANDWIDTH: link.residual_bandwidth,
+            "weight": 1000.0 * (1.0 / link.residual_bandwidth),
+            Constants.PACKET_LOSS: link.packet_loss,
+            Constants.AVAILABILITY: link.availability,
+        }
+        return end_nodes[0], end_nodes[1], attributes
+
     def generate_grenml(self):
         self.converter = GrenmlConverter(self._topology)
 
@@ -700,10 +958,11 @@ class TopologyManager:
 
         # 2. check on the inter-domain link?
         # update the interdomain topology
-        link = self._topology.get_link_by_id(link_id)
+        link = self.get_link_by_id(link_id)
 
         if link is not None:
             setattr(link, property, value)
+            self._link_changed(link_id)
             self._logger.info(f"updated the link:{link_id} {property} to {value}")
 
         return link
@@ -715,7 +974,7 @@ class TopologyManager:
         # If it's bandwdith, we need to update the residual bandwidth as a percentage
         # "bandwidth" remains to keep the original port bandwidth in topology json.
         # in the graph model, linkd bandwidth is computed as bandwidth*residual_bandwidth*0.01
-        link = self._topology.get_link_by_port_id(port_id_0, port_id_1)
+        link = self.get_link_by_port_ids(port_id_0, port_id_1)
         if link is not None:
             orignial_bw = link.__getattribute__(Constants.BANDWIDTH)
             residual = link.__getattribute__(property)
@@ -728,6 +987,7 @@ class TopologyManager:
                 else:
                     new_residual = value
                 setattr(link, property, new_residual)
+                self._link_changed(link.id)
                 self._logger.info(
                     "updated the link:"
                     + link._id
@@ -798,33 +1058,185 @@ class TopologyManager:
         """
         Given port id, returns a Port.
         """
-        for node in self.get_topology().nodes:
-            for port in node.ports:
-                if port.id == port_id:
-                    return port.to_dict()
-        return None
+        port = self._get_index().ports.get(port_id)
+        if port is None:
+            return None
+        return port.to_dict()
 
     def get_port_obj_by_id(self, topology, port_id: str):
         """
         Given port id, returns a Port.
         """
+        # The merged topology and the current domain topologies are
+        # indexed; other topologies, such as the previous version of
+        # an updated topology, are searched.
+        if topology is self._topology:
+            return self._get_index().ports.get(port_id)
+
+        domain_ports = self._domain_port_maps.get(topology.id)
+        if (
+            domain_ports is not None
+            and self._topology_map.get(topology.id) is topology
+        ):
+            return domain_ports.get(port_id)
+
         for node in topology.nodes:
             for port in node.ports:
                 if port.id == port_id:
                     return port
         return None
 
+    def get_node_id_by_port(self, port_id: str) -> Optional[str]:
+        """
+        Given port id, returns the ID of the node it belongs to.
+        """
+        return self._get_index().port_nodes.get(port_id)
+
+    def get_link_by_id(self, link_id: str):
+        """
+        Given link id, returns a Link of the merged topology.
+        """
+        return self._get_index().links.get(link_id)
+
+    def get_domain_link_ids(self, topology_id: str) -> List[str]:
+        """
+        Given a topology id, returns the IDs of the links of the merged
+        topology attached to its ports, with its inter-domain links.
+        """
+        index = self._get_index()
+        link_ids = {}
+        for port_id in self._domain_port_maps.get(topology_id, {}):
+            link_ids.update(dict.fromkeys(index.port_links.get(port_id, {})))
+        return list(link_ids)
+
+    def get_link_by_port_ids(self, port_id_0: str, port_id_1: str):
+        """
+        Given the IDs of its two ports, in any order, returns a Link.
+        """
+        return self._get_index().link_between_ports(port_id_0, port_id_1)
+
+    def get_ports_by_node_pair(
+        self, node_id_0: str, node_id_1: str
+    ) -> Optional[Tuple[dict, dict]]:
+        """
+        Given two node IDs, returns the ports at either end of the
+        link between them, as (port on node 0, port on node 1).
+        """
+        port_ids = self._get_index().ports_between_nodes(node_id_0, node_id_1)
+        if port_ids is None:
+            return None
+        return tuple(self.get_port_by_id(port_id) for port_id in port_ids)
+
+    def _get_index(self) -> _TopologyIndex:
+        """
+        Return the index of the merged topology.
+        """
+        if self._index is None:
+            self._index = _TopologyIndex(self._topology)
+        return self._index
+
+    def _invalidate_index(self):
+        self._index = None
+        self._link_changes = None
+        self._node_changes = None
+
+    def _add_nodes(self, nodes):
+        self._topology.add_nodes(nodes)
+        if self._index is not None:
+            self._index.add_nodes(nodes)
+        for node in nodes:
+            self._node_links_changed(node.id)
+
+    def _remove_node(self, node_id):
+        self._node_links_changed(node_id)
+        self._topology.remove_node(node_id)
+        if self._index is not None:
+            self._index.remove_node(node_id)
+
+    def _add_links(self, links):
+        self._topology.add_links(links)
+        if self._index is not None:
+            self._index.add_links(links)
+        for link in links:
+            self._link_changed(link.id)
+
+    def _remove_link(self, link_id):
+        self._topology.remove_link(link_id)
+        if self._index is not None:
+            self._index.remove_link(link_id)
+        self._link_changed(link_id)
+
+    def pop_link_changes(self) -> Optional[List[str]]:
+        """
+        Return the IDs of the links of the merged topology that were
+        added, removed or changed since the previous call, or None
+        when all of them may have, such as on the first call.
+        """
+        link_changes, self._link_changes = self._link_changes, {}
+        return None if link_changes is None else list(link_changes)
+
+    def pop_node_changes(self) -> Optional[List[str]]:
+        """
+        Return the IDs of the nodes that were added to or removed from
+        the merged topology since the previous call, or None when all
+        of them may have, such as on the first call.
+        """
+        node_changes, self._node_changes = self._node_changes, {}
+        return None if node_changes is None else list(node_changes)
+
+    def has_node(self, node_id) -> bool:
+        """
+        Return True if a node is in the merged topology.
+        """
+        return self._topology is not None and node_id in self._get_index().node_ports
+
+    def _link_changed(self, link_id):
+        if self._link_changes is not None:
+            self._link_changes[link_id] = None
+
+    def _node_links_changed(self, node_id):
+        """
+        Record a change to a node, and to the links attached to it,
+        whose ends are found or lost with it.
+        """
+        if self._node_changes is not None:
+            self._node_changes[node_id] = None
+
+        if self._link_changes is None:
+            return
+
+        index = self._get_index()
+        for port_id in index.node_ports.get(node_id, []):
+            for link_id in index.port_links.get(port_id, {}):
+                self._link_changed(link_id)
+
+    def _add_domain_ports(self, topology):
+        """
+        Index the ports of a domain topology.
+        """
+        self._domain_port_maps[topology.id] = {
+            port.id: port for node in topology.nodes for port in node.ports
+        }
+
+    def _remove_domain_ports(self, topology):
+        """
+        Forget the ports of a domain topology, including in the port
+        map, unless another topology has them now.
+        """
+        ports = self._domain_port_maps.pop(topology.id, {})
+        for port_id, port in ports.items():
+            if self._port_map.get(port_id) is port:
+                del self._port_map[port_id]
+
     def are_two_ports_same_domain(self, port1_id: str, port2_id: str):
         """
         Check if two ports are in the same domain.
         """
-        node1 = self.get_topology().get_node_by_port(port1_id)
-        node2 = self.get_topology().get_node_by_port(port2_id)
-        if node1 is None or node2 is None:
+        domain1 = self.get_domain_name_by_port(port1_id)
+        domain2 = self.get_domain_name_by_port(port2_id)
+        if domain1 is None or domain2 is None:
             return False
 
-        domain1 = self.get_domain_name(node1.id)
-        domain2 = self.get_domain_name(node2.id)
         return domain1 == domain2
 
     def update_node_property(self):
@@ -0,0 +1,152 @@
+"""
+Store of the connection solutions placed by TEManager.
+
+Solutions are kept by request ID.  Each solution is also indexed by
+the links and ports that its path traverses and by the domains that
+it spans, so that the connections affected by a topology change, such
+as a removed link, can be found without going through every solution.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sdx_pce.models import ConnectionSolution
+
+
+class SolutionStore:
+    """
+    A ``{request_id: ConnectionSolution}`` store, with secondary
+    indexes by link ID, port ID and domain.  It is safe to use from
+    several threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._solutions: Dict[str, ConnectionSolution] = {}
+
+        # The (links, ports, domains) keys of each request, so that
+        # its index entries can be removed with it.
+        self._keys: Dict[str, Tuple[Set[str], Set[str], Set[str]]] = {}
+
+        # {key: {request_id: None}} indexes.  Dicts keep the request
+        # IDs in the order they were stored.
+        self._by_link: Dict[str, Dict[str, None]] = defaultdict(dict)
+        self._by_port: Dict[str, Dict[str, None]] = defaultdict(dict)
+        self._by_domain: Dict[str, Dict[str, None]] = defaultdict(dict)
+
+    def add(
+        self,
+        solution: ConnectionSolution,
+        links: Iterable[str] = (),
+        ports: Iterable[str] = (),
+        domains: Iterable[str] = (),
+    ):
+        """
+        Store a solution, replacing any previous solution with the
+        same request ID.
+
+        :param solution: the solution to store.
+        :param links: IDs of the links on the solution's path.
+        :param ports: IDs of the ports on the solution's path.
+        :param domains: IDs of the domains the solution spans.
+        """
+        request_id = solution.request_id
+        keys = (set(links), set(ports), set(domains))
+
+        with self._lock:
+            self._unindex(request_id)
+
+            self._solutions[request_id] = solution
+            self._keys[request_id] = keys
+
+            for index, index_keys in zip(self._indexes(), keys):
+                for key in index_keys:
+                    index[key][request_id] = None
+
+    def remove(self, request_id: str) -> Optional[ConnectionSolution]:
+        """
+        Remove and return the solution of a request, or None if there
+        is no such solution.
+        """
+        with self._lock:
+            self._unindex(request_id)
+            return self._solutions.pop(request_id, None)
+
+    def get(self, request_id: str) -> Optional[ConnectionSolution]:
+        """
+        Return the solution of a request, or None.
+        """
+        with self._lock:
+            return self._solutions.get(request_id)
+
+    def by_link(self, link_id: str) -> List[ConnectionSolution]:
+        """
+        Return the solutions whose path traverses a link.
+        """
+        return self._lookup(self._by_link, link_id)
+
+    def by_port(self, port_id: str) -> List[ConnectionSolution]:
+        """
+        Return the solutions whose path traverses a port.
+        """
+        return self._lookup(self._by_port, port_id)
+
+    def by_domain(self, domain: str) -> List[ConnectionSolution]:
+        """
+        Return the solutions that span a domain.
+        """
+        return self._lookup(self._by_domain, domain)
+
+    def link_ids(self, request_id: str) -> Set[str]:
+        """
+        Return the IDs of the links on the path of a request's
+        solution, empty if there is no such solution.
+        """
+        with self._lock:
+            keys = self._keys.get(request_id)
+            return set(keys[0]) if keys is not None else set()
+
+    def request_ids(self) -> List[str]:
+        """
+        Return the request IDs of the stored solutions, in the order
+        they were stored.
+        """
+        with self._lock:
+            return list(self._solutions)
+
+    def __contains__(self, request_id) -> bool:
+        with self._lock:
+            return request_id in self._solutions
+
+    def __iter__(self) -> Iterator[ConnectionSolution]:
+        with self._lock:
+            return iter(list(self._solutions.values()))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._solutions)
+
+    def _indexes(self) -> Tuple[dict, dict, dict]:
+        return self._by_link, self._by_port, self._by_domain
+
+    def _lookup(self, index: dict, key: str) -> List[ConnectionSolution]:
+        with self._lock:
+            request_ids = index.get(key, {})
+            return [self._solutions[request_id] for request_id in request_ids]
+
+    def _unindex(self, request_id: str):
+        """
+        Remove the index entries of a request.  The caller holds the
+        lock.
+        """
+        keys = self._keys.pop(request_id, None)
+        if keys is None:
+            return
+
+        for index, index_keys in zip(self._indexes(), keys):
+            for key in index_keys:
+                request_ids = index[key]
+                request_ids.pop(request_id, None)
+                if not request_ids:
+                    del index[key]
@@ -3,7 +3,7 @@ import re
 import threading
 import traceback
 from itertools import chain
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 import networkx as nx
 from networkx.algorithms import approximation as approx
@@ -16,6 +16,7 @@ from sdx_datamodel.parsing.exceptions import (
 )
 from sdx_datamodel.validation.connectionvalidator import ConnectionValidator
 
+from sdx_pce.load_balancing.incremental_solver import IncrementalTESolver
 from sdx_pce.models import (
     ConnectionPath,
     ConnectionRequest,
@@ -26,7 +27,11 @@ from sdx_pce.models import (
     VlanTaggedBreakdowns,
     VlanTaggedPort,
 )
+from sdx_pce.topology.fingerprint import TopologyFingerprint, topology_fingerprint
 from sdx_pce.topology.manager import TopologyManager
+from sdx_pce.topology.solution_store import SolutionStore
+from sdx_pce.topology.topology_graph import TopologyGraph
+from sdx_pce.topology.vlan_table import UNUSED_VLAN, VlanTable, first_common_free
 from sdx_pce.utils.constants import Constants
 from sdx_pce.utils.exceptions import (
     RequestValidationError,
@@ -36,7 +41,6 @@ from sdx_pce.utils.exceptions import (
     ValidationError,
 )
 
-UNUSED_VLAN = None
 MAX_OXP_DEFAULT = 4294967295
 
 
@@ -61,12 +65,33 @@ class TEManager:
 
         self._logger = logging.getLogger(__name__)
 
-        # Keep a list of solved solution ConnectionSolution:connectionSolution.
-        self._connectionSolution_list = []
+        # Solved ConnectionSolutions, by request ID, link, port and
+        # domain.
+        self._connection_solutions = SolutionStore()
 
-        # A {domain, {port, {vlan, in_use}}} mapping.
+        # A {domain, {port, {vlan, in_use}}} mapping.  The innermost
+        # {vlan, in_use} tables are VlanTable objects.
         self._vlan_tags_table = {}
 
+        # A {request_id: [(domain, port, start, stop)]} mapping of the
+        # VLANs reserved for each request, as start..stop-1 ranges.
+        self._vlan_reservations = {}
+
+        # The (domain, port) pairs whose VLAN allocation changed since
+        # their available VLAN ranges were last published.
+        self._dirty_vlan_ports: Set[Tuple[str, str]] = set()
+
+        # The graph of the topology, kept up to date by
+        # generate_graph_te(), and its {node_id: graph node} mapping.
+        self._topology_graph = TopologyGraph()
+        self.graph = None
+        self._graph_node_index: Dict[str, int] = {}
+
+        # Fingerprints of the last data of each topology, by topology
+        # ID, to tell which updates change nothing, or only the status
+        # and state of links and ports.
+        self._topology_fingerprints: Dict[str, TopologyFingerprint] = {}
+
         # Making topology_data optional while investigating
         # https://github.com/atlanticwave-sdx/sdx-controller/issues/145.
         #
@@ -74,13 +99,14 @@ class TEManager:
         # https://github.com/atlanticwave-sdx/pce/issues/122
         if topology_data:
             self.topology_manager.add_topology(topology_data)
+            self._topology_fingerprints[topology_data.get("id")] = (
+                topology_fingerprint(topology_data)
+            )
             self.graph = self.generate_graph_te()
             self._update_vlan_tags_table(
                 domain_name=topology_data.get("id"),
                 port_map=self.topology_manager.get_port_map(),
             )
-        else:
-            self.graph = None
 
     def add_topology(self, topology_data: dict):
         """
@@ -89,6 +115,9 @@ class TEManager:
         :param topology_data: a dictionary that represents a topology.
         """
         self.topology_manager.add_topology(topology_data)
+        self._topology_fingerprints[topology_data.get("id")] = topology_fingerprint(
+            topology_data
+        )
 
         # Ports appear in two places in the combined topology
         # maintained by TopologyManager: attached to each of the
@@ -103,8 +132,47 @@ class TEManager:
         """
         Update an existing topology in TEManager.
 
+        Updates with the same data as the previous one are skipped,
+        and updates that change only the status or state of links and
+        ports take a shorter path.
+
         :param topology_data: a dictionary that represents a topology.
         """
+        topology_id = topology_data.get("id")
+        fingerprint = topology_fingerprint(topology_data)
+
+        # The topology may have been removed from the topology manager
+        # since its fingerprint was taken.
+        if topology_id not in self.get_topology_map():
+            self._topology_fingerprints.pop(topology_id, None)
+        previous = self._topology_fingerprints.get(topology_id)
+
+        if previous == fingerprint:
+            self._logger.info(f"temanager:No changes in topology {topology_id}")
+            return [], [], [], [], [], []
+
+        if previous is not None and previous.same_structure(fingerprint):
+            changes = self._update_topology_states(topology_data)
+        else:
+            changes = self._update_topology(topology_data)
+
+        self._topology_fingerprints[topology_id] = fingerprint
+        return changes
+
+    def remove_topology(self, topology_id: str):
+        """
+        Remove a topology from TEManager.
+
+        :param topology_id: the ID of the topology to remove.
+        """
+        self.topology_manager.remove_topology(topology_id)
+        self._topology_fingerprints.pop(topology_id, None)
+
+    def _update_topology(self, topology_data: dict):
+        """
+        Update an existing topology, and restore the VLAN and bandwidth
+        state of the whole topology after it.
+        """
         # current states
         vlan_tags_table = self._vlan_tags_table
         residul_bw = self.topology_manager.get_residul_bandwidth()
@@ -159,6 +227,49 @@ class TEManager:
             uni_ports_down_to_up,
         )
 
+    def _update_topology_states(self, topology_data: dict):
+        """
+        Update an existing topology whose links and ports changed only
+        in status or state.
+
+        Such an update adds or removes no ports, so the VLAN tags table
+        stays as it is.  Only the links and ports of the topology, and
+        the inter-domain links attached to them, may be replaced, so
+        only their residual bandwidth and available VLANs are restored.
+        """
+        topology_id = topology_data.get("id")
+        link_ids = dict.fromkeys(
+            link.get("id") for link in topology_data.get("links", [])
+        )
+        link_ids.update(
+            dict.fromkeys(self.topology_manager.get_domain_link_ids(topology_id))
+        )
+        residual_bw = self._get_residual_bandwidth(list(link_ids))
+
+        changes = self.topology_manager.update_topology(topology_data)
+
+        with self._topology_lock:
+            self.update_available_bw_in_topology(residual_bw)
+            self._dirty_vlan_ports.update(
+                (topology_id, port_id)
+                for port_id in self._vlan_tags_table.get(topology_id, {})
+            )
+            self.update_available_vlans()
+
+        return changes
+
+    def _get_residual_bandwidth(self, link_ids: List[str]) -> dict:
+        """
+        Get the residual bandwidth of some links of the topology, by
+        link ID.
+        """
+        residual_bw = {}
+        for link_id in link_ids:
+            link = self.topology_manager.get_link_by_id(link_id)
+            if link is not None and link.residual_bandwidth is not None:
+                residual_bw[link_id] = link.residual_bandwidth
+        return residual_bw
+
     def update_available_bw_in_topology(self, bw_table: dict):
         """
         Update available bandwidth in the topology.
@@ -166,17 +277,18 @@ class TEManager:
         :param bw_table: a dictionary that represents available bandwidth.
         """
 
-        for link in self.topology_manager.get_topology().links:
-            if link.id in bw_table:
-                residual_bw = bw_table[link.id]
-                source_port = link.ports[0]
-                destination_port = link.ports[1]
-                self.topology_manager.change_link_property_by_value(
-                    source_port,
-                    destination_port,
-                    Constants.RESIDUAL_BANDWIDTH,
-                    residual_bw,
-                )
+        for link_id, residual_bw in bw_table.items():
+            link = self.topology_manager.get_link_by_id(link_id)
+            if link is None:
+                continue
+            source_port = link.ports[0]
+            destination_port = link.ports[1]
+            self.topology_manager.change_link_property_by_value(
+                source_port,
+                destination_port,
+                Constants.RESIDUAL_BANDWIDTH,
+                residual_bw,
+            )
 
     def get_topology_map(self) -> dict:
         """
@@ -195,12 +307,30 @@ class TEManager:
         """Get failed links on the topology (ie., Links not up and enabled)."""
         return self.topology_manager.get_failed_links()
 
-    def get_connections(self) -> List[ConnectionRequest]:
-        """Get all the connections in the _connectionSolution_list."""
-        connections = []
-        for solution in self._connectionSolution_list:
-            connections.append(solution.request_id)
-        return connections
+    def get_connections(self) -> List[str]:
+        """Get the request IDs of all the connections."""
+        return self._connection_solutions.request_ids()
+
+    def get_connections_on_link(self, link_id: str) -> List[str]:
+        """Get the request IDs of the connections traversing a link."""
+        return [
+            solution.request_id
+            for solution in self._connection_solutions.by_link(link_id)
+        ]
+
+    def get_connections_on_port(self, port_id: str) -> List[str]:
+        """Get the request IDs of the connections traversing a port."""
+        return [
+            solution.request_id
+            for solution in self._connection_solutions.by_port(port_id)
+        ]
+
+    def get_connections_in_domain(self, domain: str) -> List[str]:
+        """Get the request IDs of the connections spanning a domain."""
+        return [
+            solution.request_id
+            for solution in self._connection_solutions.by_domain(domain)
+        ]
 
     @property
     def vlan_tags_table(self) -> dict:
@@ -226,7 +356,7 @@ class TEManager:
                 if not isinstance(port_id, str):
                     raise ValidationError(f"port_id ({port_id}) is not a str")
 
-                if not isinstance(labels, dict):
+                if not isinstance(labels, (dict, VlanTable)):
                     raise ValidationError(f"labels ({labels}) is not a dict")
 
         # We should allow VLAN table to be restored only during
@@ -234,20 +364,46 @@ class TEManager:
         # that we're in the wrong state.
         for domain, ports in self._vlan_tags_table.items():
             for port_id, labels in ports.items():
-                for vlan, status in labels.items():
-                    if status is not UNUSED_VLAN:
-                        raise ValidationError(
-                            f"Error: VLAN table is not empty:"
-                            f"(domain: {domain}, port: {port_id}, vlan: {vlan})"
-                        )
+                for vlan, status in labels.in_use():
+                    raise ValidationError(
+                        f"Error: VLAN table is not empty:"
+                        f"(domain: {domain}, port: {port_id}, vlan: {vlan})"
+                    )
 
-        self._vlan_tags_table = table
+        self._vlan_tags_table = {
+            domain: {
+                port_id: (
+                    labels if isinstance(labels, VlanTable) else VlanTable(labels)
+                )
+                for port_id, labels in ports.items()
+            }
+            for domain, ports in table.items()
+        }
+
+        # The restored table may have VLANs in use.
+        self._vlan_reservations = {}
+        for domain, ports in self._vlan_tags_table.items():
+            for port_id, labels in ports.items():
+                for vlan, request_id in labels.in_use():
+                    self._record_vlan_reservation(
+                        request_id, domain, port_id, vlan, vlan + 1
+                    )
+
+        # What was published may not match the restored table.
+        self._dirty_vlan_ports = {
+            (domain, port_id)
+            for domain, ports in self._vlan_tags_table.items()
+            for port_id in ports
+        }
 
     def update_available_vlans(self, vlan_tags_table=None):
         """
         Update the available VLAN ranges for each domain and port.
         This method iterates through the VLAN tags table and identifies the available VLANs (those with status UNUSED_VLAN).
         It then groups consecutive VLANs into ranges and updates the new VLAN ranges for each domain and port.
+        When vlan_tags_table is None, only the ports of our own table
+        whose VLAN allocation changed since they were last published
+        are updated.
         Returns:
             dict: A dictionary containing the updated VLAN ranges for each domain and port.
         Example:
@@ -276,40 +432,61 @@ class TEManager:
             - The method logs the updated VLAN ranges using the class's logger.
         """
 
-        new_vlan_ranges = {}
-
-        for domain, ports in vlan_tags_table.items():
-            new_vlan_ranges[domain] = {}
-            for port_id, vlans in ports.items():
-                available_vlans = [
-                    vlan for vlan, status in vlans.items() if status == UNUSED_VLAN
-                ]
-                if available_vlans:
-                    ranges = []
-                    start = end = available_vlans[0]
-                    for vlan in available_vlans[1:]:
-                        if vlan == end + 1:
-                            end = vlan
-                        else:
-                            if start == end:
-                                ranges.append(f"{start}")
-                            else:
-                                ranges.append(f"{start}-{end}")
-                            start = end = vlan
-                    if start == end:
-                        ranges.append(f"{start}")
-                    else:
-                        ranges.append(f"{start}-{end}")
-                    new_vlan_ranges[domain][port_id] = ranges
+        if vlan_tags_table is None:
+            dirty_ports, self._dirty_vlan_ports = self._dirty_vlan_ports, set()
+            port_tables = [
+                (domain, port_id, self._vlan_tags_table.get(domain, {}).get(port_id))
+                for domain, port_id in sorted(dirty_ports)
+            ]
+            new_vlan_ranges = {}
+        else:
+            if vlan_tags_table is self._vlan_tags_table:
+                self._dirty_vlan_ports = set()
+            port_tables = [
+                (domain, port_id, vlans)
+                for domain, ports in vlan_tags_table.items()
+                for port_id, vlans in ports.items()
+            ]
+            new_vlan_ranges = {domain: {} for domain in vlan_tags_table}
+
+        for domain, port_id, vlans in port_tables:
+            new_vlan_ranges.setdefault(domain, {})
+            if vlans is None:
+                continue
 
-                    # Update the 'vlan_range' property of the 'service' property in the corresponding port
-                    self.topology_manager.change_port_vlan_range(
-                        domain, port_id, ranges
-                    )
+            ranges = self._available_vlan_ranges(vlans)
+            if ranges:
+                new_vlan_ranges[domain][port_id] = ranges
+
+                # Update the 'vlan_range' property of the 'service' property in the corresponding port
+                self.topology_manager.change_port_vlan_range(domain, port_id, ranges)
 
         self._logger.info(f"Updated VLAN ranges: {new_vlan_ranges}")
         return new_vlan_ranges
 
+    @staticmethod
+    def _available_vlan_ranges(vlans) -> List[str]:
+        """
+        Return the unused VLANs of a port as a list of ranges, such as
+        ['1-5', '7', '10-12'].
+        """
+        if isinstance(vlans, VlanTable):
+            runs = list(vlans.free_ranges())
+        else:
+            runs = []
+            for vlan, status in vlans.items():
+                if status != UNUSED_VLAN:
+                    continue
+                if runs and runs[-1][1] == vlan:
+                    runs[-1] = (runs[-1][0], vlan + 1)
+                else:
+                    runs.append((vlan, vlan + 1))
+
+        return [
+            f"{start}" if start == stop - 1 else f"{start}-{stop - 1}"
+            for start, stop in runs
+        ]
+
     def _update_vlan_tags_table(self, domain_name: str, port_map: dict):
         """
         Update VLAN tags table in a non-disruptive way, meaning: only add new
@@ -337,23 +514,19 @@ class TEManager:
                 self._logger.info(f"label_range on {port.id} is None")
                 continue
 
-            # label_range is of the form ['100-200', '1000']; let
-            # us expand it.  Would have been ideal if this was
-            # already in some parsed form, but it is not, so this
-            # is a work-around.
-            all_labels = self._expand_label_range(label_range)
+            # label_range is of the form ['100-200', '1000']; get the
+            # bounds of each item, without expanding it.
+            label_bounds = [self._label_bounds(label) for label in label_range]
 
             port_vlan_tags_table = self._vlan_tags_table[domain_name].setdefault(
-                port_id, {}
+                port_id, VlanTable()
             )
             # This is temporary since OXP updates only change the topology, nodes and links, not the state
             # So we are not updating the VLAN tags table, which is only updated by PCE actions:
             # provisioning or deletion
             if len(port_vlan_tags_table) == 0:
-                for label in all_labels:
-                    self._vlan_tags_table[domain_name][port_id].setdefault(
-                        label, UNUSED_VLAN
-                    )
+                for start, stop in label_bounds:
+                    port_vlan_tags_table.add_range(start, stop)
 
     def _expand_label_range(self, label_range: []) -> List[int]:
         """
@@ -364,7 +537,6 @@ class TEManager:
         return list(chain.from_iterable(labels))
 
     def _expand_label(self, label) -> List[int]:
-        start = stop = 0
         """
         Expand items in label range to a list of numbers.
 
@@ -372,6 +544,15 @@ class TEManager:
         For the first case, we return [100,101,...200]; for the second
         case, we return [100].
         """
+        return list(range(*self._label_bounds(label)))
+
+    def _label_bounds(self, label) -> Tuple[int, int]:
+        """
+        Return the (start, stop) bounds of an item in a label range,
+        like those of range().
+        """
+        start = stop = 0
+
         if isinstance(label, str):
             parts = label.split("-")
             start = int(parts[0])
@@ -395,7 +576,7 @@ class TEManager:
         if start == 0 or stop == 0 or start > stop:
             raise ValidationError(f"Invalid label range: {label}")
 
-        return list(range(start, stop))
+        return start, stop
 
     def generate_traffic_matrix(self, connection_request: dict) -> TrafficMatrix:
         """
@@ -470,35 +651,31 @@ class TEManager:
                 400,
             )
 
-        topology = self.topology_manager.get_topology()
+        ingress_node_id = self._get_node_id_by_port(ingress_port.id)
+        egress_node_id = self._get_node_id_by_port(egress_port.id)
 
-        ingress_node = topology.get_node_by_port(ingress_port.id)
-        egress_node = topology.get_node_by_port(egress_port.id)
-
-        if ingress_node is None:
+        if ingress_node_id is None:
             self._logger.warning(
                 f"No ingress node was found for ingress port ID '{ingress_port.id}'"
             )
             return None
 
-        if egress_node is None:
+        if egress_node_id is None:
             self._logger.warning(
                 f"No egress node is found for egress port ID '{egress_port.id}'"
             )
             return None
 
-        self._logger.info(f"temanager.graph: {list(self.graph.nodes(data=True))}")
-
-        if ingress_node == egress_node:
+        if ingress_node_id == egress_node_id:
             self._logger.warning(
-                f"Source and destination nodes are the same: {ingress_node.id}"
+                f"Source and destination nodes are the same: {ingress_node_id}"
             )
-            domain_id = self.topology_manager.get_domain_name(ingress_node.id)
+            domain_id = self.topology_manager.get_domain_name(ingress_node_id)
             ingress_user_port_tag = ingress_port.vlan_range
             egree_user_port_tag = egress_port.vlan_range
             self._logger.info(f"Same switch request: {domain_id}")
             raise SameSwitchRequestError(
-                f"Source and destination nodes are the same: {ingress_node.id}",
+                f"Source and destination nodes are the same: {ingress_node_id}",
                 request.id,
                 domain_id,
                 ingress_port.id,
@@ -507,30 +684,25 @@ class TEManager:
                 egree_user_port_tag,
             )
 
-        ingress_nodes = [
-            x for x, y in self.graph.nodes(data=True) if y["id"] == ingress_node.id
-        ]
+        ingress_graph_node = self._graph_node_index.get(ingress_node_id)
+        egress_graph_node = self._graph_node_index.get(egress_node_id)
 
-        egress_nodes = [
-            x for x, y in self.graph.nodes(data=True) if y["id"] == egress_node.id
-        ]
-
-        if len(ingress_nodes) <= 0:
+        if ingress_graph_node is None:
             raise RequestValidationError(
-                f"No path available between endpoints: {ingress_node.id} not found in the graph",
+                f"No path available between endpoints: {ingress_node_id} not found in the graph",
                 412,
             )
 
-        if len(egress_nodes) <= 0:
+        if egress_graph_node is None:
             raise RequestValidationError(
-                f"No path available between endpoints: {egress_node.id} not found in the graph",
+                f"No path available between endpoints: {egress_node_id} not found in the graph",
                 412,
             )
 
         # if one of the ingress_port and egress_port is a nni port between domains, we need to
         # reject this request by throwing RequestValidationError
 
-        ingress_topology_id = self.topology_manager.get_domain_name(ingress_node.id)
+        ingress_topology_id = self.topology_manager.get_domain_name(ingress_node_id)
         ingress_topology = self.topology_manager._topology_map.get(ingress_topology_id)
         ingress_topology_port = self.topology_manager.get_port_obj_by_id(
             ingress_topology, ingress_port.id
@@ -543,7 +715,7 @@ class TEManager:
                 f"Ingress_port is a NNI port: {ingress_port.id}",
                 412,
             )
-        egress_topology_id = self.topology_manager.get_domain_name(egress_node.id)
+        egress_topology_id = self.topology_manager.get_domain_name(egress_node_id)
         egress_topology = self.topology_manager._topology_map.get(egress_topology_id)
         egress_topology_port = self.topology_manager.get_port_obj_by_id(
             egress_topology, egress_port.id
@@ -568,8 +740,8 @@ class TEManager:
         )
 
         request = ConnectionRequest(
-            source=ingress_nodes[0],
-            destination=egress_nodes[0],
+            source=ingress_graph_node,
+            destination=egress_graph_node,
             required_bandwidth=required_bandwidth,
             required_latency=required_latency,
         )
@@ -578,21 +750,121 @@ class TEManager:
 
     def generate_graph_te(self) -> Optional[nx.Graph]:
         """
-        Return the topology graph that we have.
+        Return a graph of the topology that we have.
+
+        TEManager keeps one graph of the topology, and updates only
+        the edges of the links that changed since the previous call.
+        Its nodes keep their numbers while they are in the topology,
+        so that solutions stay valid.  Callers get a copy of it, that
+        solvers are free to change: TESolver sets its link weights,
+        and update_graph() its link bandwidths.
         """
-        graph = self.topology_manager.generate_graph()
-
-        if graph is None:
+        if self.topology_manager.get_topology() is None:
             self._logger.warning("No graph could be generated")
             return None
 
-        graph = nx.convert_node_labels_to_integers(graph, label_attribute="id")
+        node_ids = self.topology_manager.pop_node_changes()
+        link_ids = self.topology_manager.pop_link_changes()
+        if link_ids is None:
+            self._topology_graph.clear_links()
+            link_ids = [link.id for link in self.topology_manager.get_topology().links]
+
+        for link_id in link_ids:
+            link = self.topology_manager.get_link_by_id(link_id)
+            edge = None if link is None else self.topology_manager.get_graph_edge(link)
+            if edge is None:
+                self._topology_graph.remove_link(link_id)
+            else:
+                self._topology_graph.set_link(link_id, *edge)
+
+        # The numbers of the nodes that are gone can go to new nodes.
+        if node_ids is None:
+            node_ids = list(self._topology_graph.nodes)
+        for node_id in node_ids:
+            if not self.topology_manager.has_node(node_id):
+                self._topology_graph.release_node(node_id)
+
+        self.graph = self._topology_graph.graph.copy()
+        self._graph_node_index = self._topology_graph.node_index
+
+        return self.graph
+
+    def reroute_connections(
+        self, request_ids: List[str]
+    ) -> Dict[str, ConnectionSolution]:
+        """
+        Find new paths for placed connections, such as the ones on a
+        link that went down (see get_connections_on_link()).
+
+        The connections are solved again one after the other, in the
+        given order, on the current graph with the bandwidth of their
+        current paths given back.  One IncrementalTESolver solves them
+        all, starting each from its current path.
+
+        Nothing is reserved here: the new solutions are to be given to
+        generate_connection_breakdown(), like the solutions of new
+        connections.
+
+        :return: the new solutions, by request ID.  Connections that
+            have no solution are left out, and connections that have no
+            path left get a solution with no connection_map.
+        """
+        graph = self.generate_graph_te()
+        if graph is None:
+            return {}
+
+        solutions = {}
+        for request_id in request_ids:
+            solution = self._connection_solutions.get(request_id)
+            if solution is None or solution.connection_map is None:
+                self._logger.warning(
+                    f"Can't find a solution for request ID {request_id}"
+                )
+                continue
+            solutions[request_id] = solution
+            self._release_graph_bandwidth(graph, solution)
+
+        solver = IncrementalTESolver(graph)
+        for solution in solutions.values():
+            solver.hint(solution)
+
+        result = {}
+        for request_id, solution in solutions.items():
+            requests = list(solution.connection_map)
+            nodes = chain.from_iterable(
+                (request.source, request.destination) for request in requests
+            )
+            if any(self._topology_graph.node_id(node) is None for node in nodes):
+                self._logger.warning(f"Endpoints of {request_id} are gone")
+                result[request_id] = ConnectionSolution(
+                    connection_map=None, cost=0, request_id=request_id
+                )
+                continue
+
+            tm = TrafficMatrix(connection_requests=requests, request_id=request_id)
+            result[request_id] = solver.solve(tm)
+            solver.reserve(result[request_id])
 
-        # TODO: why is this needed?
-        self.graph = graph
-        # print(list(graph.nodes(data=True)))
+        return result
+
+    def _release_graph_bandwidth(self, graph: nx.Graph, solution: ConnectionSolution):
+        """
+        Give the bandwidth of a placed solution back to the edges of
+        its links in a graph from generate_graph_te().
+        """
+        bandwidth = sum(
+            request.required_bandwidth for request in solution.connection_map
+        )
+        for link_id in self._connection_solutions.link_ids(solution.request_id):
+            edge = self._topology_graph.link_edge(link_id)
+            if edge is not None and graph.has_edge(*edge):
+                graph.edges[edge][Constants.BANDWIDTH] += bandwidth
 
-        return graph
+    def _get_node_id_by_port(self, port_id: str) -> Optional[str]:
+        """
+        Return the ID of the node that a port belongs to, or None.
+        """
+        return self.topology_manager.get_node_id_by_port(port_id)
 
     def graph_node_connectivity(self, source=None, dest=None):
         """
@@ -789,8 +1061,8 @@ class TEManager:
                     self._logger.error(f"{link} is not ConnectionPath")
                     continue
 
-                src_node = self.graph.nodes.get(link.source)
-                dst_node = self.graph.nodes.get(link.destination)
+                src_node = self._topology_graph.node_id(link.source)
+                dst_node = self._topology_graph.node_id(link.destination)
 
                 self._logger.info(
                     f"source node: {src_node}, destination node: {dst_node}"
@@ -802,8 +1074,8 @@ class TEManager:
                     )
                     continue
 
-                src_domain = self.topology_manager.get_domain_name(src_node["id"])
-                dst_domain = self.topology_manager.get_domain_name(dst_node["id"])
+                src_domain = self.topology_manager.get_domain_name(src_node)
+                dst_domain = self.topology_manager.get_domain_name(dst_node)
 
                 # TODO: what do we do when a domain can't be
                 # determined? Can a domain be `None`?
@@ -1003,10 +1275,10 @@ class TEManager:
             # Now it is the time to update the bandwidth of the links after breakdowns are successfully generated
             self.update_link_bandwidth(solution, reduce=True)
             # Update available VLANs in topology
-            self.update_available_vlans(self._vlan_tags_table)
+            self.update_available_vlans()
 
-        # keep the connection solution for future reference
-        self._connectionSolution_list.append(solution)
+            # keep the connection solution for future reference
+            self._store_connection_solution(solution, domain_breakdown)
 
         # Return a dict containing VLAN-tagged breakdown in the
         # expected format.
@@ -1022,23 +1294,17 @@ class TEManager:
             self._logger.error(f"{link} is not ConnectionPath")
             return None, None
 
-        node1 = self.graph.nodes[link.source]["id"]
-        node2 = self.graph.nodes[link.destination]["id"]
+        node1 = self._topology_graph.node_id(link.source)
+        node2 = self._topology_graph.node_id(link.destination)
 
-        ports = self.topology_manager.get_topology().get_port_by_link(node1, node2)
+        ports = self.topology_manager.get_ports_by_node_pair(node1, node2)
 
         # Avoid some possible crashes.
         if ports is None:
             self._logger.error(f"Could not find a port matching {node1} and {node2}")
             return None, None
 
-        n1, p1, n2, p2 = ports
-
-        if n1 != node1 or n2 != node2:
-            self._logger.error(f"Node mismatch: {n1}!={node1} or {n2}!={node2}")
-            return None, None
-
-        return p1, p2
+        return ports
 
     """
     functions for vlan reservation.
@@ -1272,7 +1538,7 @@ class TEManager:
 
         return VlanTaggedBreakdowns(breakdowns=breakdowns)
 
-    def _find_vlan_on_path(self, path):
+    def _find_vlan_on_path(self, path: dict) -> Optional[int]:
         """
         Find an unused available VLAN on path.
 
@@ -1280,13 +1546,23 @@ class TEManager:
         path.  Returns an available VLAN if possible, None if none are
         available on the submitted path.
 
-        output: vlan_tag string or None
-        """
+        :param path: a domain breakdown, of the form {domain:
+            {"ingress_port": port, "egress_port": port}}.
 
-        # TODO: implement this
-        # https://github.com/atlanticwave-sdx/pce/issues/126
-
-        assert False, "Not implemented"
+        output: vlan_tag or None
+        """
+        tables = []
+        for domain, segment in path.items():
+            domain_table = self._vlan_tags_table.get(domain, {})
+            for port in (segment.get("ingress_port"), segment.get("egress_port")):
+                port_id = port.get("id") if port else None
+                vlan_table = domain_table.get(port_id)
+                if vlan_table is None:
+                    self._logger.info(f"No VLAN table for {domain}, port {port_id}")
+                    return None
+                tables.append(vlan_table)
+
+        return first_common_free(tables)
 
     def _reserve_vlan_on_path(self, domain_breakdown, selected_vlan):
         # TODO: what is the difference between reserve_vlan and
@@ -1319,9 +1595,6 @@ class TEManager:
         if upstream_vlan_table is None or downstream_vlan_table is None:
             self._logger.error(f"Can't find VLAN tables for {domain} and {next_domain}")
             return None
-        common_vlans = set(upstream_vlan_table.keys()).intersection(
-            downstream_vlan_table.keys()
-        )
 
         self._logger.info(
             f"Looking for common VLANS for connection_request: {connection_request}"
@@ -1359,29 +1632,32 @@ class TEManager:
                     )
 
                 start, end = map(int, ingress_vlans_str.split(":"))
-                vlans = list(range(start, end + 1))
 
-                for vlan in vlans:
-                    if upstream_vlan_table[vlan] is not UNUSED_VLAN:
+                # Every VLAN in the range must be on both ports, and
+                # none may be in use, by anyone.
+                for side, vlan_table, vlans_str in (
+                    ("Upstream", upstream_vlan_table, ingress_vlans_str),
+                    ("Downstream", downstream_vlan_table, egress_vlans_str),
+                ):
+                    vlan = vlan_table.find_missing(start, end + 1)
+                    if vlan is not None:
                         raise Exception(
-                            f"Upstream VLAN {vlan} is in use; "
-                            f"can't reserve {ingress_vlans_str} range"
+                            f"{side} VLAN {vlan} is not in the range of the port; "
+                            f"can't reserve {vlans_str} range"
                         )
 
-                    if downstream_vlan_table[vlan] is not UNUSED_VLAN:
+                    vlan = vlan_table.find_conflict(start, end + 1, UNUSED_VLAN)
+                    if vlan is not None:
                         raise Exception(
-                            f"Downstream VLAN {vlan} is in use; "
-                            f"can't reserve {egress_vlans_str} range"
+                            f"{side} VLAN {vlan} is in use; "
+                            f"can't reserve {vlans_str} range"
                         )
 
                 return ingress_vlans_str
 
-        for vlan in common_vlans:
-            if (
-                upstream_vlan_table[vlan] is UNUSED_VLAN
-                and downstream_vlan_table[vlan] is UNUSED_VLAN
-            ):
-                return vlan
+        vlan = first_common_free([upstream_vlan_table, downstream_vlan_table])
+        if vlan is not None:
+            return vlan
 
         self._logger.warning(
             f"No common VLAN found between {domain} and {next_domain} "
@@ -1465,32 +1741,36 @@ class TEManager:
 
         if tag in (None, "any"):
             # Find the first available VLAN tag from the table.
-            for vlan_tag, vlan_usage in vlan_table.items():
-                if vlan_usage is UNUSED_VLAN:
-                    available_tag = vlan_tag
+            available_tag = vlan_table.first_free()
+            if available_tag is None:
+                self._logger.error(f"No VLAN available on port {port_id}")
+                return None
         elif tag == "untagged":
             return tag
         elif self._tag_is_vlan_range(tag):
-            # expand the range.
             start, end = map(int, tag.split(":"))
-            vlans = list(range(start, end + 1))
 
-            self._logger.debug(f"Attempting to reseve vlan range {vlans}")
+            self._logger.debug(f"Attempting to reseve vlan range {tag}")
 
             # Check if all VLANs in the range are available.
-            for vlan in vlans:
-                if (
-                    vlan_table[vlan] is not UNUSED_VLAN
-                    and vlan_table[vlan] != request_id
-                ):
-                    raise TEError(
-                        f"VLAN {vlan} is in use; can't reserve {tag}",
-                        409,
-                    )
+            vlan = vlan_table.find_missing(start, end + 1)
+            if vlan is not None:
+                raise TEError(
+                    f"VLAN {vlan} is not in the range of port {port_id}; "
+                    f"can't reserve {tag}",
+                    400,
+                )
+
+            vlan = vlan_table.find_conflict(start, end + 1, request_id)
+            if vlan is not None:
+                raise TEError(
+                    f"VLAN {vlan} is in use; can't reserve {tag}",
+                    409,
+                )
 
             # Mark range in use.
-            for vlan in vlans:
-                vlan_table[vlan] = request_id
+            vlan_table.reserve_range(start, end + 1, request_id)
+            self._record_vlan_reservation(request_id, domain, port_id, start, end + 1)
 
             # self._logger.debug(
             #     f"reserve_vlan domain {domain}, after reservation: "
@@ -1519,6 +1799,9 @@ class TEManager:
 
         # mark the tag as in-use.
         vlan_table[available_tag] = request_id
+        self._record_vlan_reservation(
+            request_id, domain, port_id, available_tag, available_tag + 1
+        )
 
         # self._logger.debug(
         #     f"reserve_vlan domain {domain}, after reservation: "
@@ -1527,26 +1810,37 @@ class TEManager:
 
         return available_tag
 
+    def _record_vlan_reservation(
+        self, request_id: str, domain: str, port_id: str, start: int, stop: int
+    ):
+        """
+        Remember that VLANs start..stop-1 on a port are reserved for a
+        request, so that unreserve_vlan() can find them.
+        """
+        self._vlan_reservations.setdefault(request_id, []).append(
+            (domain, port_id, start, stop)
+        )
+        self._dirty_vlan_ports.add((domain, port_id))
+
     def unreserve_vlan(self, request_id: str):
         """
         Return previously reserved VLANs back to the pool.
         """
-        found_assignment = False
-
-        for domain, port_table in self._vlan_tags_table.items():
-            for port, vlan_table in port_table.items():
-                for vlan, assignment in vlan_table.items():
-                    if assignment == request_id:
-                        vlan_table[vlan] = UNUSED_VLAN
-                        found_assignment = True
+        reservations = self._vlan_reservations.pop(request_id, None)
 
         # We should let the invoker know that we could not find the
         # request ID.
-        if not found_assignment:
+        if not reservations:
             raise UnknownRequestError(
                 "Unknown connection request", request_id=request_id
             )
 
+        for domain, port_id, start, stop in reservations:
+            vlan_table = self._vlan_tags_table.get(domain, {}).get(port_id)
+            if vlan_table is not None:
+                vlan_table.release_range(start, stop, request_id)
+                self._dirty_vlan_ports.add((domain, port_id))
+
     def delete_connection(self, request_id: str):
         """
         Delete a connection.
@@ -1555,29 +1849,54 @@ class TEManager:
         unreserve the VLANs that were reserved for the connection.
         """
         self.unreserve_vlan(request_id)
-        solution = self.get_connection_solution(request_id)
-        if solution is None:
-            self._logger.warning(f"Can't find a solution for request ID {request_id}")
-            return None
-
-        # Remove the solution from the list.
-        self._connectionSolution_list.remove(solution)
 
         with self._topology_lock:
+            solution = self._connection_solutions.remove(request_id)
+            if solution is None:
+                self._logger.warning(
+                    f"Can't find a solution for request ID {request_id}"
+                )
+                return None
+
             # Now it is the time to update the bandwidth of the links after breakdowns are successfully generated
             self.update_link_bandwidth(solution, reduce=False)
             # Update available VLANs in topology
-            self.update_available_vlans(self._vlan_tags_table)
+            self.update_available_vlans()
 
     def get_connection_solution(self, request_id: str) -> Optional[ConnectionSolution]:
         """
         Get a connection solution by request ID.
         """
-        for solution in self._connectionSolution_list:
-            if solution.request_id == request_id:
-                return solution
+        return self._connection_solutions.get(request_id)
 
-        return None
+    def _store_connection_solution(
+        self, solution: ConnectionSolution, domain_breakdown: dict
+    ):
+        """
+        Keep a solution, indexed by the links and ports on its path
+        and by the domains of its breakdown.
+        """
+        _, links = self.get_links_on_path(solution)
+
+        link_ids = set()
+        port_ids = set()
+        for link in links:
+            port_ids.update((link["source"], link["destination"]))
+            topology_link = self.topology_manager.get_link_by_port_ids(
+                link["source"], link["destination"]
+            )
+            if topology_link is not None:
+                link_ids.add(topology_link.id)
+
+        # The breakdown also has the user ports at either end.
+        for segment in domain_breakdown.values():
+            for port in (segment.get("ingress_port"), segment.get("egress_port")):
+                if port and port.get("id"):
+                    port_ids.add(port.get("id"))
+
+        self._connection_solutions.add(
+            solution, links=link_ids, ports=port_ids, domains=domain_breakdown
+        )
 
     def _print_vlan_tags_table(self):
         """
@@ -0,0 +1,234 @@
+"""
+Live graph of a topology, for the solvers.
+
+TEManager used to make a new networkx graph of the merged topology
+before every placement, and to number its nodes from scratch.
+TopologyGraph keeps one graph instead, and updates only the edges of
+the links that change.  Its nodes are numbered by a NodeRegistry,
+so a node keeps its number from one version of the graph to the next,
+and solutions computed on one version can be read on the next.
+"""
+
+import heapq
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import networkx as nx
+
+
+class NodeRegistry:
+    """
+    A two-way mapping between node IDs and integers.
+
+    A node keeps its number until it is released.  The numbers of
+    released nodes are given to new nodes, lowest first, so numbers
+    stay below the largest number of nodes registered at once.
+    """
+
+    def __init__(self):
+        self._numbers: Dict[str, int] = {}
+        # Node ID of each number, None for free numbers.
+        self._node_ids: List[Optional[str]] = []
+        # Heap of the free numbers.
+        self._free: List[int] = []
+
+    def number(self, node_id: str) -> int:
+        """
+        Return the number of a node, registering it if it is new.
+        """
+        number = self._numbers.get(node_id)
+        if number is not None:
+            return number
+
+        if self._free:
+            number = heapq.heappop(self._free)
+            self._node_ids[number] = node_id
+        else:
+            number = len(self._node_ids)
+            self._node_ids.append(node_id)
+
+        self._numbers[node_id] = number
+        return number
+
+    def get(self, node_id: str) -> Optional[int]:
+        """
+        Return the number of a node, or None if it is not registered.
+        """
+        return self._numbers.get(node_id)
+
+    def node_id(self, number: int) -> Optional[str]:
+        """
+        Return the ID of the node with a number, or None.
+        """
+        if 0 <= number < len(self._node_ids):
+            return self._node_ids[number]
+        return None
+
+    def release(self, node_id: str) -> Optional[int]:
+        """
+        Free the number of a node, and return it.
+        """
+        number = self._numbers.pop(node_id, None)
+        if number is not None:
+            self._node_ids[number] = None
+            heapq.heappush(self._free, number)
+        return number
+
+    def trim(self) -> List[int]:
+        """
+        Drop the free numbers above the highest number in use, so that
+        new nodes do not get them, and return them.
+        """
+        trimmed = []
+        while self._node_ids and self._node_ids[-1] is None:
+            self._node_ids.pop()
+            trimmed.append(len(self._node_ids))
+
+        if trimmed:
+            size = len(self._node_ids)
+            self._free = [number for number in self._free if number < size]
+            heapq.heapify(self._free)
+
+        return trimmed
+
+    def __contains__(self, node_id) -> bool:
+        return node_id in self._numbers
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._numbers))
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+
+class TopologyGraph:
+    """
+    A graph with an edge for each up and enabled link of a topology.
+
+    Graph nodes are the integers of the topology nodes in a
+    NodeRegistry, with the ID of the topology node in their "id"
+    attribute.  Graph nodes are always numbered 0..n-1, as TESolver
+    expects, so a graph node stays in the graph when all of its links
+    are gone.  When its topology node is released, the graph node is
+    removed if it has the highest number; otherwise it stays, with a
+    None "id", until its number is reused.  Such a node has no edges,
+    so the solvers never put it on a path, and it is in the way of no
+    connectivity check.  Only the nodes that have links are in
+    node_index.
+    """
+
+    def __init__(self):
+        self.graph = nx.Graph()
+        self.nodes = NodeRegistry()
+
+        # {node_id: graph node} of the nodes that have links.
+        self.node_index: Dict[str, int] = {}
+
+        # {link_id: (u, v)} of the links that have an edge, and the
+        # {link_id: attributes} of the links of each edge.  The edge
+        # has the attributes of the last of them.
+        self._link_edges: Dict[str, Tuple[int, int]] = {}
+        self._edge_links: Dict[Tuple[int, int], Dict[str, dict]] = {}
+
+    def set_link(self, link_id: str, node_id_0: str, node_id_1: str, attributes: dict):
+        """
+        Add or update the edge of a link between two nodes.
+
+        :return: True if the edges of the graph changed, False if only
+            edge attributes did.
+        """
+        edge = self._edge(self._node(node_id_0), self._node(node_id_1))
+        changed = False
+        if self._link_edges.get(link_id, edge) != edge:
+            # The link has moved.
+            changed = self.remove_link(link_id)
+
+        links = self._edge_links.setdefault(edge, {})
+        links[link_id] = attributes
+        self._link_edges[link_id] = edge
+
+        if not self.graph.has_edge(*edge):
+            self.graph.add_edge(*edge)
+            changed = True
+            for node in edge:
+                self.node_index[self.graph.nodes[node]["id"]] = node
+        self.graph.edges[edge].update(next(reversed(links.values())))
+
+        return changed
+
+    def remove_link(self, link_id: str) -> bool:
+        """
+        Remove a link from the graph, and its edge if no other link
+        has the same ends.
+
+        :return: True if the edges of the graph changed.
+        """
+        edge = self._link_edges.pop(link_id, None)
+        if edge is None:
+            return False
+
+        links = self._edge_links[edge]
+        del links[link_id]
+        if links:
+            # Another link joins the same nodes.
+            self.graph.edges[edge].update(next(reversed(links.values())))
+            return False
+
+        del self._edge_links[edge]
+        self.graph.remove_edge(*edge)
+        for node in edge:
+            if self.graph.degree(node) == 0:
+                del self.node_index[self.graph.nodes[node]["id"]]
+        return True
+
+    def clear_links(self):
+        """
+        Remove all the edges, and keep the numbers of the nodes.
+        """
+        self.graph.remove_edges_from(list(self.graph.edges))
+        self.node_index.clear()
+        self._link_edges.clear()
+        self._edge_links.clear()
+
+    def release_node(self, node_id: str) -> bool:
+        """
+        Free the number of a node that has no links, for another node
+        to use, and remove the graph nodes of the free numbers that
+        are above all numbers in use.
+
+        :return: True if the node was released.
+        """
+        node = self.nodes.get(node_id)
+        if node is None or self.graph.degree(node) > 0:
+            return False
+
+        self.nodes.release(node_id)
+        self.graph.nodes[node]["id"] = None
+        self.graph.remove_nodes_from(self.nodes.trim())
+        return True
+
+    def link_edge(self, link_id: str) -> Optional[Tuple[int, int]]:
+        """
+        Return the edge of a link, or None if it has no edge.
+        """
+        return self._link_edges.get(link_id)
+
+    def node_id(self, node: int) -> Optional[str]:
+        """
+        Return the ID of the topology node of a graph node, or None.
+        """
+        return self.nodes.node_id(node)
+
+    def _node(self, node_id: str) -> int:
+        """
+        Return the graph node of a node, numbering it if it is new.
+        """
+        node = self.nodes.number(node_id)
+        if node in self.graph:
+            self.graph.nodes[node]["id"] = node_id
+        else:
+            self.graph.add_node(node, id=node_id)
+        return node
+
+    @staticmethod
+    def _edge(u: int, v: int) -> Tuple[int, int]:
+        return (u, v) if u <= v else (v, u)
@@ -0,0 +1,233 @@
+"""
+Compact VLAN allocation table of a port.
+
+TEManager keeps, for every port, which VLAN tags are available and
+which connection request each tag in use belongs to.  As a plain
+``{vlan: request_id}`` dict, that is up to 4094 int keys per port.
+
+VlanTable keeps the same information as two bitsets, the tags of the
+port and the tags that are free, plus a bitset of the tags in use by
+each owner.  Ranges of tags are reserved and released with a few
+operations on those bitsets, whatever the number of tags.  It is a
+mutable mapping of ``{vlan: owner}``, with ``UNUSED_VLAN`` as the
+owner of free tags, so it can be used in place of the dict.
+"""
+
+import operator
+from collections.abc import MutableMapping
+from functools import reduce
+from typing import Iterable, Iterator, Optional, Tuple
+
+UNUSED_VLAN = None
+
+
+class VlanTable(MutableMapping):
+    """
+    A ``{vlan: request_id}`` mapping, backed by bitsets.
+    """
+
+    __slots__ = ("_tags", "_free", "_owners")
+
+    def __init__(self, table: Optional[dict] = None):
+        """
+        :param table: an optional ``{vlan: request_id}`` dict to copy.
+        """
+        # Bit v is set when VLAN v is in the table...
+        self._tags = 0
+        # ...and when VLAN v is in the table and is not in use.
+        self._free = 0
+        # Bitset of the VLANs in use by each request ID.
+        self._owners = {}
+
+        if table:
+            self.update(table)
+
+    def __getitem__(self, vlan: int):
+        if vlan not in self:
+            raise KeyError(vlan)
+        if self._free >> vlan & 1:
+            return UNUSED_VLAN
+        for owner, bits in self._owners.items():
+            if bits >> vlan & 1:
+                return owner
+        return UNUSED_VLAN
+
+    def __setitem__(self, vlan: int, owner):
+        if not isinstance(vlan, int) or vlan < 0:
+            raise KeyError(vlan)
+
+        bit = 1 << vlan
+        self._disown(bit)
+        self._tags |= bit
+        if owner is UNUSED_VLAN:
+            self._free |= bit
+        else:
+            self._free &= ~bit
+            self._owners[owner] = self._owners.get(owner, 0) | bit
+
+    def __delitem__(self, vlan: int):
+        if vlan not in self:
+            raise KeyError(vlan)
+
+        bit = 1 << vlan
+        self._disown(bit)
+        self._tags &= ~bit
+        self._free &= ~bit
+
+    def __contains__(self, vlan) -> bool:
+        return isinstance(vlan, int) and vlan >= 0 and bool(self._tags >> vlan & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Iterate over the VLANs in the table, in ascending order.
+        """
+        return _bits(self._tags)
+
+    def __len__(self) -> int:
+        return self._tags.bit_count()
+
+    def __repr__(self) -> str:
+        return f"VlanTable({dict(self.items())})"
+
+    @property
+    def free_mask(self) -> int:
+        """
+        Bitset of the unused VLANs: bit v is set when VLAN v is free.
+        """
+        return self._free
+
+    def first_free(self) -> Optional[int]:
+        """
+        Return the lowest unused VLAN, or None if all are in use.
+        """
+        return _lowest(self._free)
+
+    def free_ranges(self) -> Iterator[Tuple[int, int]]:
+        """
+        Iterate over the runs of unused VLANs, as (start, stop) pairs
+        of start..stop-1 ranges, in ascending order.
+        """
+        mask = self._free
+        while mask:
+            start = (mask & -mask).bit_length() - 1
+            # Adding the lowest bit of the run carries over the whole
+            # run, and sets the first bit past it.
+            carried = mask + (1 << start)
+            stop = (carried & -carried).bit_length() - 1
+            yield start, stop
+            mask &= ~((1 << stop) - 1)
+
+    def find_missing(self, start: int, stop: int) -> Optional[int]:
+        """
+        Return the lowest VLAN in start..stop-1 that is not in the
+        table, or None when they all are.
+        """
+        return _lowest(_range_mask(start, stop) & ~self._tags)
+
+    def find_conflict(self, start: int, stop: int, owner) -> Optional[int]:
+        """
+        Return the lowest VLAN in start..stop-1 that is in use by
+        someone other than owner, or None.  VLANs that are not in the
+        table are left to find_missing().
+        """
+        mask = _range_mask(start, stop)
+        return _lowest(mask & self._tags & ~self._free & ~self._owners.get(owner, 0))
+
+    def reserve_range(self, start: int, stop: int, owner):
+        """
+        Mark the VLANs in start..stop-1 that are in the table as in use
+        by owner.
+        """
+        mask = _range_mask(start, stop) & self._tags
+        if not mask:
+            return
+
+        self._disown(mask & ~self._owners.get(owner, 0))
+        self._free &= ~mask
+        self._owners[owner] = self._owners.get(owner, 0) | mask
+
+    def release_range(self, start: int, stop: int, owner):
+        """
+        Mark the VLANs in start..stop-1 that are in use by owner as
+        unused.
+        """
+        owned = self._owners.get(owner, 0)
+        released = owned & _range_mask(start, stop)
+        if not released:
+            return
+
+        self._set_owned(owner, owned & ~released)
+        self._free |= released
+
+    def in_use(self) -> Iterator:
+        """
+        Iterate over the (vlan, owner) pairs of the VLANs in use.
+        """
+        for owner, bits in list(self._owners.items()):
+            for vlan in _bits(bits):
+                yield vlan, owner
+
+    def add_range(self, start: int, stop: int):
+        """
+        Add VLANs start..stop-1 to the table as unused.  VLANs that are
+        already in the table keep their state.
+        """
+        new = _range_mask(start, stop) & ~self._tags
+        self._tags |= new
+        self._free |= new
+
+    def _disown(self, mask: int):
+        """
+        Take the VLANs of mask that are in use away from their owners.
+        """
+        in_use = mask & self._tags & ~self._free
+        if not in_use:
+            return
+
+        for owner, bits in list(self._owners.items()):
+            if bits & in_use:
+                self._set_owned(owner, bits & ~in_use)
+
+    def _set_owned(self, owner, bits: int):
+        if bits:
+            self._owners[owner] = bits
+        else:
+            del self._owners[owner]
+
+
+def first_common_free(tables: Iterable[VlanTable]) -> Optional[int]:
+    """
+    Return the lowest VLAN that is unused on all the tables, or None.
+    """
+    mask = reduce(operator.and_, (table.free_mask for table in tables), -1)
+    if mask == -1:
+        return None
+    return _lowest(mask)
+
+
+def _lowest(mask: int) -> Optional[int]:
+    """
+    Return the position of the lowest bit set in mask, or None.
+    """
+    if not mask:
+        return None
+    return (mask & -mask).bit_length() - 1
+
+
+def _range_mask(start: int, stop: int) -> int:
+    """
+    Return a mask with bits start..stop-1 set.
+    """
+    if start >= stop:
+        return 0
+    return ((1 << (stop - start)) - 1) << start
+
+
+def _bits(mask: int) -> Iterator[int]:
+    """
+    Yield the positions of the bits set in mask, lowest first.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
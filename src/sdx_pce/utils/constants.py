@@ -18,6 +18,12 @@ class Constants:
     COST_FLAG_RANDOM = 3
     COST_FLAG_STATIC = 4
 
+    # OR-Tools backends for TESolver.  GLOP solves the LP relaxation.
+    SOLVER_SCIP = "SCIP"
+    SOLVER_CBC = "CBC"
+    SOLVER_CP_SAT = "CP_SAT"
+    SOLVER_GLOP = "GLOP"
+
     MIN_L_BW = 5000
     MAX_L_BW = 10000
 
@@ -0,0 +1,142 @@
+"""
+Synthetic OXP topologies, in the SDX topology data model 2.0 format.
+
+DomainTopologyGenerator makes the topology data of a chain of domains:
+domain i has its own nodes and intra-domain links, and an NNI port to
+each of domains i-1 and i+1, so that TopologyManager finds an
+inter-domain link between consecutive domains.  This is meant for
+benchmarks and tests of topology operations at scale.
+"""
+
+import copy
+from typing import Optional
+
+
+class DomainTopologyGenerator:
+    def __init__(self, num_nodes: int = 4, num_links: Optional[int] = None):
+        """
+        :param num_nodes: Number of nodes of each domain.
+        :param num_links: Number of intra-domain links of each
+            domain.  The first num_nodes links make a ring; more links
+            are chords across it.  Defaults to a ring.
+        """
+        if num_nodes < 2:
+            raise ValueError("A domain needs at least two nodes")
+
+        self.num_nodes = num_nodes
+        self.num_links = num_nodes if num_links is None else num_links
+
+        if self.num_links > num_nodes * (num_nodes - 1):
+            raise ValueError(f"Too many links for {num_nodes} nodes")
+
+    @staticmethod
+    def domain_name(index: int) -> str:
+        return f"domain{index}.net"
+
+    @classmethod
+    def topology_id(cls, index: int) -> str:
+        return f"urn:sdx:topology:{cls.domain_name(index)}"
+
+    def link_id(self, index: int, link: int) -> str:
+        return f"urn:sdx:link:{self.domain_name(index)}:L{link}"
+
+    def generate(self, index: int, version: int = 1) -> dict:
+        """
+        Return the topology data of the index-th domain of the chain.
+        """
+        domain = self.domain_name(index)
+        nodes = [self._node(domain, n) for n in range(self.num_nodes)]
+        links = []
+
+        for link in range(self.num_links):
+            # Link k joins node k to node k + 1 + k // num_nodes, so
+            # that the first num_nodes links form a ring and no two
+            # links join the same pair of nodes the same way round.
+            a = link % self.num_nodes
+            b = (a + 1 + link // self.num_nodes) % self.num_nodes
+            link_id = self.link_id(index, link)
+
+            port_ids = []
+            for n in (a, b):
+                port = self._port(domain, n, f"L{link}", nni=link_id)
+                nodes[n]["ports"].append(port)
+                port_ids.append(port["id"])
+
+            links.append(
+                {
+                    "id": link_id,
+                    "name": f"{domain}-L{link}",
+                    "ports": port_ids,
+                    "type": "intra",
+                    "bandwidth": 100,
+                    "residual_bandwidth": 100,
+                    "latency": 1 + link % 10,
+                    "packet_loss": 0,
+                    "availability": 100,
+                    "status": "up",
+                    "state": "enabled",
+                }
+            )
+
+        # NNI ports: the first node faces the previous domain, and the
+        # last node faces the next one.
+        last = self.num_nodes - 1
+        if index > 0:
+            peer = self._port_id(self.domain_name(index - 1), last, "next")
+            nodes[0]["ports"].append(self._port(domain, 0, "prev", nni=peer))
+        peer = self._port_id(self.domain_name(index + 1), 0, "prev")
+        nodes[last]["ports"].append(self._port(domain, last, "next", nni=peer))
+
+        return {
+            "id": self.topology_id(index),
+            "name": domain,
+            "version": version,
+            "model_version": "2.0.0",
+            "timestamp": "2024-01-01T00:00:00Z",
+            "nodes": nodes,
+            "links": links,
+            "services": ["l2vpn-ptp"],
+        }
+
+    @staticmethod
+    def set_link_status(topology: dict, link: int, status: str) -> dict:
+        """
+        Return a copy of topology data with a link's status changed,
+        and the version bumped, as an OXP would push it.
+        """
+        topology = copy.deepcopy(topology)
+        topology["links"][link]["status"] = status
+        topology["version"] += 1
+        return topology
+
+    def _node(self, domain: str, n: int) -> dict:
+        node_id = f"urn:sdx:node:{domain}:N{n}"
+        return {
+            "id": node_id,
+            "name": f"{domain}-N{n}",
+            "location": {
+                "address": domain,
+                "latitude": 0,
+                "longitude": 0,
+                "iso3166_2_lvl4": "US-NC",
+            },
+            # Every node has a user port.
+            "ports": [self._port(domain, n, "uni", nni="")],
+        }
+
+    @staticmethod
+    def _port_id(domain: str, n: int, name: str) -> str:
+        return f"urn:sdx:port:{domain}:N{n}:{name}"
+
+    def _port(self, domain: str, n: int, name: str, nni: str) -> dict:
+        return {
+            "id": self._port_id(domain, n, name),
+            "name": f"N{n}-{name}",
+            "node": f"urn:sdx:node:{domain}:N{n}",
+            "type": "10GE",
+            "status": "up",
+            "state": "enabled",
+            "mtu": 1500,
+            "nni": nni,
+            "services": {"l2vpn-ptp": {"vlan_range": [[1, 4095]]}},
+        }
@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import patch
+
+import networkx as nx
+
+from sdx_pce.load_balancing.arc_index import ArcIndex
+from sdx_pce.utils.constants import Constants
+
+
+class ArcIndexTests(unittest.TestCase):
+    def make_graph(self):
+        graph = nx.Graph()
+        graph.add_edge(0, 1, bandwidth=100, latency=10, weight=1)
+        graph.add_edge(1, 2, bandwidth=200, latency=20, weight=2)
+        return graph
+
+    def test_arcs(self):
+        graph = self.make_graph()
+        arcs = ArcIndex.for_graph(graph)
+
+        self.assertEqual(arcs.links, [(0, 1), (1, 0), (1, 2), (2, 1)])
+        self.assertEqual(arcs.tails.tolist(), [0, 1, 1, 2])
+        self.assertEqual(arcs.heads.tolist(), [1, 0, 2, 1])
+        self.assertEqual(arcs.bandwidth.tolist(), [100, 100, 200, 200])
+        self.assertEqual(arcs.latency.tolist(), [10, 10, 20, 20])
+        self.assertEqual(arcs.weight.tolist(), [1, 1, 2, 2])
+
+    def test_cached_and_refreshed(self):
+        graph = self.make_graph()
+        arcs = ArcIndex.for_graph(graph)
+
+        # Columns are read again only once they are marked stale.
+        graph[1][2][Constants.BANDWIDTH] = 50
+        self.assertIs(ArcIndex.for_graph(graph), arcs)
+        self.assertEqual(arcs.bandwidth.tolist(), [100, 100, 200, 200])
+
+        ArcIndex.mark_stale(graph, Constants.BANDWIDTH)
+        self.assertIs(ArcIndex.for_graph(graph), arcs)
+        self.assertEqual(arcs.bandwidth.tolist(), [100, 100, 50, 50])
+
+        # A new node builds a new index.
+        graph.add_edge(2, 3, bandwidth=300, latency=30, weight=3)
+        self.assertIsNot(ArcIndex.for_graph(graph), arcs)
+
+    def test_refresh_stale_columns_only(self):
+        graph = self.make_graph()
+        arcs = ArcIndex.for_graph(graph)
+
+        with patch.object(arcs, "_column", wraps=arcs._column) as column:
+            ArcIndex.for_graph(graph)
+            column.assert_not_called()
+
+            ArcIndex.mark_stale(graph, Constants.WEIGHT)
+            ArcIndex.for_graph(graph)
+            self.assertEqual(
+                [call.args[2] for call in column.call_args_list], [Constants.WEIGHT]
+            )
+
+    def test_invalidate(self):
+        graph = self.make_graph()
+        arcs = ArcIndex.for_graph(graph)
+
+        # Same numbers of nodes and edges, different edges.
+        graph.remove_edge(1, 2)
+        graph.add_edge(2, 0, bandwidth=500, latency=50, weight=5)
+        ArcIndex.invalidate(graph)
+
+        new_arcs = ArcIndex.for_graph(graph)
+        self.assertIsNot(new_arcs, arcs)
+        self.assertEqual(sorted(new_arcs.links), [(0, 1), (0, 2), (1, 0), (2, 0)])
+        columns = dict(zip(new_arcs.links, new_arcs.bandwidth.tolist()))
+        self.assertEqual(columns[(0, 2)], 500)
+        self.assertEqual(columns[(2, 0)], 500)
+        self.assertEqual(columns[(0, 1)], 100)
+
+    def test_missing_attribute(self):
+        graph = self.make_graph()
+        del graph[1][2][Constants.LATENCY]
+
+        with self.assertRaises(ValueError) as context:
+            ArcIndex.for_graph(graph)
+        self.assertIn("(1, 2)", str(context.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from sdx_pce.utils.domain_topology_generator import DomainTopologyGenerator
+
+
+class DomainTopologyGeneratorTest(unittest.TestCase):
+    def test_generate(self):
+        generator = DomainTopologyGenerator(num_nodes=4, num_links=10)
+        topology = generator.generate(1)
+
+        self.assertEqual(topology["id"], "urn:sdx:topology:domain1.net")
+        self.assertEqual(len(topology["nodes"]), 4)
+        self.assertEqual(len(topology["links"]), 10)
+
+        ports = {
+            port["id"]: node["id"]
+            for node in topology["nodes"]
+            for port in node["ports"]
+        }
+        node_pairs = set()
+        for link in topology["links"]:
+            a, b = (ports[port] for port in link["ports"])
+            self.assertNotEqual(a, b)
+            node_pairs.add((a, b))
+        self.assertEqual(len(node_pairs), 10)
+
+    def test_nni_ports(self):
+        generator = DomainTopologyGenerator(num_nodes=3)
+        first, second = generator.generate(0), generator.generate(1)
+
+        def nni_ports(topology):
+            return {
+                port["id"]: port["nni"]
+                for node in topology["nodes"]
+                for port in node["ports"]
+                if port["nni"].startswith("urn:sdx:port:")
+            }
+
+        first_ports, second_ports = nni_ports(first), nni_ports(second)
+
+        # The first domain only faces the next one.
+        self.assertEqual(len(first_ports), 1)
+        self.assertEqual(len(second_ports), 2)
+
+        # Consecutive domains point at each other.
+        port, peer = next(iter(first_ports.items()))
+        self.assertEqual(second_ports[peer], port)
+
+    def test_set_link_status(self):
+        generator = DomainTopologyGenerator()
+        topology = generator.generate(0)
+        update = generator.set_link_status(topology, 2, "down")
+
+        self.assertEqual(update["links"][2]["status"], "down")
+        self.assertEqual(update["version"], topology["version"] + 1)
+        self.assertEqual(topology["links"][2]["status"], "up")
+
+    def test_too_many_links(self):
+        with self.assertRaises(ValueError):
+            DomainTopologyGenerator(num_nodes=3, num_links=7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import copy
+import unittest
+
+import networkx as nx
+
+from sdx_pce.heuristic.heur import TEGroupSolver, matrix_to_connection, random_graph
+from sdx_pce.load_balancing.te_solver import TESolver
+from sdx_pce.utils.constants import Constants
+
+
+class TEGroupSolverTests(unittest.TestCase):
+    def test_solve(self):
+        graph, tm = random_graph(25, 0.2, 12)
+        expected_graph = copy.deepcopy(graph)
+
+        solver = TEGroupSolver(
+            graph, tm, Constants.COST_FLAG_HOP, Constants.OBJECTIVE_COST
+        )
+        partition_tm = solver.connection_split(0, 3)
+        ordered_paths, result = solver.solve(partition_tm)
+
+        # The same as placing the partitions with a TESolver each.
+        expected_result = 0
+        for partition in reversed(partition_tm):
+            te_solver = TESolver(
+                expected_graph,
+                matrix_to_connection(partition),
+                Constants.COST_FLAG_HOP,
+                Constants.OBJECTIVE_COST,
+            )
+            solution = te_solver.solve()
+            expected_graph = te_solver.update_graph(expected_graph, solution)
+            expected_result += solution.cost
+
+        placed = [request for paths in ordered_paths for request in paths]
+        self.assertEqual(len(placed), len(tm))
+        self.assertAlmostEqual(result, expected_result)
+
+    def test_solve_parallel(self):
+        graph, tm = random_graph(25, 0.2, 20)
+
+        solver = TEGroupSolver(
+            graph, tm, Constants.COST_FLAG_HOP, Constants.OBJECTIVE_COST
+        )
+        partition_tm = solver.connection_split(0, 4)
+
+        ordered_paths, result = solver.solve_parallel(partition_tm, max_workers=2)
+        print(f"Paths: {ordered_paths}, cost: {result}")
+
+        # Every connection is placed once, either by its partition or
+        # by the reconciliation pass.
+        placed = [
+            request for paths in ordered_paths if paths for request in paths.keys()
+        ]
+        self.assertEqual(len(placed), len(tm))
+        self.assertGreater(result, 0)
+
+    def test_solve_parallel_reconciles_conflicts_only(self):
+        graph = nx.Graph()
+        graph.add_edge(0, 1, bandwidth=60, latency=10)
+        graph.add_edge(1, 2, bandwidth=1000, latency=10)
+        graph.add_edge(2, 3, bandwidth=200, latency=10)
+
+        # Each partition gets half of every link.  The first one fits
+        # in its half of link (2, 3).  Only the smaller request of the
+        # second one fits in its half of link (0, 1).
+        partitions = [
+            [(2, 3, 50.0, 100.0)],
+            [(0, 1, 40.0, 100.0), (0, 1, 10.0, 100.0)],
+        ]
+        tm = [connection for partition in partitions for connection in partition]
+        solver = TEGroupSolver(
+            graph, tm, Constants.COST_FLAG_HOP, Constants.OBJECTIVE_COST
+        )
+
+        ordered_paths, result = solver.solve_parallel(partitions, max_workers=2)
+        print(f"Paths: {ordered_paths}, cost: {result}")
+
+        # The partitions keep their parallel solutions, and only the
+        # request that did not fit is re-solved.
+        requests = [
+            [(r.source, r.destination, r.required_bandwidth) for r in paths]
+            for paths in ordered_paths
+        ]
+        self.assertEqual(requests, [[(2, 3, 50.0)], [(0, 1, 10.0)], [(0, 1, 40.0)]])
+        self.assertEqual(result, 3)
+        self.assertEqual(graph[0][1][Constants.BANDWIDTH], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
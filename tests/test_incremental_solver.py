@@ -0,0 +1,216 @@
+import copy
+import unittest
+from unittest.mock import patch
+
+import networkx as nx
+
+from sdx_pce.load_balancing.incremental_solver import IncrementalTESolver
+from sdx_pce.load_balancing.te_solver import TESolver
+from sdx_pce.models import ConnectionPath, ConnectionRequest, TrafficMatrix
+from sdx_pce.utils.constants import Constants
+from sdx_pce.utils.random_connection_generator import RandomConnectionGenerator
+from sdx_pce.utils.random_topology_generator import RandomTopologyGenerator
+
+
+class IncrementalTESolverTests(unittest.TestCase):
+    def make_random_graph(self, num_nodes=25):
+        graph_generator = RandomTopologyGenerator(
+            num_node=num_nodes,
+            link_probability=0.1,
+            l_bw=10000,
+            u_bw=50000,
+            l_lat=10,
+            u_lat=20,
+            seed=2022,
+        )
+        return graph_generator.generate_graph(plot=False)
+
+    def make_random_traffic_matrix(self, num_nodes=25, num_connections=3):
+        tm_generator = RandomConnectionGenerator(num_nodes=num_nodes)
+        return tm_generator.generate(
+            querynum=num_connections,
+            l_bw=5000,
+            u_bw=15000,
+            l_lat=50,
+            u_lat=80,
+            seed=2022,
+        )
+
+    def test_matches_te_solver(self):
+        graph = self.make_random_graph()
+        tm = self.make_random_traffic_matrix(num_connections=3)
+
+        expected = TESolver(copy.deepcopy(graph), tm, Constants.COST_FLAG_HOP).solve()
+        solution = IncrementalTESolver(graph, Constants.COST_FLAG_HOP).solve(tm)
+        print(f"Solution: {solution}")
+
+        self.assertEqual(tm.connection_requests, list(solution.connection_map.keys()))
+        self.assertEqual(expected.cost, solution.cost)
+        self.assertEqual(tm.request_id, solution.request_id)
+
+    def test_successive_placements(self):
+        graph = self.make_random_graph()
+        tm = self.make_random_traffic_matrix(num_connections=6)
+
+        expected_graph = copy.deepcopy(graph)
+        solver = IncrementalTESolver(graph, Constants.COST_FLAG_HOP)
+        num_variables = []
+
+        for i, request in enumerate(tm.connection_requests):
+            single = TrafficMatrix(connection_requests=[request], request_id=str(i))
+
+            expected_solver = TESolver(expected_graph, single, Constants.COST_FLAG_HOP)
+            expected = expected_solver.solve()
+            expected_graph = expected_solver.update_graph(expected_graph, expected)
+
+            solution = solver.solve(single)
+            solver.reserve(solution)
+            num_variables.append(solver._solver.NumVariables())
+
+            self.assertAlmostEqual(expected.cost, solution.cost)
+            self.assertEqual(list(solution.connection_map), [request])
+
+        # Commodity blocks are reused, so the model did not grow.
+        self.assertEqual(len(set(num_variables)), 1)
+
+    def test_reserve_updates_bandwidth(self):
+        graph = nx.Graph()
+        graph.add_edge(0, 1, bandwidth=100, latency=10)
+        graph.add_edge(1, 2, bandwidth=100, latency=10)
+        graph.add_edge(0, 2, bandwidth=100, latency=10)
+
+        request = ConnectionRequest(
+            source=0, destination=2, required_bandwidth=60, required_latency=100
+        )
+
+        solver = IncrementalTESolver(graph)
+
+        solution = solver.solve(TrafficMatrix([request], request_id="1"))
+        self.assertEqual(
+            solution.connection_map[request], [ConnectionPath(source=0, destination=2)]
+        )
+        solver.reserve(solution)
+        self.assertEqual(graph[0][2][Constants.BANDWIDTH], 40)
+
+        # The direct link does not have enough bandwidth left.
+        solution = solver.solve(TrafficMatrix([request], request_id="2"))
+        self.assertEqual(
+            solution.connection_map[request],
+            [
+                ConnectionPath(source=0, destination=1),
+                ConnectionPath(source=1, destination=2),
+            ],
+        )
+        self.assertEqual(2, solution.cost)
+
+    def test_single_request_without_model(self):
+        graph = self.make_random_graph()
+        tm = self.make_random_traffic_matrix(num_connections=1)
+
+        solver = IncrementalTESolver(graph, Constants.COST_FLAG_HOP)
+        with patch.object(solver._solver, "Solve") as solve:
+            solution = solver.solve(tm)
+        solve.assert_not_called()
+
+        expected = TESolver(copy.deepcopy(graph), tm, Constants.COST_FLAG_HOP).solve()
+        self.assertEqual(solution.connection_map, expected.connection_map)
+        self.assertEqual(solution.cost, expected.cost)
+
+    def test_prune(self):
+        graph = nx.Graph()
+        graph.add_edge(0, 1, bandwidth=100, latency=10)
+        graph.add_edge(1, 2, bandwidth=100, latency=10)
+        graph.add_edge(0, 2, bandwidth=5, latency=10)
+
+        requests = [
+            ConnectionRequest(
+                source=0, destination=2, required_bandwidth=10, required_latency=100
+            ),
+            ConnectionRequest(
+                source=0, destination=1, required_bandwidth=1, required_latency=100
+            ),
+        ]
+
+        solver = IncrementalTESolver(graph)
+        solution = solver.solve(TrafficMatrix(requests, request_id="1"))
+        self.assertEqual(len(solution.connection_map[requests[0]]), 2)
+
+        # The direct link is too thin for the first request only.
+        direct = solver.links.index((0, 2))
+        for request, upper_bound in zip(requests, (0, 1)):
+            variable = solver._commodities[request].variables[direct]
+            self.assertEqual(variable.ub(), upper_bound)
+
+    def test_same_source_and_destination(self):
+        graph = nx.Graph()
+        graph.add_edge(0, 1, bandwidth=100, latency=10)
+        graph.add_edge(1, 2, bandwidth=100, latency=10)
+
+        loop = ConnectionRequest(
+            source=1, destination=1, required_bandwidth=10, required_latency=100
+        )
+        request = ConnectionRequest(
+            source=0, destination=2, required_bandwidth=10, required_latency=100
+        )
+
+        solver = IncrementalTESolver(graph)
+
+        solution = solver.solve(TrafficMatrix([loop], request_id="1"))
+        self.assertEqual(solution.connection_map, {loop: []})
+        self.assertEqual(solution.cost, 0)
+
+        solution = solver.solve(TrafficMatrix([loop, request], request_id="2"))
+        self.assertEqual(solution.connection_map[loop], [])
+        self.assertEqual(len(solution.connection_map[request]), 2)
+
+    def test_resolve_after_reserve(self):
+        # Two paths of the same cost from 0 to 3.
+        graph = nx.Graph()
+        graph.add_edge(0, 1, bandwidth=100, latency=10)
+        graph.add_edge(1, 3, bandwidth=100, latency=10)
+        graph.add_edge(0, 2, bandwidth=100, latency=10)
+        graph.add_edge(2, 3, bandwidth=100, latency=10)
+
+        request = ConnectionRequest(
+            source=0, destination=3, required_bandwidth=10, required_latency=100
+        )
+
+        solver = IncrementalTESolver(graph)
+        placed = solver.solve(TrafficMatrix([request], request_id="1"))
+        solver.reserve(placed)
+        path = placed.connection_map[request]
+
+        solution, set_hint = self.solve_with_model(
+            solver, TrafficMatrix([request], request_id="2")
+        )
+
+        # The solver starts from the placed path, and keeps it.
+        variables, values = set_hint.call_args.args
+        hinted = [solver.links[i] for i, value in enumerate(values) if value == 1.0]
+        self.assertEqual(
+            sorted(hinted), sorted((edge.source, edge.destination) for edge in path)
+        )
+        self.assertEqual(solution.connection_map[request], path)
+
+        # A removed request starts from zero again.
+        solver.remove_request(request)
+        _, set_hint = self.solve_with_model(
+            solver, TrafficMatrix([request], request_id="3")
+        )
+        variables, values = set_hint.call_args.args
+        self.assertEqual(sum(values), 0)
+
+    def solve_with_model(self, solver, tm):
+        """
+        Solve a traffic matrix with the model, even when it has a
+        single request, and return the solution and the SetHint mock.
+        """
+        with patch.object(solver, "_solve_single_request", return_value=None):
+            with patch.object(
+                solver._solver, "SetHint", wraps=solver._solver.SetHint
+            ) as set_hint:
+                return solver.solve(tm), set_hint
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import threading
+import unittest
+
+from sdx_pce.models import ConnectionPath, ConnectionRequest, ConnectionSolution
+from sdx_pce.topology.solution_store import SolutionStore
+
+
+def make_solution(request_id: str) -> ConnectionSolution:
+    request = ConnectionRequest(
+        source=0, destination=1, required_bandwidth=1, required_latency=100
+    )
+    return ConnectionSolution(
+        connection_map={request: [ConnectionPath(source=0, destination=1)]},
+        cost=1,
+        request_id=request_id,
+    )
+
+
+class SolutionStoreTests(unittest.TestCase):
+    def test_add_and_remove(self):
+        store = SolutionStore()
+        first = make_solution("request-1")
+        second = make_solution("request-2")
+
+        store.add(first, links=["link-a", "link-b"], ports=["p1"], domains=["d1"])
+        store.add(second, links=["link-b"], ports=["p2"], domains=["d1", "d2"])
+
+        self.assertEqual(len(store), 2)
+        self.assertIn("request-1", store)
+        self.assertIs(store.get("request-1"), first)
+        self.assertIsNone(store.get("request-3"))
+        self.assertEqual(store.request_ids(), ["request-1", "request-2"])
+        self.assertEqual(list(store), [first, second])
+
+        self.assertEqual(store.by_link("link-a"), [first])
+        self.assertEqual(store.by_link("link-b"), [first, second])
+        self.assertEqual(store.by_port("p2"), [second])
+        self.assertEqual(store.by_domain("d1"), [first, second])
+        self.assertEqual(store.by_domain("d3"), [])
+
+        self.assertIs(store.remove("request-1"), first)
+        self.assertIsNone(store.remove("request-1"))
+
+        self.assertEqual(store.by_link("link-a"), [])
+        self.assertEqual(store.by_link("link-b"), [second])
+        self.assertEqual(store.request_ids(), ["request-2"])
+
+    def test_replace(self):
+        store = SolutionStore()
+        store.add(make_solution("request-1"), links=["link-a"])
+
+        replacement = make_solution("request-1")
+        store.add(replacement, links=["link-b"])
+
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.by_link("link-a"), [])
+        self.assertEqual(store.by_link("link-b"), [replacement])
+
+    def test_threads(self):
+        store = SolutionStore()
+
+        def worker(n):
+            for i in range(100):
+                request_id = f"request-{n}-{i}"
+                store.add(make_solution(request_id), links=["link-a"])
+                if i % 2:
+                    store.remove(request_id)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(store), 400)
+        self.assertEqual(len(store.by_link("link-a")), 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
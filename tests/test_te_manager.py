@@ -8,6 +8,8 @@ import networkx as nx
 from sdx_pce.load_balancing.te_solver import TESolver
 from sdx_pce.models import ConnectionRequest, ConnectionSolution, TrafficMatrix
 from sdx_pce.topology.temanager import TEManager
+from sdx_pce.utils.constants import Constants
+from sdx_pce.utils.domain_topology_generator import DomainTopologyGenerator
 from sdx_pce.utils.exceptions import (
     RequestValidationError,
     SameSwitchRequestError,
@@ -112,6 +114,43 @@ class TEManagerTests(unittest.TestCase):
                 )
                 self.assertEqual(common_vlan, case["expected_vlan"])
 
+    def test_find_vlan_on_path(self):
+        """
+        Test the _find_vlan_on_path() method.
+        """
+        sax_topology = json.loads(TestData.TOPOLOGY_FILE_SAX.read_text())
+        zaoxi_topology = json.loads(TestData.TOPOLOGY_FILE_ZAOXI.read_text())
+
+        temanager = TEManager(topology_data=None)
+        for topology in (sax_topology, zaoxi_topology):
+            temanager.add_topology(topology)
+            temanager._update_vlan_tags_table(
+                domain_name=topology.get("id"),
+                port_map=temanager.topology_manager.get_port_map(),
+            )
+
+        path = {
+            "urn:sdx:topology:sax.net": {
+                "ingress_port": {"id": "urn:sdx:port:sax.net:B3:1"},
+                "egress_port": {"id": "urn:sdx:port:sax.net:B3:1"},
+            },
+            "urn:sdx:topology:zaoxi.net": {
+                "ingress_port": {"id": "urn:sdx:port:zaoxi.net:B1:1"},
+                "egress_port": {"id": "urn:sdx:port:zaoxi.net:B1:1"},
+            },
+        }
+
+        self.assertEqual(temanager._find_vlan_on_path(path), 100)
+
+        # Once VLAN 100 is taken on one port, it is not free end to end.
+        temanager._vlan_tags_table["urn:sdx:topology:zaoxi.net"][
+            "urn:sdx:port:zaoxi.net:B1:1"
+        ][100] = "request-1"
+        self.assertEqual(temanager._find_vlan_on_path(path), 101)
+
+        path["urn:sdx:topology:sax.net"]["egress_port"] = {"id": "no-such-port"}
+        self.assertIsNone(temanager._find_vlan_on_path(path))
+
     def test_generate_solver_input(self):
         print("Test Convert Connection To Topology")
         request = json.loads(TestData.CONNECTION_REQ_AMLIGHT.read_text())
@@ -770,12 +809,29 @@ class TEManagerTests(unittest.TestCase):
         connections = temanager.get_connections()
         self.assertIn(connection_request["id"], connections)
 
+        # The connection is indexed by the links and domains it uses.
+        _, links = temanager.get_links_on_path(solution)
+        link = temanager.topology_manager.get_port_link_map()[links[0]["source"]]
+        self.assertIn(
+            connection_request["id"], temanager.get_connections_on_link(link.id)
+        )
+        self.assertIn(
+            connection_request["id"],
+            temanager.get_connections_on_port(links[0]["source"]),
+        )
+        self.assertIn(
+            connection_request["id"],
+            temanager.get_connections_in_domain("urn:sdx:topology:ampath.net"),
+        )
+
         # Delete the connection
         temanager.delete_connection(connection_request["id"])
 
         # Verify the connection has been deleted
         connections = temanager.get_connections()
         self.assertNotIn(connection_request["id"], connections)
+        self.assertEqual(temanager.get_connections_on_link(link.id), [])
+        self.assertIsNone(temanager.get_connection_solution(connection_request["id"]))
 
     def test_connection_amlight_to_sax_v2(self):
         """
@@ -1248,6 +1304,17 @@ class TEManagerTests(unittest.TestCase):
         self.assertIsNotNone(tm)
         self.assertIsInstance(tm, TrafficMatrix)
 
+        # The traffic matrix refers to the graph nodes of the ports.
+        for connection in tm.connection_requests:
+            for node in (connection.source, connection.destination):
+                node_id = graph.nodes[node]["id"]
+                self.assertEqual(temanager._graph_node_index[node_id], node)
+
+        topology = temanager.topology_manager.get_topology()
+        for node in topology.nodes:
+            for port in node.ports:
+                self.assertEqual(temanager._get_node_id_by_port(port.id), node.id)
+
     def _make_traffic_matrix_from_request(
         self, temanager: TEManager, connection_request: dict
     ) -> TrafficMatrix:
@@ -1562,6 +1629,28 @@ class TEManagerTests(unittest.TestCase):
             TEManager(topology_data=None).unreserve_vlan(request_id)
             self.assertEqual(e.request_id, request_id)
 
+    def test_unreserve_vlan_restored_table(self):
+        """
+        VLANs in use in a restored VLAN tags table can be unreserved.
+        """
+        temanager = TEManager(topology_data=None)
+        temanager.vlan_tags_table = {
+            "domain1": {
+                "port1": {1: None, 2: "request-1", 3: "request-2"},
+                "port2": {1: "request-1"},
+            }
+        }
+
+        temanager.unreserve_vlan("request-1")
+
+        table = temanager.vlan_tags_table["domain1"]
+        self.assertIsNone(table["port1"][2])
+        self.assertIsNone(table["port2"][1])
+        self.assertEqual(table["port1"][3], "request-2")
+
+        with self.assertRaises(UnknownRequestError):
+            temanager.unreserve_vlan("request-1")
+
     def test_identical_vlan_ranges(self):
         """
         If the vlan specified in the connection request is ranges, they have to be the same
@@ -2236,3 +2325,353 @@ class TEManagerTests(unittest.TestCase):
             },
         )
         self.assertEqual(result, {"d1": {"p1": ["2-3", "5"]}})
+
+    def test_update_available_vlans_dirty_ports(self):
+        """
+        Test that update_available_vlans() without a table only
+        publishes the ports whose VLANs changed.
+        """
+        te = TEManager(topology_data=None)
+        te.topology_manager = MagicMock()
+        te.vlan_tags_table = {
+            "d1": {"p1": {1: None, 2: None, 3: None}, "p2": {1: None, 2: None}},
+            "d2": {"p3": {1: None}},
+        }
+
+        # Restoring a table publishes all of its ports.
+        result = te.update_available_vlans()
+        self.assertEqual(
+            result,
+            {"d1": {"p1": ["1-3"], "p2": ["1-2"]}, "d2": {"p3": ["1"]}},
+        )
+
+        self.assertEqual(te.update_available_vlans(), {})
+        te.topology_manager.change_port_vlan_range.reset_mock()
+
+        te._reserve_vlan("d1", {"id": "p1"}, "request-1", "2")
+        self.assertEqual(te.update_available_vlans(), {"d1": {"p1": ["1", "3"]}})
+        te.topology_manager.change_port_vlan_range.assert_called_once_with(
+            "d1", "p1", ["1", "3"]
+        )
+
+        te.unreserve_vlan("request-1")
+        self.assertEqual(te.update_available_vlans(), {"d1": {"p1": ["1-3"]}})
+
+    def test_update_topology_unchanged_and_status_only(self):
+        """
+        Test that an update with the same data as the previous one is
+        skipped, and that a status-only update keeps the residual
+        bandwidth of the links.
+        """
+        generator = DomainTopologyGenerator(num_nodes=4, num_links=6)
+        temanager = TEManager(topology_data=None)
+        for index in range(3):
+            temanager.add_topology(generator.generate(index))
+
+        topology_manager = temanager.topology_manager
+        link_id = generator.link_id(1, 2)
+        link = topology_manager.get_link_by_id(link_id)
+        topology_manager.change_link_property_by_value(
+            link.ports[0], link.ports[1], "residual_bandwidth", 40
+        )
+
+        topology_manager.update_topology = MagicMock(
+            wraps=topology_manager.update_topology
+        )
+        changes = temanager.update_topology(generator.generate(1))
+        self.assertEqual(changes, ([], [], [], [], [], []))
+        topology_manager.update_topology.assert_not_called()
+
+        update = generator.set_link_status(generator.generate(1), 2, "down")
+        _, _, removed_links, _, _, _ = temanager.update_topology(update)
+        topology_manager.update_topology.assert_called_once_with(update)
+        self.assertEqual([link.id for link in removed_links], [link_id])
+
+        link = topology_manager.get_link_by_id(link_id)
+        self.assertEqual(link.status, "down")
+        self.assertEqual(link.residual_bandwidth, 40)
+
+    def test_update_topology_status_only_interdomain_bandwidth(self):
+        """
+        Test that a status-only update restores the residual bandwidth
+        of the inter-domain links of the topology too.
+        """
+        generator = DomainTopologyGenerator(num_nodes=4, num_links=6)
+        temanager = TEManager(topology_data=None)
+        for index in range(2):
+            temanager.add_topology(generator.generate(index))
+
+        topology_manager = temanager.topology_manager
+        link = topology_manager.get_link_by_port_ids(
+            "urn:sdx:port:domain0.net:N3:next", "urn:sdx:port:domain1.net:N0:prev"
+        )
+        topology_manager.change_link_property_by_value(
+            link.ports[0], link.ports[1], "residual_bandwidth", 40
+        )
+
+        temanager.update_available_bw_in_topology = MagicMock(
+            wraps=temanager.update_available_bw_in_topology
+        )
+        temanager.update_topology(
+            generator.set_link_status(generator.generate(1), 2, "down")
+        )
+
+        (bw_table,) = temanager.update_available_bw_in_topology.call_args.args
+        self.assertEqual(bw_table[link.id], 40)
+        self.assertEqual(
+            topology_manager.get_link_by_id(link.id).residual_bandwidth, 40
+        )
+
+    def test_remove_topology(self):
+        """
+        Test that a removed topology leaves TEManager with its
+        fingerprint.
+        """
+        generator = DomainTopologyGenerator(num_nodes=4, num_links=6)
+        temanager = TEManager(topology_data=None)
+        for index in range(3):
+            temanager.add_topology(generator.generate(index))
+
+        topology_id = generator.topology_id(1)
+        temanager.remove_topology(topology_id)
+        self.assertNotIn(topology_id, temanager.get_topology_map())
+        self.assertNotIn(topology_id, temanager._topology_fingerprints)
+
+    def test_generate_graph_te_incremental(self):
+        """
+        Test that the graph follows topology changes, and that its
+        nodes keep their numbers across them.
+        """
+        generator = DomainTopologyGenerator(num_nodes=4, num_links=6)
+        temanager = TEManager(topology_data=generator.generate(0))
+        temanager.generate_graph_te()
+
+        temanager.add_topology(generator.generate(1))
+        graph = temanager.generate_graph_te()
+        self.assertEqual(graph.number_of_nodes(), 8)
+        self.assertEqual(graph.number_of_edges(), 6 + 6 + 1)
+
+        node_index = dict(temanager._graph_node_index)
+
+        # The edge of a link that goes down is removed.
+        update = generator.set_link_status(generator.generate(1), 2, "down")
+        temanager.update_topology(update)
+        graph = temanager.generate_graph_te()
+        self.assertEqual(graph.number_of_edges(), 6 + 5 + 1)
+        self.assertEqual(temanager._graph_node_index, node_index)
+
+        # Edges follow bandwidth changes.
+        link = temanager.topology_manager.get_link_by_id(generator.link_id(0, 1))
+        temanager.topology_manager.change_link_property_by_value(
+            link.ports[0], link.ports[1], "residual_bandwidth", 25
+        )
+        graph = temanager.generate_graph_te()
+        edges = [data for _, _, data in graph.edges(data=True) if data["id"] == link.id]
+        self.assertEqual(edges[0]["residual_bandwidth"], 25)
+
+        # The graph is the same as a new one.
+        expected = temanager.topology_manager.generate_graph()
+        edges = {
+            frozenset(graph.nodes[node]["id"] for node in edge) for edge in graph.edges
+        }
+        self.assertEqual(edges, {frozenset(edge) for edge in expected.edges})
+
+    def test_generate_graph_te_copies(self):
+        """
+        Test that solvers can change the graph they get without
+        changing the next one.
+        """
+        generator = DomainTopologyGenerator(num_nodes=4, num_links=6)
+        temanager = TEManager(topology_data=generator.generate(0))
+        temanager.add_topology(generator.generate(1))
+
+        graph = temanager.generate_graph_te()
+        edges = {tuple(edge): dict(data) for *edge, data in graph.edges(data=True)}
+
+        request = ConnectionRequest(
+            source=temanager._graph_node_index["urn:sdx:node:domain0.net:N0"],
+            destination=temanager._graph_node_index["urn:sdx:node:domain1.net:N3"],
+            required_bandwidth=10,
+            required_latency=float("inf"),
+        )
+        tm = TrafficMatrix(connection_requests=[request], request_id="copies")
+
+        # The solver sets random weights, and update_graph() takes the
+        # bandwidth of the path off its links.
+        solver = TESolver(graph, tm, Constants.COST_FLAG_RANDOM)
+        solution = solver.solve()
+        self.assertIsNotNone(solution.connection_map)
+        solver.update_graph(graph, solution)
+        self.assertNotEqual(
+            edges, {tuple(edge): data for *edge, data in graph.edges(data=True)}
+        )
+
+        graph = temanager.generate_graph_te()
+        self.assertEqual(
+            edges, {tuple(edge): data for *edge, data in graph.edges(data=True)}
+        )
+
+    def test_generate_graph_te_reuses_node_numbers(self):
+        """
+        Test that the number of a node that is removed from the
+        topology goes to a new node, and that other nodes keep theirs.
+        """
+        generator = DomainTopologyGenerator(num_nodes=4, num_links=6)
+        temanager = TEManager(topology_data=generator.generate(0))
+        temanager.add_topology(generator.generate(1))
+        temanager.generate_graph_te()
+        node_index = dict(temanager._graph_node_index)
+
+        update = generator.generate(1, version=2)
+        node_id = update["nodes"].pop(1)["id"]
+        temanager.update_topology(update)
+        graph = temanager.generate_graph_te()
+        self.assertNotIn(node_id, temanager._graph_node_index)
+
+        # The graph node of the removed node stays, with no ID and no
+        # edges, to keep the nodes numbered 0..n-1.
+        number = node_index.pop(node_id)
+        self.assertEqual(sorted(graph.nodes), list(range(8)))
+        self.assertIsNone(graph.nodes[number]["id"])
+        self.assertEqual(graph.degree(number), 0)
+
+        temanager.add_topology(generator.generate(2))
+        graph = temanager.generate_graph_te()
+        self.assertEqual(sorted(graph.nodes), list(range(11)))
+
+        # A node of the new topology has the number of the removed node.
+        self.assertNotEqual(temanager._topology_graph.node_id(number), node_id)
+        self.assertEqual(graph.nodes[number]["id"].split(":")[3], "domain2.net")
+        for node_id, number in node_index.items():
+            self.assertEqual(temanager._graph_node_index[node_id], number)
+
+    def test_connections_on_interdomain_link(self):
+        """
+        Test that a connection is indexed by the inter-domain links on
+        its path.
+        """
+        generator = DomainTopologyGenerator(num_nodes=4)
+        temanager = TEManager(topology_data=generator.generate(0))
+        temanager.add_topology(generator.generate(1))
+        graph = temanager.generate_graph_te()
+
+        request = {
+            "name": "new-connection",
+            "id": "interdomain",
+            "endpoints": [
+                {"port_id": "urn:sdx:port:domain0.net:N0:uni", "vlan": "100"},
+                {"port_id": "urn:sdx:port:domain1.net:N3:uni", "vlan": "100"},
+            ],
+            "qos_metrics": {},
+            "scheduling": {},
+        }
+        traffic_matrix = temanager.generate_traffic_matrix(request)
+        solution = TESolver(graph, traffic_matrix).solve()
+        self.assertIsNotNone(solution.connection_map)
+        temanager.generate_connection_breakdown(solution, request)
+
+        link = temanager.topology_manager.get_link_by_port_ids(
+            "urn:sdx:port:domain0.net:N3:next", "urn:sdx:port:domain1.net:N0:prev"
+        )
+        self.assertIsNotNone(link)
+        self.assertEqual(temanager.get_connections_on_link(link.id), ["interdomain"])
+
+        # Every link on the path is indexed.
+        _, links = temanager.get_links_on_path(solution)
+        for path_link in links:
+            link = temanager.topology_manager.get_link_by_port_ids(
+                path_link["source"], path_link["destination"]
+            )
+            self.assertEqual(
+                temanager.get_connections_on_link(link.id), ["interdomain"]
+            )
+
+    def test_reroute_connections(self):
+        """
+        Test that a connection on a link that goes down gets a new path
+        around it.
+        """
+        generator = DomainTopologyGenerator(num_nodes=4)
+        temanager = TEManager(topology_data=generator.generate(0))
+        temanager.add_topology(generator.generate(1))
+        graph = temanager.generate_graph_te()
+
+        request = {
+            "name": "new-connection",
+            "id": "reroute",
+            "endpoints": [
+                {"port_id": "urn:sdx:port:domain0.net:N0:uni", "vlan": "100"},
+                {"port_id": "urn:sdx:port:domain1.net:N3:uni", "vlan": "100"},
+            ],
+            "qos_metrics": {"min_bw": {"value": 6}},
+            "scheduling": {},
+        }
+        traffic_matrix = temanager.generate_traffic_matrix(request)
+        solution = TESolver(graph, traffic_matrix).solve()
+        temanager.generate_connection_breakdown(solution, request)
+
+        # The link from N3 to N0 of domain0 is on the path.
+        link_id = generator.link_id(0, 3)
+        self.assertEqual(temanager.get_connections_on_link(link_id), ["reroute"])
+        failed = set(temanager._topology_graph.link_edge(link_id))
+
+        update = generator.set_link_status(generator.generate(0), 3, "down")
+        temanager.update_topology(update)
+
+        solutions = temanager.reroute_connections(
+            temanager.get_connections_on_link(link_id) + ["unknown"]
+        )
+        self.assertEqual(list(solutions), ["reroute"])
+
+        # The new path goes around the ring of domain0, and through the
+        # inter-domain link, that the connection itself leaves with 4 of
+        # its 10.
+        (path,) = solutions["reroute"].connection_map.values()
+        (old_path,) = solution.connection_map.values()
+        self.assertEqual(len(path), len(old_path) + 2)
+        self.assertNotIn(failed, [{hop.source, hop.destination} for hop in path])
+
+        # It replaces the old one.
+        temanager.delete_connection("reroute")
+        temanager.generate_connection_breakdown(solutions["reroute"], request)
+        self.assertEqual(temanager.get_connections_on_link(link_id), [])
+        self.assertEqual(
+            temanager.get_connections_on_link(generator.link_id(0, 1)), ["reroute"]
+        )
+
+    def test_reserve_vlan_range_not_in_range_or_in_use(self):
+        """
+        Test that a VLAN range that is in use, and one that is not in
+        the range of a port, are reported differently.
+        """
+        generator = DomainTopologyGenerator(num_nodes=4)
+        temanager = TEManager(topology_data=generator.generate(0))
+
+        def place(request_id, vlan):
+            request = {
+                "name": "new-connection",
+                "id": request_id,
+                "endpoints": [
+                    {"port_id": "urn:sdx:port:domain0.net:N0:uni", "vlan": vlan},
+                    {"port_id": "urn:sdx:port:domain0.net:N2:uni", "vlan": vlan},
+                ],
+                "qos_metrics": {},
+                "scheduling": {},
+            }
+            graph = temanager.generate_graph_te()
+            traffic_matrix = temanager.generate_traffic_matrix(request)
+            solution = TESolver(graph, traffic_matrix).solve()
+            return temanager.generate_connection_breakdown(solution, request)
+
+        self.assertIsNotNone(place("first", "100:200"))
+
+        with self.assertRaises(TEError) as context:
+            place("in-use", "150:160")
+        self.assertEqual(context.exception.te_code, 409)
+        self.assertIn("VLAN 150 is in use", str(context.exception))
+
+        # VLANs 1-4095 are in the range of the port.
+        with self.assertRaises(TEError) as context:
+            place("not-in-range", "4090:4100")
+        self.assertEqual(context.exception.te_code, 400)
+        self.assertIn("VLAN 4096 is not in the range", str(context.exception))
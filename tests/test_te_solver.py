@@ -1,10 +1,16 @@
 import json
 import unittest
+from unittest.mock import patch
 
 import networkx as nx
 
 from sdx_pce.load_balancing.te_solver import TESolver
-from sdx_pce.models import ConnectionPath, ConnectionSolution, TrafficMatrix
+from sdx_pce.models import (
+    ConnectionPath,
+    ConnectionRequest,
+    ConnectionSolution,
+    TrafficMatrix,
+)
 from sdx_pce.utils.constants import Constants
 from sdx_pce.utils.graphviz import can_read_dot_file, read_dot_file
 from sdx_pce.utils.random_connection_generator import RandomConnectionGenerator
@@ -57,6 +63,90 @@ class TESolverTests(unittest.TestCase):
                 self.assertIsInstance(path, ConnectionPath)
 
         self.assertEqual(6.0, solution.cost)
+        self.assertTrue(solution.statistics.optimal)
+
+    def test_mc_solve_backends(self):
+        tm = self.make_random_traffic_matrix()
+
+        for backend in (
+            Constants.SOLVER_SCIP,
+            Constants.SOLVER_CBC,
+            Constants.SOLVER_CP_SAT,
+        ):
+            solver = TESolver(
+                self.make_random_graph(),
+                tm,
+                Constants.COST_FLAG_HOP,
+                backend=backend,
+                num_workers=2,
+            )
+            solution = solver.solve()
+            print(f"{backend} solution: {solution}")
+
+            self.assertEqual(len(tm.connection_requests), len(solution.connection_map))
+            self.assertEqual(6.0, solution.cost)
+
+        # The LP relaxation is a lower bound.
+        solver = TESolver(
+            self.make_random_graph(),
+            tm,
+            Constants.COST_FLAG_HOP,
+            backend=Constants.SOLVER_GLOP,
+        )
+        solution = solver.solve()
+        self.assertLessEqual(solution.cost, 6.0 + 1e-6)
+
+    def test_lp_relaxation_fractional(self):
+        # Two requests that do not both fit on the direct link.
+        graph = nx.Graph()
+        graph.add_edge(0, 2, bandwidth=100, latency=10)
+        graph.add_edge(0, 1, bandwidth=100, latency=10)
+        graph.add_edge(1, 2, bandwidth=100, latency=10)
+
+        tm = TrafficMatrix(
+            connection_requests=[
+                ConnectionRequest(
+                    source=0, destination=2, required_bandwidth=60, required_latency=100
+                ),
+                ConnectionRequest(
+                    source=0, destination=2, required_bandwidth=60, required_latency=90
+                ),
+            ],
+            request_id="lp",
+        )
+
+        solution = TESolver(graph, tm, backend=Constants.SOLVER_GLOP).solve()
+        print(f"LP solution: {solution}")
+
+        # The relaxation splits the requests, so it has no paths.
+        self.assertIsNone(solution.connection_map)
+        self.assertFalse(solution.statistics.optimal)
+        self.assertAlmostEqual(solution.cost, 4 - 100 / 60)
+
+        solution = TESolver(graph, tm, backend=Constants.SOLVER_SCIP).solve()
+        self.assertTrue(solution.statistics.optimal)
+        self.assertEqual(solution.cost, 3)
+        self.assertEqual(
+            sorted(len(path) for path in solution.connection_map.values()), [1, 2]
+        )
+
+    def test_mc_solve_with_budget(self):
+        graph = self.make_random_graph()
+        tm = self.make_random_traffic_matrix()
+
+        solver = TESolver(
+            graph, tm, Constants.COST_FLAG_HOP, time_limit=10, mip_gap=0.5
+        )
+        solution = solver.solve()
+        print(f"Solution: {solution}")
+
+        # A solution within the gap, and how it was found.
+        self.assertEqual(len(tm.connection_requests), len(solution.connection_map))
+        self.assertIsNotNone(solution.statistics)
+        self.assertLessEqual(solution.statistics.gap, 0.5)
+        self.assertGreaterEqual(solution.statistics.wall_time, 0)
+        self.assertGreaterEqual(solution.statistics.nodes, 0)
+        self.assertGreaterEqual(solution.statistics.iterations, 0)
 
     def test_lb_solve(self):
         graph = self.make_random_graph()
@@ -82,6 +172,163 @@ class TESolverTests(unittest.TestCase):
 
         self.assertEqual(1.851, round(solution.cost, 3))
 
+    def test_data_model_is_sparse(self):
+        graph = self.make_random_graph()
+        tm = self.make_random_traffic_matrix()
+
+        data = TESolver(graph, tm, Constants.COST_FLAG_HOP)._create_data_model()
+
+        num_requests = len(tm.connection_requests)
+        num_links = 2 * graph.number_of_edges()
+
+        self.assertLessEqual(data.num_vars, num_requests * num_links)
+        self.assertEqual(len(data.var_requests), data.num_vars)
+        self.assertEqual(len(data.var_links), data.num_vars)
+        self.assertEqual(len(data.constraint_indptr), data.num_constraints + 1)
+
+        # Per request, each directed link has at most two flow
+        # coefficients, one bandwidth coefficient, and one latency
+        # coefficient.
+        self.assertLessEqual(len(data.constraint_coeffs), 4 * data.num_vars)
+        self.assertEqual(len(data.constraint_indices), len(data.constraint_coeffs))
+        self.assertNotIn(0, data.constraint_coeffs)
+
+    def test_data_model_is_pruned(self):
+        # Link 2-3 does not have enough bandwidth.  With a latency
+        # bound, going through 4 is too slow, and only the 0-1-2 path
+        # should be left.
+        graph = nx.Graph()
+        graph.add_edge(0, 1, bandwidth=100, latency=10)
+        graph.add_edge(1, 2, bandwidth=100, latency=10)
+        graph.add_edge(2, 3, bandwidth=5, latency=10)
+        graph.add_edge(0, 4, bandwidth=100, latency=50)
+        graph.add_edge(4, 2, bandwidth=100, latency=50)
+
+        request = ConnectionRequest(
+            source=0,
+            destination=2,
+            required_bandwidth=10,
+            required_latency=float("inf"),
+        )
+        tm = TrafficMatrix(connection_requests=[request], request_id=self.id())
+        solver = TESolver(graph, tm)
+
+        data = solver._create_data_model()
+        self.assertEqual(data.num_vars, 8)
+
+        request = ConnectionRequest(
+            source=0, destination=2, required_bandwidth=10, required_latency=30
+        )
+        tm = TrafficMatrix(connection_requests=[request], request_id=self.id())
+        solver = TESolver(graph, tm)
+
+        data = solver._create_data_model()
+        arcs = {solver.links[i] for i in data.var_links}
+        self.assertEqual(arcs, {(0, 1), (1, 2)})
+
+        # Bandwidth and latency rows are vacuous for a single request
+        # on pruned links, so only the flow rows are left.
+        self.assertEqual(data.num_inequality, 0)
+
+    def test_single_request_matches_mip(self):
+        graph = self.make_random_graph()
+        tm = self.make_random_traffic_matrix()
+
+        for objective in (
+            Constants.OBJECTIVE_COST,
+            Constants.OBJECTIVE_LOAD_BALANCING,
+        ):
+            for request in tm.connection_requests:
+                single = TrafficMatrix(
+                    connection_requests=[request], request_id=self.id()
+                )
+
+                fast = TESolver(graph, single, Constants.COST_FLAG_HOP, objective)
+                solution = fast.solve()
+
+                # Force the MIP solver to compare with.
+                mip = TESolver(graph, single, Constants.COST_FLAG_HOP, objective)
+                with patch.object(mip, "_solve_single_request", return_value=None):
+                    expected = mip.solve()
+
+                self.assertEqual(
+                    expected.connection_map is None, solution.connection_map is None
+                )
+                self.assertAlmostEqual(expected.cost, solution.cost)
+
+                if solution.connection_map is None:
+                    continue
+
+                self.assertIs(type(solution.cost), float)
+
+                # The path must be connected, from source to destination.
+                path = solution.connection_map[request]
+                self.assertEqual(path[0].source, request.source)
+                self.assertEqual(path[-1].destination, request.destination)
+                for a, b in zip(path, path[1:]):
+                    self.assertEqual(a.destination, b.source)
+
+    def test_single_request_latency_bound(self):
+        # The direct link 0-2 is cheap but slow; going through 1 is
+        # more expensive and fast enough.
+        graph = nx.Graph()
+        graph.add_edge(0, 2, bandwidth=100, latency=50, weight=1)
+        graph.add_edge(0, 1, bandwidth=100, latency=10, weight=1)
+        graph.add_edge(1, 2, bandwidth=100, latency=10, weight=1)
+
+        request = ConnectionRequest(
+            source=0, destination=2, required_bandwidth=10, required_latency=30
+        )
+        tm = TrafficMatrix(connection_requests=[request], request_id=self.id())
+
+        solution = TESolver(graph, tm).solve()
+
+        self.assertEqual(
+            solution.connection_map[request],
+            [
+                ConnectionPath(source=0, destination=1),
+                ConnectionPath(source=1, destination=2),
+            ],
+        )
+        self.assertEqual(2, solution.cost)
+
+    def test_mc_solve_long_paths(self):
+        # A line of 15 nodes: paths of more than 10 hops.
+        graph = nx.path_graph(15)
+        for u, v in graph.edges:
+            graph[u][v].update(bandwidth=100, latency=1)
+
+        tm = TrafficMatrix(
+            connection_requests=[
+                ConnectionRequest(
+                    source=0,
+                    destination=14,
+                    required_bandwidth=10,
+                    required_latency=100,
+                ),
+                ConnectionRequest(
+                    source=13,
+                    destination=1,
+                    required_bandwidth=10,
+                    required_latency=100,
+                ),
+            ],
+            request_id=self.id(),
+        )
+
+        solution = TESolver(graph, tm).solve()
+
+        forward, backward = tm.connection_requests
+        self.assertEqual(
+            solution.connection_map[forward],
+            [ConnectionPath(source=i, destination=i + 1) for i in range(14)],
+        )
+        self.assertEqual(
+            solution.connection_map[backward],
+            [ConnectionPath(source=i, destination=i - 1) for i in range(13, 1, -1)],
+        )
+        self.assertEqual(26, solution.cost)
+
     def test_mc_solve_more_connections_than_nodes(self):
         graph = self.make_random_graph(num_nodes=10)
 
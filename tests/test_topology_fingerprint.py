@@ -0,0 +1,41 @@
+import unittest
+
+from sdx_pce.topology.fingerprint import topology_fingerprint
+from sdx_pce.utils.domain_topology_generator import DomainTopologyGenerator
+
+
+class TopologyFingerprintTests(unittest.TestCase):
+    def setUp(self):
+        self.generator = DomainTopologyGenerator()
+        self.topology = self.generator.generate(1)
+        self.fingerprint = topology_fingerprint(self.topology)
+
+    def test_same_data(self):
+        self.assertEqual(
+            topology_fingerprint(self.generator.generate(1)), self.fingerprint
+        )
+
+    def test_status_change(self):
+        update = self.generator.set_link_status(self.topology, 2, "down")
+        fingerprint = topology_fingerprint(update)
+
+        self.assertNotEqual(fingerprint, self.fingerprint)
+        self.assertNotEqual(fingerprint.version, self.fingerprint.version)
+        self.assertTrue(fingerprint.same_structure(self.fingerprint))
+
+    def test_port_state_change(self):
+        self.topology["nodes"][0]["ports"][0]["state"] = "disabled"
+        fingerprint = topology_fingerprint(self.topology)
+
+        self.assertNotEqual(fingerprint, self.fingerprint)
+        self.assertTrue(fingerprint.same_structure(self.fingerprint))
+
+    def test_structure_change(self):
+        self.topology["links"].pop()
+        fingerprint = topology_fingerprint(self.topology)
+
+        self.assertFalse(fingerprint.same_structure(self.fingerprint))
+
+
+if __name__ == "__main__":
+    unittest.main()
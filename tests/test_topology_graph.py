@@ -2,9 +2,13 @@ import unittest
 
 import matplotlib.pyplot as plt
 import networkx as nx
+from networkx.algorithms import approximation as approx
 from sdx_datamodel.parsing.topologyhandler import TopologyHandler
 
+from sdx_pce.load_balancing.te_solver import TESolver
+from sdx_pce.models import ConnectionRequest, TrafficMatrix
 from sdx_pce.topology.manager import TopologyManager
+from sdx_pce.topology.topology_graph import NodeRegistry, TopologyGraph
 
 from . import TestData
 
@@ -53,3 +57,178 @@ class TopologyGrpahTests(unittest.TestCase):
         self.__write_graph(
             infile=TestData.TOPOLOGY_FILE_ZAOXI, outfile=TestData.TEST_OUTPUT_IMG_ZAOXI
         )
+
+
+class NodeRegistryTests(unittest.TestCase):
+    def test_number(self):
+        registry = NodeRegistry()
+        self.assertEqual(registry.number("a"), 0)
+        self.assertEqual(registry.number("b"), 1)
+        self.assertEqual(registry.number("a"), 0)
+
+        self.assertEqual(registry.get("b"), 1)
+        self.assertIsNone(registry.get("c"))
+        self.assertEqual(registry.node_id(1), "b")
+        self.assertIsNone(registry.node_id(2))
+        self.assertEqual(list(registry), ["a", "b"])
+
+    def test_release(self):
+        registry = NodeRegistry()
+        for node_id in ("a", "b", "c"):
+            registry.number(node_id)
+
+        self.assertEqual(registry.release("c"), 2)
+        self.assertEqual(registry.release("a"), 0)
+        self.assertIsNone(registry.release("a"))
+        self.assertNotIn("a", registry)
+        self.assertIsNone(registry.node_id(0))
+        self.assertEqual(len(registry), 1)
+
+        # Freed numbers are reused lowest first, before new ones.
+        self.assertEqual(registry.number("d"), 0)
+        self.assertEqual(registry.number("e"), 2)
+        self.assertEqual(registry.number("f"), 3)
+        self.assertEqual(registry.get("b"), 1)
+
+    def test_trim(self):
+        registry = NodeRegistry()
+        for node_id in ("a", "b", "c", "d"):
+            registry.number(node_id)
+
+        registry.release("b")
+        registry.release("d")
+        self.assertEqual(registry.trim(), [3])
+        self.assertEqual(registry.trim(), [])
+
+        # "b" is still in the way of trimming "c".
+        registry.release("c")
+        self.assertEqual(registry.trim(), [2, 1])
+        self.assertEqual(registry.number("e"), 1)
+
+
+class TopologyGraphTests(unittest.TestCase):
+    def setUp(self):
+        self.topology_graph = TopologyGraph()
+        self.graph = self.topology_graph.graph
+
+    def test_set_link(self):
+        self.assertTrue(self.topology_graph.set_link("l1", "a", "b", {"latency": 1}))
+        self.assertTrue(self.topology_graph.set_link("l2", "b", "c", {"latency": 2}))
+
+        self.assertEqual(sorted(self.graph.nodes), [0, 1, 2])
+        self.assertEqual(self.topology_graph.node_index, {"a": 0, "b": 1, "c": 2})
+        self.assertEqual(self.graph.nodes[2]["id"], "c")
+
+        # Changing the attributes of a link does not change the edges.
+        self.assertFalse(self.topology_graph.set_link("l1", "a", "b", {"latency": 5}))
+        self.assertEqual(self.graph.edges[0, 1]["latency"], 5)
+
+    def test_remove_link(self):
+        self.topology_graph.set_link("l1", "a", "b", {"latency": 1})
+        self.topology_graph.set_link("l2", "b", "c", {"latency": 2})
+
+        self.assertTrue(self.topology_graph.remove_link("l1"))
+        self.assertFalse(self.topology_graph.remove_link("l1"))
+
+        # The node of "a" is kept, so that nodes stay numbered 0..n-1,
+        # but "a" has no links any more.
+        self.assertEqual(sorted(self.graph.nodes), [0, 1, 2])
+        self.assertEqual(self.topology_graph.node_index, {"b": 1, "c": 2})
+
+        # "a" keeps its number when it has links again.
+        self.topology_graph.set_link("l3", "c", "a", {"latency": 3})
+        self.assertEqual(self.topology_graph.node_index["a"], 0)
+        self.assertTrue(self.graph.has_edge(0, 2))
+
+    def test_parallel_links(self):
+        self.topology_graph.set_link("l1", "a", "b", {"latency": 1})
+        self.assertFalse(self.topology_graph.set_link("l2", "b", "a", {"latency": 2}))
+        self.assertEqual(self.graph.number_of_edges(), 1)
+        self.assertEqual(self.graph.edges[0, 1]["latency"], 2)
+
+        self.assertFalse(self.topology_graph.remove_link("l2"))
+        self.assertEqual(self.graph.edges[0, 1]["latency"], 1)
+
+        self.assertTrue(self.topology_graph.remove_link("l1"))
+        self.assertEqual(self.graph.number_of_edges(), 0)
+
+    def test_clear_links(self):
+        self.topology_graph.set_link("l1", "a", "b", {"latency": 1})
+        self.topology_graph.clear_links()
+
+        self.assertEqual(self.graph.number_of_edges(), 0)
+        self.assertEqual(self.topology_graph.node_index, {})
+
+        self.topology_graph.set_link("l1", "b", "c", {"latency": 1})
+        self.assertEqual(self.topology_graph.node_index, {"b": 1, "c": 2})
+
+    def test_release_node(self):
+        self.topology_graph.set_link("l1", "a", "b", {"latency": 1})
+        self.topology_graph.set_link("l2", "b", "c", {"latency": 2})
+
+        # Nodes that have links are not released.
+        self.assertFalse(self.topology_graph.release_node("a"))
+        self.assertFalse(self.topology_graph.release_node("x"))
+
+        self.topology_graph.remove_link("l1")
+        self.assertTrue(self.topology_graph.release_node("a"))
+        self.assertIsNone(self.topology_graph.node_id(0))
+        self.assertIsNone(self.graph.nodes[0]["id"])
+
+        # A new node takes the number of "a", and the graph keeps
+        # nodes 0..n-1.
+        self.topology_graph.set_link("l3", "c", "d", {"latency": 3})
+        self.assertEqual(self.topology_graph.node_index, {"b": 1, "c": 2, "d": 0})
+        self.assertEqual(self.topology_graph.node_id(0), "d")
+        self.assertEqual(self.graph.nodes[0]["id"], "d")
+        self.assertEqual(sorted(self.graph.nodes), [0, 1, 2])
+
+    def test_release_last_node(self):
+        self.topology_graph.set_link("l1", "a", "b", {"latency": 1})
+        self.topology_graph.set_link("l2", "b", "c", {"latency": 2})
+        self.topology_graph.remove_link("l1")
+        self.topology_graph.remove_link("l2")
+
+        # "a" stays, with no ID, to keep the nodes numbered 0..n-1.
+        self.topology_graph.release_node("a")
+        self.topology_graph.release_node("c")
+        self.assertEqual(sorted(self.graph.nodes), [0, 1])
+        self.assertIsNone(self.graph.nodes[0]["id"])
+
+        # Once "b" is gone, none of the numbers are in use.
+        self.topology_graph.release_node("b")
+        self.assertEqual(self.graph.number_of_nodes(), 0)
+
+        self.topology_graph.set_link("l3", "d", "e", {"latency": 3})
+        self.assertEqual(self.topology_graph.node_index, {"d": 0, "e": 1})
+
+    def test_solve_around_released_node(self):
+        attributes = {"bandwidth": 100, "latency": 1}
+        self.topology_graph.set_link("l1", "a", "b", dict(attributes))
+        self.topology_graph.set_link("l2", "b", "c", dict(attributes))
+        self.topology_graph.set_link("l3", "c", "d", dict(attributes))
+        self.topology_graph.remove_link("l1")
+        self.topology_graph.release_node("a")
+
+        # The node of "a" has no ID and no edges.
+        self.assertEqual(sorted(self.graph.nodes), [0, 1, 2, 3])
+        self.assertEqual(self.graph.degree(0), 0)
+
+        request = ConnectionRequest(
+            source=1, destination=3, required_bandwidth=10, required_latency=10
+        )
+        for tm in (
+            TrafficMatrix(connection_requests=[request], request_id="single"),
+            TrafficMatrix(connection_requests=[request] * 2, request_id="mip"),
+        ):
+            solution = TESolver(self.graph.copy(), tm).solve()
+            path = solution.connection_map[request]
+            self.assertEqual(
+                [(hop.source, hop.destination) for hop in path], [(1, 2), (2, 3)]
+            )
+
+        self.assertEqual(approx.node_connectivity(self.graph, 1, 3), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
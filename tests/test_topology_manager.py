@@ -8,6 +8,7 @@ import networkx as nx
 
 from sdx_pce.topology.grenmlconverter import GrenmlConverter
 from sdx_pce.topology.manager import TopologyManager
+from sdx_pce.utils.domain_topology_generator import DomainTopologyGenerator
 
 from . import TestData
 
@@ -315,6 +316,260 @@ class TopologyManagerTests(unittest.TestCase):
             ):
                 self.assertEqual(topology_id, "urn:sdx:topology:zaoxi.net")
 
+    def test_get_domain_name_after_update_and_remove(self):
+        """
+        Test that node and port domains follow topology updates and
+        removals.
+        """
+        self.test_merge_topology_v2()
+
+        topology_data = json.loads(
+            pathlib.Path(TestData.TOPOLOGY_FILE_SAX_2_UPDATE).read_text()
+        )
+        self.topology_manager.update_topology(topology_data)
+
+        topology_id = topology_data["id"]
+        for node in topology_data["nodes"]:
+            self.assertEqual(
+                self.topology_manager.get_domain_name(node["id"]), topology_id
+            )
+            for port in node["ports"]:
+                self.assertEqual(
+                    self.topology_manager.get_domain_name_by_port(port["id"]),
+                    topology_id,
+                )
+
+        self.topology_manager.remove_topology(topology_id)
+
+        for node in topology_data["nodes"]:
+            self.assertIsNone(self.topology_manager.get_domain_name(node["id"]))
+            for port in node["ports"]:
+                self.assertIsNone(
+                    self.topology_manager.get_domain_name_by_port(port["id"])
+                )
+
+
+    def test_port_and_link_lookups(self):
+        """
+        Test the port and link lookups of the merged topology, before
+        and after a topology update.
+        """
+        self.test_merge_topology_v2()
+        self._check_port_and_link_lookups()
+
+        for topology_file in self.TOPOLOGY_FILE_LIST_UPDATE:
+            topology_data = json.loads(pathlib.Path(topology_file).read_text())
+            self.topology_manager.update_topology(topology_data)
+        self._check_port_and_link_lookups()
+
+        self.assertIsNone(self.topology_manager.get_port_by_id("no-such-port"))
+
+    def _check_port_and_link_lookups(self):
+        manager = self.topology_manager
+        topology = manager.get_topology()
+
+        for node in topology.nodes:
+            for port in node.ports:
+                self.assertEqual(manager.get_port_by_id(port.id)["id"], port.id)
+                self.assertIs(manager.get_port_obj_by_id(topology, port.id), port)
+                self.assertEqual(manager.get_node_id_by_port(port.id), node.id)
+
+        for link in topology.links:
+            self.assertIs(manager.get_link_by_id(link.id), link)
+
+            port1, port2 = (
+                port if isinstance(port, str) else port["id"] for port in link.ports
+            )
+            self.assertIsNotNone(manager.get_link_by_port_ids(port2, port1))
+
+            node1 = manager.get_node_id_by_port(port1)
+            node2 = manager.get_node_id_by_port(port2)
+            if node1 is None or node2 is None:
+                continue
+
+            ports = manager.get_ports_by_node_pair(node2, node1)
+            self.assertEqual(manager.get_node_id_by_port(ports[0]["id"]), node2)
+            self.assertEqual(manager.get_node_id_by_port(ports[1]["id"]), node1)
+
+
+    def test_inter_domain_links_of_chained_domains(self):
+        """
+        Test that domains added one after the other are joined by
+        inter-domain links.
+        """
+        generator = DomainTopologyGenerator(num_nodes=3, num_links=4)
+        for index in range(5):
+            self.topology_manager.add_topology(generator.generate(index))
+
+        links = self.topology_manager.get_topology().links
+        interdomain_links = [
+            link for link in links if link.id.startswith("urn:sdx:link:interdomain:")
+        ]
+        self.assertEqual(len(interdomain_links), 4)
+        self.assertEqual(len(links), 5 * 4 + 4)
+
+        for link in interdomain_links:
+            self.assertIs(self.topology_manager.get_link_by_id(link.id), link)
+            self.assertIs(self.topology_manager.get_link_by_port_ids(*link.ports), link)
+
+        self._check_port_and_link_lookups()
+
+    def test_update_topology_replaces_changed_links_only(self):
+        """
+        Test that a topology update replaces only the links that it
+        changes in the merged topology.
+        """
+        generator = DomainTopologyGenerator(num_nodes=4, num_links=6)
+        for index in range(3):
+            self.topology_manager.add_topology(generator.generate(index))
+
+        links = {link.id: link for link in self.topology_manager.get_topology().links}
+
+        update = generator.set_link_status(generator.generate(1), 2, "down")
+        _, _, removed_links, added_links, _, _ = self.topology_manager.update_topology(
+            update
+        )
+
+        changed_link_id = generator.link_id(1, 2)
+        self.assertEqual([link.id for link in removed_links], [changed_link_id])
+        self.assertEqual(added_links, [])
+
+        updated_links = {
+            link.id: link for link in self.topology_manager.get_topology().links
+        }
+        self.assertEqual(updated_links.keys(), links.keys())
+
+        for link_id, link in links.items():
+            if link_id == changed_link_id:
+                self.assertIsNot(updated_links[link_id], link)
+                self.assertEqual(updated_links[link_id].status, "down")
+            else:
+                self.assertIs(updated_links[link_id], link)
+
+        self._check_port_and_link_lookups()
+
+    def test_update_topology_keeps_unchanged_nodes(self):
+        """
+        Test that a topology update keeps the nodes and links that it
+        does not change everywhere, with their published VLAN ranges.
+        """
+        generator = DomainTopologyGenerator(num_nodes=4, num_links=6)
+        for index in range(3):
+            self.topology_manager.add_topology(generator.generate(index))
+
+        update = generator.set_link_status(generator.generate(1), 2, "down")
+        topology_id = update["id"]
+        port_id = update["nodes"][0]["ports"][0]["id"]
+        self.topology_manager.change_port_vlan_range(topology_id, port_id, ["100:200"])
+
+        removed_nodes, added_nodes, *_ = self.topology_manager.update_topology(update)
+        self.assertEqual(removed_nodes, [])
+        self.assertEqual(added_nodes, [])
+
+        topology = self.topology_manager.get_topology()
+        domain_topology = self.topology_manager.get_topology_map()[topology_id]
+        nodes = {node.id: node for node in topology.nodes}
+        for node in domain_topology.nodes:
+            self.assertIs(nodes[node.id], node)
+            for port in node.ports:
+                self.assertIs(self.topology_manager.get_port_map()[port.id], port)
+
+        links = {link.id: link for link in topology.links}
+        for link in domain_topology.links:
+            self.assertIs(links[link.id], link)
+
+        port = self.topology_manager.get_port_obj_by_id(topology, port_id)
+        self.assertEqual(port.services.l2vpn_ptp["vlan_range"], ["100:200"])
+
+        self._check_port_and_link_lookups()
+
+    def test_update_topology_port_status(self):
+        """
+        Test that links go down and up with the status of their ports.
+        """
+        generator = DomainTopologyGenerator(num_nodes=4, num_links=6)
+        for index in range(2):
+            self.topology_manager.add_topology(generator.generate(index))
+
+        # Port 1 of node 0 is on link 0.
+        topology = generator.generate(0, version=2)
+        topology["nodes"][0]["ports"][1]["status"] = "down"
+        link_id = generator.link_id(0, 0)
+
+        changes = self.topology_manager.update_topology(topology)
+        removed_nodes, added_nodes, removed_links, added_links, _, _ = changes
+        self.assertEqual(removed_nodes, [])
+        self.assertEqual(added_nodes, [])
+        self.assertEqual([link.id for link in removed_links], [link_id])
+        self.assertEqual(added_links, [])
+        self.assertEqual(self.topology_manager.get_link_by_id(link_id).status, "down")
+
+        changes = self.topology_manager.update_topology(
+            generator.generate(0, version=3)
+        )
+        _, _, removed_links, added_links, _, _ = changes
+        self.assertEqual(removed_links, [])
+        self.assertEqual([link.id for link in added_links], [link_id])
+
+    def test_pop_link_changes(self):
+        """
+        Test that the links that change are recorded.
+        """
+        generator = DomainTopologyGenerator(num_nodes=4, num_links=6)
+        self.topology_manager.add_topology(generator.generate(0))
+
+        # Everything may have changed on the first call.
+        self.assertIsNone(self.topology_manager.pop_link_changes())
+        self.assertEqual(self.topology_manager.pop_link_changes(), [])
+
+        self.topology_manager.update_topology(
+            generator.set_link_status(generator.generate(0), 2, "down")
+        )
+        self.assertEqual(
+            self.topology_manager.pop_link_changes(), [generator.link_id(0, 2)]
+        )
+
+        link_id = generator.link_id(0, 3)
+        self.topology_manager.update_link_property(link_id, "latency", 8)
+        self.assertEqual(self.topology_manager.pop_link_changes(), [link_id])
+
+    def test_remove_topology(self):
+        """
+        Test that the nodes and links of a removed topology leave the
+        merged topology, with its inter-domain links.
+        """
+        generator = DomainTopologyGenerator(num_nodes=4, num_links=6)
+        for index in range(3):
+            self.topology_manager.add_topology(generator.generate(index))
+
+        removed = generator.generate(1)
+        self.topology_manager.remove_topology(removed["id"])
+
+        topology = self.topology_manager.get_topology()
+        node_ids = {node.id for node in topology.nodes}
+        for node in removed["nodes"]:
+            self.assertNotIn(node["id"], node_ids)
+            self.assertFalse(self.topology_manager.has_node(node["id"]))
+            self.assertIsNone(self.topology_manager.get_domain_name(node["id"]))
+            for port in node["ports"]:
+                self.assertIsNone(self.topology_manager.get_node_id_by_port(port["id"]))
+
+        # The links of the removed domain, and the inter-domain links
+        # to its neighbours, are gone.  The other links are left.
+        link_ids = {link.id for link in topology.links}
+        self.assertEqual(len(link_ids), 6 + 6)
+        for link_id in link_ids:
+            self.assertNotIn("domain1.net", link_id)
+
+        graph = self.topology_manager.generate_graph()
+        self.assertEqual(graph.number_of_edges(), 6 + 6)
+        self._check_port_and_link_lookups()
+
+        # The domain comes back with its inter-domain links.
+        self.topology_manager.add_topology(generator.generate(1))
+        self.assertEqual(len(self.topology_manager.get_topology().links), 3 * 6 + 2)
+        self._check_port_and_link_lookups()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,182 @@
+import copy
+import pickle
+import random
+import unittest
+
+from sdx_pce.topology.vlan_table import UNUSED_VLAN, VlanTable, first_common_free
+
+
+class VlanTableTests(unittest.TestCase):
+    def test_mapping(self):
+        table = VlanTable()
+        table.add_range(100, 105)
+        table.add_range(200, 201)
+
+        self.assertEqual(len(table), 6)
+        self.assertEqual(list(table), [100, 101, 102, 103, 104, 200])
+        self.assertIn(100, table)
+        self.assertNotIn(99, table)
+        self.assertNotIn("100", table)
+        self.assertIs(table[100], UNUSED_VLAN)
+
+        with self.assertRaises(KeyError):
+            table[99]
+
+        table[101] = "request-1"
+        self.assertEqual(table[101], "request-1")
+        self.assertEqual(table.get(101), "request-1")
+
+        table[101] = UNUSED_VLAN
+        self.assertIs(table[101], UNUSED_VLAN)
+
+        del table[200]
+        self.assertNotIn(200, table)
+        self.assertEqual(len(table), 5)
+
+    def test_same_as_dict(self):
+        labels = {1: None, 2: "request-1", 3: None, 4094: "request-2"}
+        table = VlanTable(labels)
+
+        self.assertEqual(table, labels)
+        self.assertEqual(dict(table.items()), labels)
+        self.assertEqual(table, pickle.loads(pickle.dumps(table)))
+        self.assertEqual(table, copy.deepcopy(table))
+
+    def test_add_range_keeps_state(self):
+        table = VlanTable()
+        table.add_range(1, 10)
+        table[5] = "request-1"
+
+        table.add_range(1, 20)
+
+        self.assertEqual(len(table), 19)
+        self.assertEqual(table[5], "request-1")
+
+    def test_first_free(self):
+        table = VlanTable()
+        self.assertIsNone(table.first_free())
+
+        table.add_range(100, 103)
+        self.assertEqual(table.first_free(), 100)
+
+        table[100] = "request-1"
+        table[101] = "request-1"
+        self.assertEqual(table.first_free(), 102)
+
+        table[102] = "request-1"
+        self.assertIsNone(table.first_free())
+
+        table[101] = UNUSED_VLAN
+        self.assertEqual(table.first_free(), 101)
+
+    def test_reserve_range(self):
+        table = VlanTable()
+        table.add_range(1, 4095)
+        table[150] = "request-1"
+
+        self.assertIsNone(table.find_conflict(100, 150, "request-2"))
+        self.assertEqual(table.find_conflict(100, 201, "request-2"), 150)
+        self.assertIsNone(table.find_conflict(100, 201, "request-1"))
+
+
+        table.reserve_range(100, 201, "request-1")
+        self.assertEqual(table[100], "request-1")
+        self.assertEqual(table[200], "request-1")
+        self.assertIs(table[201], UNUSED_VLAN)
+        self.assertEqual(table.first_free(), 1)
+        self.assertEqual(table.find_conflict(200, 202, "request-2"), 200)
+
+    def test_find_missing_and_conflict(self):
+        table = VlanTable()
+        table.add_range(100, 200)
+        table[150] = "request-1"
+
+        # Outside the range of the port, but not in use.
+        self.assertEqual(table.find_missing(90, 110), 90)
+        self.assertEqual(table.find_missing(190, 210), 200)
+        self.assertIsNone(table.find_missing(100, 200))
+        self.assertIsNone(table.find_conflict(190, 210, "request-2"))
+
+        # In the range of the port, and in use.
+        self.assertIsNone(table.find_missing(140, 160))
+        self.assertEqual(table.find_conflict(140, 160, "request-2"), 150)
+        self.assertIsNone(table.find_conflict(140, 160, "request-1"))
+
+    def test_release_range(self):
+        table = VlanTable()
+        table.add_range(1, 10)
+        table.reserve_range(2, 6, "request-1")
+        table[6] = "request-2"
+
+        self.assertEqual(list(table.in_use())[0], (2, "request-1"))
+
+        table.release_range(1, 10, "request-1")
+
+        self.assertEqual(list(table.in_use()), [(6, "request-2")])
+        self.assertEqual(table.first_free(), 1)
+
+    def test_ranges_same_as_dict(self):
+        rng = random.Random(0)
+        table = VlanTable()
+        table.add_range(1, 200)
+        labels = dict.fromkeys(range(1, 200), UNUSED_VLAN)
+
+        owners = ["request-1", "request-2", "request-3"]
+        for _ in range(500):
+            start = rng.randrange(0, 210)
+            stop = start + rng.randrange(0, 40)
+            owner = rng.choice(owners)
+            operation = rng.randrange(3)
+            if operation == 0:
+                table.reserve_range(start, stop, owner)
+                for vlan in range(start, stop):
+                    if vlan in labels:
+                        labels[vlan] = owner
+            elif operation == 1:
+                table.release_range(start, stop, owner)
+                for vlan in range(start, stop):
+                    if labels.get(vlan) == owner:
+                        labels[vlan] = UNUSED_VLAN
+            else:
+                table[start % 199 + 1] = owner
+                labels[start % 199 + 1] = owner
+
+            self.assertEqual(dict(table.items()), labels)
+            self.assertEqual(
+                sorted(table.in_use()),
+                sorted((v, o) for v, o in labels.items() if o is not UNUSED_VLAN),
+            )
+
+    def test_free_ranges(self):
+        table = VlanTable()
+        self.assertEqual(list(table.free_ranges()), [])
+
+        table.add_range(1, 10)
+        table.add_range(20, 21)
+        table[4] = "request-1"
+        table[6] = "request-1"
+
+        self.assertEqual(
+            list(table.free_ranges()), [(1, 4), (5, 6), (7, 10), (20, 21)]
+        )
+
+    def test_first_common_free(self):
+        upstream = VlanTable()
+        upstream.add_range(1, 100)
+        downstream = VlanTable()
+        downstream.add_range(50, 200)
+
+        self.assertEqual(first_common_free([upstream, downstream]), 50)
+
+        upstream.reserve_range(50, 60, "request-1")
+        downstream[60] = "request-2"
+        self.assertEqual(first_common_free([upstream, downstream]), 61)
+
+        other = VlanTable()
+        other.add_range(1, 61)
+        self.assertIsNone(first_common_free([upstream, downstream, other]))
+        self.assertIsNone(first_common_free([]))
+
+
+if __name__ == "__main__":
+    unittest.main()